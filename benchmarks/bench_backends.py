@@ -0,0 +1,71 @@
+"""
+Speed of the HTML backends behind UpworkJobParser: pages/s and peak RSS growth
+per installed backend on the synthetic corpus (both list markup and nested
+fallback cards), each measured in a fresh subprocess. That every backend
+produces the same jobs as html.parser is checked by tests/test_html_backends.py.
+
+    python benchmarks/bench_backends.py --pages 30 --cards 50
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import search_page  # noqa: E402
+from extractors.html_backend import available_backends  # noqa: E402
+from extractors.job_parser import UpworkJobParser  # noqa: E402
+
+def corpus(pages: int, cards: int):
+    for p in range(1, pages + 1):
+        yield search_page(page=p, cards=cards)
+        yield search_page(page=p, cards=cards, markup="cards")
+
+def measure(backend: str, pages: int, cards: int) -> dict:
+    docs = list(corpus(pages, cards))
+    parser_engine = UpworkJobParser(html_backend=backend)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    for html in docs:
+        parser_engine._parse_html(html)
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "backend": backend,
+        "pages": len(docs),
+        "seconds": elapsed,
+        "pages_per_sec": len(docs) / elapsed,
+        "peak_rss_growth_kb": rss_after - rss_before,
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=30)
+    ap.add_argument("--cards", type=int, default=50)
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.pages, args.cards)))
+        return
+
+    for backend in available_backends():
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--pages", str(args.pages), "--cards", str(args.cards)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(out)
+        print(
+            f"{r['backend']:<12} pages={r['pages']:<4d} {r['seconds']:6.2f}s "
+            f"{r['pages_per_sec']:8.1f} pages/s  peak RSS +{r['peak_rss_growth_kb'] / 1024:.1f} MiB"
+        )
+
+if __name__ == "__main__":
+    main()
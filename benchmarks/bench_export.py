@@ -0,0 +1,85 @@
+"""
+Size, write time and reload time of each output format on synthetic job
+records, written page by page through the streaming sinks as a run would.
+"columnar/page" closes a row group after every page, which is what a
+checkpointed run does; parquet is skipped when pyarrow is not installed.
+
+    python benchmarks/bench_export.py --jobs 50000 --page 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import raw_job  # noqa: E402
+from extractors.ssr_state import map_job  # noqa: E402
+from output.columnar import ColumnarSink, pq  # noqa: E402
+from output.data_exporter import COLUMNS, SINKS, DataExporter, read_records  # noqa: E402
+from utils.normalize import normalize_jobs  # noqa: E402
+
+QUERIES = ["python scraping", "react developer", "data entry", "shopify store", "machine learning"]
+
+def records(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    jobs = []
+    for job_id in range(n):
+        query = rng.choice(QUERIES)
+        job = map_job(raw_job(rng, 10_000_000 + job_id, query))
+        job["Query"] = query
+        job["Source"] = "Upwork Jobs Search"
+        job["Queries"] = [query]
+        jobs.append(job)
+    return normalize_jobs(jobs, time.time())
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=50_000)
+    ap.add_argument("--page", type=int, default=50, help="Records per sink.write() call.")
+    args = ap.parse_args()
+
+    jobs = records(args.jobs)
+    pages = [jobs[i:i + args.page] for i in range(0, len(jobs), args.page)]
+    formats = [
+        ("json", SINKS["json"]),
+        ("jsonl", SINKS["jsonl"]),
+        ("csv", SINKS["csv"]),
+        ("columnar", SINKS["columnar"]),
+        ("columnar/page", partial(ColumnarSink, columns=COLUMNS, row_group_size=args.page)),
+    ]
+    if pq is not None:
+        formats.append(("parquet", SINKS["parquet"]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The one-shot writer main.py used before outputs were streamed, for reference
+        path = os.path.join(tmp, "batch.json")
+        started = time.perf_counter()
+        DataExporter().to_json(jobs, path)
+        write = time.perf_counter() - started
+        json_size = os.path.getsize(path)
+        print(f"{'format':<14} {'MiB':>8} {'vs json':>8} {'write s':>8} {'reload s':>9}")
+        print(f"{'to_json':<14} {json_size / 2**20:8.2f} {1.0:8.2f} {write:8.2f} {'':>9}")
+        for name, sink_cls in formats:
+            path = os.path.join(tmp, "out." + name.replace("/", "-"))
+            started = time.perf_counter()
+            sink = sink_cls(path)
+            for page in pages:
+                sink.write(page)
+                if name == "columnar/page":
+                    sink.position()
+            sink.close()
+            write = time.perf_counter() - started
+            size = os.path.getsize(path)
+            started = time.perf_counter()
+            n = sum(1 for _ in read_records(name.split("/")[0], path))
+            reload = time.perf_counter() - started
+            assert n == len(jobs), f"{name}: read back {n} of {len(jobs)} records"
+            print(f"{name:<14} {size / 2**20:8.2f} {size / json_size:8.2f} {write:8.2f} {reload:9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Parse and field-extraction throughput of UpworkJobParser on a synthetic search page.
+Tree building and per-card extraction are timed separately; --ssr also embeds
+the jobs as a state blob so the JSON fast path is measured end to end.
+--filters enables client-side filtering, so cards that fail it skip extraction.
+
+    python benchmarks/bench_extract.py --cards 50 --repeat 20 [--ssr] [--filters '{"payment_type": ["hourly"]}']
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from corpus import search_page  # noqa: E402
+from extractors.job_parser import UpworkJobParser  # noqa: E402
+from filters.job_filters import JobFilter  # noqa: E402
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cards", type=int, default=50)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--ssr", action="store_true", help="Embed a __NUXT_DATA__ state blob in the page.")
+    ap.add_argument("--filters", default=None, help="A `filters` config block as JSON, enforced while parsing.")
+    args = ap.parse_args()
+
+    html = search_page(cards=args.cards, ssr=args.ssr)
+    job_filter = JobFilter.from_config(json.loads(args.filters)) if args.filters else None
+    parser_engine = UpworkJobParser(job_filter=job_filter)
+    jobs = parser_engine._parse_html(html)
+    if job_filter is None:
+        assert len(jobs) == args.cards, f"expected {args.cards} jobs, got {len(jobs)}"
+    else:
+        print(f"filters     kept {len(jobs)}/{args.cards} cards; rejected {parser_engine.stats.rejected}")
+    n = args.cards * args.repeat
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        parser_engine._parse_html(html)
+    elapsed = time.perf_counter() - started
+    print(f"end-to-end  jobs={n} {elapsed:6.2f}s {n / elapsed:8.1f} jobs/s")
+
+    nodes = BeautifulSoup(html, "html.parser").select("li[data-test='job-tile-list-item']")
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for node in nodes:
+            parser_engine._extract_job_from_node(node)
+    elapsed = time.perf_counter() - started
+    print(f"extraction  jobs={n} {elapsed:6.2f}s {n / elapsed:8.1f} jobs/s")
+
+if __name__ == "__main__":
+    main()
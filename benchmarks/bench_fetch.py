@@ -0,0 +1,55 @@
+"""
+Throughput of the (query, page) fetch loop against a local stub server.
+
+    python benchmarks/bench_fetch.py --queries 8 --pages 5 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem  # noqa: E402
+from extractors.job_parser import UpworkJobParser  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+def run(base_url: str, queries: int, pages: int, concurrency: int) -> float:
+    parser_engine = UpworkJobParser(pool_size=concurrency)
+    items = [
+        WorkItem(seq=q * pages + p, query=f"q{q}", page=p + 1, url=f"{base_url}/?q=q{q}&page={p + 1}")
+        for q in range(queries)
+        for p in range(pages)
+    ]
+    fetcher = ConcurrentFetcher(
+        fetch_fn=lambda item, proxies: parser_engine.fetch_and_parse(url=item.url, proxies=proxies),
+        concurrency=concurrency,
+    )
+    started = time.perf_counter()
+    seqs = [item.seq for item, _, error in fetcher.run(items) if error is None]
+    elapsed = time.perf_counter() - started
+    assert seqs == sorted(seqs) and len(seqs) == len(items), "results out of order or missing"
+    return elapsed
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--queries", type=int, default=8)
+    ap.add_argument("--pages", type=int, default=5)
+    ap.add_argument("--latency", type=float, default=0.2, help="Stub server delay per request (s).")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = ap.parse_args()
+
+    total = args.queries * args.pages
+    with StubServer(latency=args.latency) as server:
+        baseline = None
+        for c in args.concurrency:
+            elapsed = run(server.base_url, args.queries, args.pages, c)
+            baseline = baseline or elapsed
+            print(
+                f"concurrency={c:<3d} pages={total:<4d} {elapsed:7.2f}s "
+                f"{total / elapsed:7.1f} pages/s  speedup x{baseline / elapsed:.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Authenticated fetch throughput as identities are added to the session pool.
+The stub server throttles each session to --session-rps and the pool paces
+each identity to 90% of that (arrival jitter would trip an exact match), so
+throughput should grow with the number of identities until concurrency or
+latency is the limit. --signed-out signs that many identities out on the
+server; their requests are retried as the others and no page is lost.
+
+    python benchmarks/bench_identities.py --pages 60 --session-rps 2 --identities 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+from requests.cookies import RequestsCookieJar
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem  # noqa: E402
+from extractors.job_parser import UpworkJobParser  # noqa: E402
+from extractors.rate_control import RateController  # noqa: E402
+from extractors.session_pool import Identity, SessionPool  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+def identity(n: int) -> Identity:
+    # CookieHandler scopes cookies to .upwork.com; the stub needs them sent to any host
+    jar = RequestsCookieJar()
+    jar.set("session", f"acct-{n}")
+    jar.set("token", f"t{n}")
+    return Identity(name=f"acct-{n}", cookies=jar)
+
+def run(srv: StubServer, identities: int, pages: int, concurrency: int, rps: float) -> dict:
+    pool = SessionPool([identity(i) for i in range(identities)], rps=rps, pause=1.0)
+    parser_engine = UpworkJobParser(pool_size=concurrency)
+    items = [WorkItem(seq=p, query="q", page=p + 1, url=f"{srv.base_url}/?q=q&page={p + 1}") for p in range(pages)]
+    fetcher = ConcurrentFetcher(
+        fetch_fn=lambda item, proxies, identity: parser_engine.parse_html(
+            *parser_engine.fetch_page(url=item.url, proxies=proxies, identity=identity)
+        ),
+        concurrency=concurrency,
+        rate_controller=RateController(initial_concurrency=concurrency, max_retries=5, backoff_cap=2.0),
+        session_pool=pool,
+    )
+    throttled = srv.throttled
+    started = time.perf_counter()
+    ok = sum(1 for _, _, error in fetcher.run(items) if error is None)
+    elapsed = time.perf_counter() - started
+    return {
+        "ok": ok,
+        "seconds": elapsed,
+        "throttled": srv.throttled - throttled,
+        "active": pool.active(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=60)
+    ap.add_argument("--latency", type=float, default=0.05, help="Stub server delay per request (s).")
+    ap.add_argument("--session-rps", type=float, default=2.0, help="Requests per second the server allows a session.")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--identities", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--signed-out", type=int, default=0, help="Identities the server has signed out.")
+    args = ap.parse_args()
+
+    print(f"{'identities':>10} {'active':>7} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'429s':>5}")
+    for n in args.identities:
+        signed_out = [f"acct-{i}" for i in range(min(args.signed_out, n - 1))]
+        with StubServer(latency=args.latency, session_rps=args.session_rps, signed_out=signed_out) as srv:
+            r = run(srv, n, args.pages, args.concurrency, 0.9 * args.session_rps)
+        assert r["ok"] == args.pages, f"{n} identities: {r['ok']} of {args.pages} pages fetched"
+        print(
+            f"{n:>10} {r['active']:>7} {r['ok']:>6} {r['seconds']:>8.2f} "
+            f"{r['ok'] / r['seconds']:>8.1f} {r['throttled']:>5}"
+        )
+
+if __name__ == "__main__":
+    main()
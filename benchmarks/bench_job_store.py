@@ -0,0 +1,104 @@
+"""
+Load and query speed of the SQLite job store. Synthetic jobs (spread over a
+year of posting times) are upserted page by page, then a second pass re-sees
+a slice of them to time in-place updates, and a set of typical searches is
+timed against the full store.
+
+    python benchmarks/bench_job_store.py --jobs 1000000 --page 50 [--db /tmp/jobs.sqlite3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import raw_job  # noqa: E402
+from extractors.ssr_state import map_job  # noqa: E402
+from output.job_store import JobStore  # noqa: E402
+from utils.normalize import normalize_jobs  # noqa: E402
+
+QUERIES = [
+    "python scraping", "react developer", "data entry", "shopify store", "machine learning",
+    "wordpress plugin", "mobile app", "excel automation", "seo audit", "video editing",
+]
+
+SEARCHES = [
+    ("job id", {}),
+    ("title word", {"text": "shopify"}),
+    ("two title words", {"text": "machine learning"}),
+    ("skill", {"skills": ["Scrapy"]}),
+    ("skill + country", {"skills": ["Django"], "country": "Germany"}),
+    ("hourly >= $50", {"payment_type": "hourly", "budget_min": 50}),
+    ("fixed <= $500, expert", {"payment_type": "fixed", "budget_max": 500, "experience": "expert"}),
+    ("last 24h", {"posted_after": 86400}),
+    ("text + skill + 7d", {"text": "python", "skills": ["Selenium"], "posted_after": 7 * 86400}),
+]
+
+def pages(n: int, page: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for start in range(0, n, page):
+        batch = []
+        for job_id in range(start, min(start + page, n)):
+            job = map_job(raw_job(rng, 10_000_000 + job_id, rng.choice(QUERIES), desc_words=12))
+            job["Time Posted"] = (now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))).isoformat()
+            batch.append(job)
+        yield normalize_jobs(batch, time.time())
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=200_000)
+    ap.add_argument("--page", type=int, default=50, help="Jobs per upsert transaction (one search page).")
+    ap.add_argument("--update", type=float, default=0.1, help="Fraction of jobs seen again in the second pass.")
+    ap.add_argument("--repeat", type=int, default=20, help="Runs per search; the median is reported.")
+    ap.add_argument("--db", default=None, help="Store path (default: a temporary file).")
+    args = ap.parse_args()
+
+    tmp = None
+    if args.db is None:
+        tmp = tempfile.TemporaryDirectory()
+        args.db = os.path.join(tmp.name, "jobs.sqlite3")
+
+    with JobStore(args.db) as store:
+        started = time.perf_counter()
+        for batch in pages(args.jobs, args.page, seed=1):
+            store.write(batch)
+        elapsed = time.perf_counter() - started
+        print(f"insert  jobs={store.inserted} {elapsed:7.2f}s {store.inserted / elapsed:9.0f} jobs/s")
+
+        again = int(args.jobs * args.update)
+        started = time.perf_counter()
+        for batch in pages(again, args.page, seed=1):
+            store.write(batch)
+        elapsed = time.perf_counter() - started
+        print(f"update  jobs={store.updated} {elapsed:7.2f}s {max(store.updated, 1) / elapsed:9.0f} jobs/s")
+        assert len(store) == args.jobs, f"expected {args.jobs} rows, got {len(store)}"
+        store.sync()
+        print(f"store   {os.path.getsize(args.db) / 2**20:.1f} MiB")
+
+        now = time.time()
+        for name, query in SEARCHES:
+            timings = []
+            for i in range(args.repeat):
+                started = time.perf_counter()
+                if name == "job id":
+                    hits = [store.get(f"0{10_000_000 + (i * 7919) % args.jobs}")]
+                else:
+                    params = dict(query)
+                    if "posted_after" in params:
+                        params["posted_after"] = now - params["posted_after"]
+                    hits = store.search(limit=100, **params)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            print(f"search  {name:<24} hits={len(hits):>3} median {timings[len(timings) // 2] * 1000:7.2f} ms"
+                  f"  max {timings[-1] * 1000:7.2f} ms")
+    if tmp is not None:
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
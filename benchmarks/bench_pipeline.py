@@ -0,0 +1,63 @@
+"""
+Inline parsing vs. the process-pool parse stage, on a parse-heavy workload.
+
+Fetch threads share the GIL with inline parsing; with parse workers they only
+do I/O. Prints pages/s and per-stage utilization for each configuration.
+
+    python benchmarks/bench_pipeline.py --pages 200 --cards 50 --backend html.parser --workers 0 2 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import search_page  # noqa: E402
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem  # noqa: E402
+from extractors.job_parser import UpworkJobParser  # noqa: E402
+from extractors.parse_pool import ParsePipeline  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+def run(base_url: str, pages: int, concurrency: int, workers: int, backend: str) -> str:
+    parser_engine = UpworkJobParser(pool_size=concurrency, html_backend=backend)
+    items = [WorkItem(seq=i, query="q", page=i + 1, url=f"{base_url}/?q=q&page={i + 1}") for i in range(pages)]
+    fetch_fn = parser_engine.fetch_page if workers else parser_engine.fetch_and_parse
+    fetcher = ConcurrentFetcher(
+        fetch_fn=lambda item, proxies: fetch_fn(url=item.url, proxies=proxies),
+        concurrency=concurrency,
+    )
+    pipeline = ParsePipeline(fetcher, parser_engine, workers=workers) if workers else None
+    started = time.perf_counter()
+    results = pipeline.run(items) if pipeline else fetcher.run(items)
+    jobs = 0
+    for item, batch, error in results:
+        assert error is None, error
+        jobs += len(batch)
+    elapsed = time.perf_counter() - started
+    line = f"workers={workers:<3d} {elapsed:7.2f}s {pages / elapsed:7.1f} pages/s {jobs / elapsed:8.0f} jobs/s"
+    if pipeline:
+        ps = pipeline.stats
+        line += (
+            f"  fetch {ps.fetch.utilization(ps.wall):4.0%} busy, parse {ps.parse.utilization(ps.wall):4.0%} busy,"
+            f" peak queue {ps.max_queue_depth}"
+        )
+    return line
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=200)
+    ap.add_argument("--cards", type=int, default=50, help="Job cards per page.")
+    ap.add_argument("--latency", type=float, default=0.02, help="Stub server delay per request (s).")
+    ap.add_argument("--concurrency", type=int, default=8, help="Fetch threads.")
+    ap.add_argument("--backend", default="html.parser")
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4], help="Parse processes; 0 = inline.")
+    args = ap.parse_args()
+
+    with StubServer(latency=args.latency, page_fn=lambda q, p: search_page(q, p, cards=args.cards)) as server:
+        for workers in args.workers:
+            print(run(server.base_url, args.pages, args.concurrency, workers, args.backend))
+
+if __name__ == "__main__":
+    main()
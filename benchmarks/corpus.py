@@ -0,0 +1,159 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+SKILLS = [
+    "Python", "Scrapy", "Selenium", "Data Extraction", "Web Scraping", "React", "Node.js",
+    "PostgreSQL", "Machine Learning", "Microsoft Excel", "API Integration", "Django",
+]
+COUNTRIES = ["United States", "United Kingdom", "Canada", "Germany", "India", "Australia"]
+LEVELS = ["Entry level", "Intermediate", "Expert"]
+DURATIONS = ["Less than 1 month", "1 to 3 months", "3 to 6 months", "More than 6 months"]
+WORKLOADS = ["Less than 30 hrs/week", "30+ hrs/week"]
+WORDS = (
+    "we need an experienced developer to build and maintain a reliable pipeline that collects "
+    "structured listings from several public websites cleans the records and delivers daily exports"
+).split()
+
+def _description(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def raw_job(rng: random.Random, job_id: int, query: str, desc_words: int = 60) -> Dict[str, Any]:
+    """A job object shaped like the ones in Upwork's embedded search state."""
+    hourly = rng.random() < 0.6
+    lo = rng.randint(5, 60)
+    hours_ago = rng.randint(1, 23)
+    published = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours_ago)
+    return {
+        "uid": str(job_id),
+        "ciphertext": f"~01{job_id}",
+        "title": f"{query.title()} project #{job_id}",
+        "description": _description(rng, desc_words),
+        "hoursAgo": hours_ago,
+        "publishedOn": published.isoformat().replace("+00:00", "Z"),
+        "type": 2 if hourly else 1,
+        "hourlyBudget": {"min": float(lo), "max": float(lo + rng.randint(5, 40))} if hourly else {"min": 0, "max": 0},
+        "amount": {"amount": 0.0 if hourly else float(rng.randint(50, 5000))},
+        "tier": rng.randint(1, 3),
+        "attrs": [{"prettyName": s} for s in rng.sample(SKILLS, 4)],
+        "durationLabel": rng.choice(DURATIONS),
+        "engagement": rng.choice(WORKLOADS),
+        "totalApplicants": rng.randint(0, 50),
+        "client": {
+            "location": {"country": rng.choice(COUNTRIES)},
+            "totalSpent": round(rng.uniform(0, 50_000), 2),
+            "totalFeedback": round(rng.uniform(3, 5), 2),
+        },
+    }
+
+def job_card(job: Dict[str, Any], query: str) -> str:
+    if job["type"] == 2:
+        budget = f"${job['hourlyBudget']['min']:.2f} - ${job['hourlyBudget']['max']:.2f}"
+        kind = "Hourly"
+    else:
+        budget = f"${job['amount']['amount']:,.0f}"
+        kind = "Fixed Price"
+    skills = "".join(f"<span data-test='token'>{a['prettyName']}</span>" for a in job["attrs"])
+    client = job["client"]
+    return (
+        "<li data-test='job-tile-list-item'><article>"
+        f"<small data-test='job-pubilshed-date'>Posted {job['hoursAgo']} hours ago</small>"
+        f"<h2><a data-test='job-tile-title' href='/jobs/{query.replace(' ', '-')}_{job['ciphertext']}/'>"
+        f"{job['title']}</a></h2>"
+        f"<ul><li data-test='job-type'>{kind}: {budget}</li>"
+        f"<li data-test='experience-level'>{LEVELS[job['tier'] - 1]}</li></ul>"
+        f"<p data-test='job-description-text'>{job['description']}</p>"
+        f"<div>{skills}</div>"
+        f"<div><span>Payment verified</span><span>{client['totalFeedback']:.2f} / 5</span>"
+        f"<span>{client['location']['country']}</span><span>Proposals: {job['totalApplicants']}</span></div>"
+        "</article></li>"
+    )
+
+def devalue(root: Any) -> List[Any]:
+    """Encode `root` in Nuxt 3's devalue layout: a flat array of values referencing each other by index."""
+    payload: List[Any] = []
+
+    def add(value: Any) -> int:
+        idx = len(payload)
+        payload.append(None)
+        if isinstance(value, dict):
+            payload[idx] = {k: add(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            payload[idx] = [add(v) for v in value]
+        else:
+            payload[idx] = value
+        return idx
+
+    add(root)
+    return payload
+
+def nuxt_state_script(jobs: List[Dict[str, Any]]) -> str:
+    payload = devalue({"data": {}, "state": {"jobsSearch": {"jobs": jobs, "paging": {"total": len(jobs)}}}})
+    # Nuxt wraps reactive store modules; exercise that path too
+    payload.append(["ShallowReactive", 2])
+    payload[0]["state"] = len(payload) - 1
+    return f"<script type='application/json' id='__NUXT_DATA__'>{json.dumps(payload)}</script>"
+
+def search_page(
+    query: str = "web scraping",
+    page: int = 1,
+    cards: int = 10,
+    seed: int = 0,
+    ssr: bool = False,
+    markup: str = "list",
+    nesting: int = 1,
+) -> str:
+    """
+    Search-results page. markup="list" uses the `data-test='job-tile-list'`
+    markup; markup="cards" strips those hooks so the parser falls back to
+    generic cards, each wrapped in `nesting` <section> levels (the wrappers
+    the parser must collapse to one card per job).
+    With `ssr=True` the same jobs are also embedded as a `__NUXT_DATA__` state blob.
+    """
+    rng = random.Random(f"{seed}:{query}:{page}")
+    jobs = [raw_job(rng, 10_000_000_000 + page * 1000 + i, query) for i in range(cards)]
+    state = nuxt_state_script(jobs) if ssr else ""
+    tiles = "".join(job_card(j, query) for j in jobs)
+    listing = "<ul data-test='job-tile-list'>" + tiles + "</ul>"
+    if markup == "cards":
+        listing = listing.replace("data-test='job-tile-list'", "class='results'")
+        listing = listing.replace("data-test='job-tile-list-item'", "class='tile'")
+        listing = listing.replace("<article>", "<section>" * nesting + "<article>")
+        listing = listing.replace("</article>", "</article>" + "</section>" * nesting)
+    elif markup != "list":
+        raise ValueError(f"Unknown markup: {markup!r} (expected 'list' or 'cards')")
+    return (
+        "<!DOCTYPE html><html><head><title>Upwork</title></head><body>"
+        "<header><nav><a href='/nx/find-work/'>Find work</a></nav></header>"
+        "<main><section>" + listing + "</section></main><footer><p>© Upwork</p></footer>" + state + "</body></html>"
+    )
+
+def detail_page(job_key: str, seed: int = 0, ssr: bool = False) -> str:
+    """
+    A job's own page: the client's total spend, project length and weekly hours
+    in the visible markup, and with `ssr=True` also in a `__NUXT_DATA__` blob.
+    """
+    rng = random.Random(f"{seed}:detail:{job_key}")
+    duration = rng.choice(DURATIONS)
+    workload = rng.choice(WORKLOADS)
+    spent = rng.choice([f"${rng.randint(1, 900)}", f"${rng.randint(1, 99)}K+", f"${rng.randint(1, 9)}M+"])
+    state = ""
+    if ssr:
+        payload = devalue({"state": {"jobDetails": {"job": {
+            "engagementDuration": {"label": duration, "weeks": 12},
+            "workload": workload,
+        }, "buyer": {"stats": {"totalCharges": {"amount": float(rng.randint(100, 90_000))}}}}}})
+        state = f"<script type='application/json' id='__NUXT_DATA__'>{json.dumps(payload)}</script>"
+    return (
+        "<!DOCTYPE html><html><head><title>Job details</title></head><body><main>"
+        f"<h1>Job {job_key}</h1><section data-test='description'><p>{_description(rng, 40)}</p></section>"
+        "<ul class='features'>"
+        f"<li data-test='workload'><strong>{workload}</strong><small>Hourly</small></li>"
+        f"<li data-test='duration'><strong>{duration}</strong><small>Project Length</small></li>"
+        "</ul>"
+        "<section data-test='about-client-container'><ul>"
+        "<li>Payment method verified</li>"
+        f"<li data-qa='client-spend'><strong>{spent}</strong> total spent</li>"
+        "</ul></section></main>" + state + "</body></html>"
+    )
@@ -0,0 +1,285 @@
+"""
+End-to-end benchmark suite: page parsing (list markup, nested fallback cards,
+embedded state), card extraction, every output format, search URL building,
+and a full main() run against the local stub server with latency and 429s.
+
+Results go to a JSON file stamped with the git commit and the parameters, so
+runs on different commits can be compared; --compare prints the change per
+metric and exits non-zero when any regressed by more than --tolerance.
+
+    python benchmarks/run_suite.py                      # -> benchmarks/results/<commit>.json
+    python benchmarks/run_suite.py --quick --compare benchmarks/results/<base>.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import filters.query_builder as query_builder  # noqa: E402
+from bench_export import records  # noqa: E402
+from corpus import search_page  # noqa: E402
+from extractors.html_backend import available_backends  # noqa: E402
+from extractors.job_parser import UpworkJobParser  # noqa: E402
+from output.data_exporter import SINKS, read_records  # noqa: E402
+from output.columnar import pq  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+URL_FILTERS = {
+    "experience": ["entry", "intermediate"],
+    "payment_type": ["hourly"],
+    "hours_per_week": "less_than_30",
+    "budget_min": 20,
+    "budget_max": 80,
+}
+
+class Results:
+    """Metrics by name; `better` says which direction is an improvement."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, value: float, unit: str, better: str = "higher") -> None:
+        self.metrics[name] = {"value": round(value, 6), "unit": unit, "better": better}
+        print(f"  {name:<32} {value:12.3f} {unit}")
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Fastest of `repeat` timed calls; the minimum is the least noisy estimate on a shared machine."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def bench_parse(res: Results, pages: int, cards: int, repeat: int) -> None:
+    print("parse")
+    parser_engine = UpworkJobParser()
+    variants = {
+        "list": {},
+        "cards": {"markup": "cards", "nesting": 3},
+        "ssr": {"ssr": True},
+    }
+    for name, options in variants.items():
+        docs = [search_page(page=p, cards=cards, **options) for p in range(1, pages + 1)]
+        jobs = sum(len(parser_engine._parse_html(html)) for html in docs)
+        assert jobs == pages * cards, f"parse.{name}: {jobs} jobs from {pages * cards} cards"
+        seconds = best_of(repeat, lambda: [parser_engine._parse_html(html) for html in docs])
+        res.add(f"parse.{name}.pages_per_sec", pages / seconds, "pages/s")
+        res.add(f"parse.{name}.jobs_per_sec", jobs / seconds, "jobs/s")
+
+def bench_extract(res: Results, cards: int, repeat: int) -> None:
+    print("extract")
+    parser_engine = UpworkJobParser()
+    nodes = BeautifulSoup(search_page(cards=cards), "html.parser").select("li[data-test='job-tile-list-item']")
+    seconds = best_of(repeat, lambda: [parser_engine._extract_job_from_node(node) for node in nodes])
+    res.add("extract.jobs_per_sec", len(nodes) / seconds, "jobs/s")
+
+def bench_export(res: Results, jobs: int, page: int) -> None:
+    print("export")
+    rows = records(jobs)
+    pages = [rows[i:i + page] for i in range(0, len(rows), page)]
+    formats = [fmt for fmt in SINKS if fmt != "sqlite" and (fmt != "parquet" or pq is not None)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            path = os.path.join(tmp, f"out.{fmt}")
+            started = time.perf_counter()
+            with SINKS[fmt](path) as sink:
+                for chunk in pages:
+                    sink.write(chunk)
+            write = time.perf_counter() - started
+            started = time.perf_counter()
+            n = sum(1 for _ in read_records(fmt, path))
+            reload = time.perf_counter() - started
+            assert n == len(rows), f"export.{fmt}: read back {n} of {len(rows)} records"
+            res.add(f"export.{fmt}.write_sec", write, "s", "lower")
+            res.add(f"export.{fmt}.reload_sec", reload, "s", "lower")
+            res.add(f"export.{fmt}.size_mib", os.path.getsize(path) / 2**20, "MiB", "lower")
+
+def bench_urls(res: Results, count: int, repeat: int) -> None:
+    print("urls")
+    seconds = best_of(
+        repeat,
+        lambda: [query_builder.build_search_url("python scraping", i % 10 + 1, 50, URL_FILTERS) for i in range(count)],
+    )
+    res.add("urls.per_sec", count / seconds, "urls/s")
+
+def bench_pipeline(
+    res: Results, queries: int, pages: int, cards: int, latency: float, throttle: float, parse_workers: int
+) -> None:
+    print("pipeline")
+    with tempfile.TemporaryDirectory() as tmp, StubServer(
+        latency=latency,
+        throttle_rate=throttle,
+        retry_after=0,
+        page_fn=lambda q, p: search_page(q, p, cards=cards),
+    ) as srv:
+        config = {
+            "queries": [f"benchmark query {i}" for i in range(queries)],
+            "pages": pages,
+            "per_page": cards,
+            "concurrency": 4,
+            "parse_workers": parse_workers,
+            "output_formats": ["jsonl"],
+            "rate_limit": {"max_retries": 5},
+        }
+        config_path = os.path.join(tmp, "input.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        original_base = query_builder.UPWORK_SEARCH_BASE
+        query_builder.UPWORK_SEARCH_BASE = srv.base_url + "/nx/search/jobs/"
+        argv = sys.argv
+        log = io.StringIO()
+        import main as scraper
+
+        try:
+            sys.argv = ["main", "--input", config_path, "--outdir", os.path.join(tmp, "out")]
+            started = time.perf_counter()
+            # main() logs to stdout; keep it out of the report
+            with contextlib.redirect_stdout(log):
+                scraper.main()
+            wall = time.perf_counter() - started
+        except BaseException:
+            print(log.getvalue()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            sys.argv = argv
+            query_builder.UPWORK_SEARCH_BASE = original_base
+        out_dir = os.path.join(tmp, "out")
+        written = sum(
+            sum(1 for _ in read_records("jsonl", os.path.join(out_dir, name)))
+            for name in os.listdir(out_dir)
+            if name.startswith("upwork_jobs_") and name.endswith(".jsonl")
+        )
+    expected = queries * pages * cards
+    assert written == expected, f"pipeline: wrote {written} of {expected} jobs"
+    res.add("pipeline.wall_sec", wall, "s", "lower")
+    res.add("pipeline.pages_per_sec", queries * pages / wall, "pages/s")
+    res.add("pipeline.jobs_per_sec", written / wall, "jobs/s")
+    res.add("pipeline.requests", srv.requests, "requests", "lower")
+    res.add("pipeline.throttled", srv.throttled, "responses", "lower")
+
+def git_revision() -> Dict[str, Any]:
+    root = os.path.join(os.path.dirname(__file__), "..")
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print each metric's change against `baseline`; return the names that got worse by more than `tolerance`."""
+    regressions = []
+    base = baseline.get("metrics", {})
+    print(f"\ncompared with {(baseline.get('git') or {}).get('commit') or 'baseline'}")
+    for name, metric in current["metrics"].items():
+        if name not in base or not base[name]["value"]:
+            continue
+        change = metric["value"] / base[name]["value"] - 1
+        worse = -change if metric["better"] == "higher" else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"  {name:<32} {base[name]['value']:12.3f} -> {metric['value']:12.3f} {change:+8.1%} {flag}")
+    return regressions
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--quick", action="store_true", help="Small sizes, for a fast smoke run.")
+    ap.add_argument("--only", nargs="+", choices=["parse", "extract", "export", "urls", "pipeline"], default=None)
+    ap.add_argument("--pages", type=int, default=None, help="Pages per parse variant.")
+    ap.add_argument("--cards", type=int, default=50, help="Job cards per page.")
+    ap.add_argument("--repeat", type=int, default=None, help="Timed runs per measurement; the fastest counts.")
+    ap.add_argument("--export-jobs", type=int, default=None)
+    ap.add_argument("--latency", type=float, default=0.05, help="Stub server delay per response (s).")
+    ap.add_argument("--throttle", type=float, default=0.05, help="Fraction of stub responses that are 429.")
+    ap.add_argument("--parse-workers", type=int, default=0, help="parse_workers for the main() run.")
+    ap.add_argument("--out", default=None, help="Results file (default: benchmarks/results/<commit>.json).")
+    ap.add_argument("--compare", default=None, help="Earlier results file to compare against.")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="Relative slowdown reported as a regression.")
+    args = ap.parse_args()
+
+    pages = args.pages or (5 if args.quick else 40)
+    repeat = args.repeat or (2 if args.quick else 5)
+    export_jobs = args.export_jobs or (2_000 if args.quick else 20_000)
+    pipeline = {"queries": 2, "pages": 3} if args.quick else {"queries": 4, "pages": 10}
+    only = set(args.only or ["parse", "extract", "export", "urls", "pipeline"])
+
+    res = Results()
+    started = time.perf_counter()
+    if "parse" in only:
+        bench_parse(res, pages, args.cards, repeat)
+    if "extract" in only:
+        bench_extract(res, args.cards, repeat * 4)
+    if "export" in only:
+        bench_export(res, export_jobs, args.cards)
+    if "urls" in only:
+        bench_urls(res, 2_000 if args.quick else 20_000, repeat)
+    if "pipeline" in only:
+        bench_pipeline(
+            res, pipeline["queries"], pipeline["pages"], args.cards, args.latency, args.throttle, args.parse_workers
+        )
+
+    report = {
+        "suite": "upwork-job-scraper",
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "html_backends": available_backends(),
+        "parameters": {
+            "quick": args.quick,
+            "pages": pages,
+            "cards": args.cards,
+            "repeat": repeat,
+            "export_jobs": export_jobs,
+            "latency": args.latency,
+            "throttle": args.throttle,
+            "parse_workers": args.parse_workers,
+            **{f"pipeline_{k}": v for k, v in pipeline.items()},
+        },
+        "seconds": round(time.perf_counter() - started, 3),
+        "metrics": res.metrics,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{(report['git']['commit'] or 'unknown')[:12]}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults -> {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline: Optional[Dict[str, Any]] = json.load(f)
+        if baseline.get("parameters") != report["parameters"]:
+            print("note: baseline was run with different parameters", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
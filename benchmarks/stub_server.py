@@ -0,0 +1,144 @@
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+def default_page(query: str, page: int, per_page: int = 10) -> str:
+    cards = []
+    for i in range(per_page):
+        job_id = 10_000_000 + page * 1000 + i
+        cards.append(
+            "<li data-test='job-tile-list-item'>"
+            f"<h2><a data-test='job-tile-title' href='/jobs/~0{job_id}'>{query} job {page}-{i}</a></h2>"
+            "<small>Hourly: $15.00 - $40.00 · Intermediate · Posted 3 hours ago</small>"
+            f"<p data-test='job-description-text'>Need help with {query}.</p>"
+            "<span data-test='token'>Python</span><span data-test='token'>Scrapy</span>"
+            "<span>Proposals: 5</span><span>United States</span><span>4.8 / 5</span>"
+            "</li>"
+        )
+    return "<html><body><ul data-test='job-tile-list'>" + "".join(cards) + "</ul></body></html>"
+
+class StubServer:
+    """
+    Local HTTP server standing in for the Upwork search endpoint.
+    Every response is delayed by `latency` seconds to mimic a remote round trip.
+    With `etag=True` pages carry an ETag and matching conditional requests get 304.
+    `throttle_rate` is the fraction of requests answered 429 with `Retry-After: retry_after`.
+    Paths under /jobs/ are job detail pages, served by `detail_fn(job_key)` when given.
+    Requests are told apart by their `session` cookie: with `session_rps`, a session
+    asking faster than that gets a 429, and sessions in `signed_out` are redirected to the login page.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        page_fn: Optional[Callable[[str, int], str]] = None,
+        etag: bool = False,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+        detail_fn: Optional[Callable[[str], str]] = None,
+        session_rps: float = 0.0,
+        signed_out: Iterable[str] = (),
+    ):
+        self.session_rps = session_rps
+        self.signed_out = set(signed_out)
+        self.sessions: Dict[str, int] = {}
+        self._session_last: Dict[str, float] = {}
+        self.detail_fn = detail_fn
+        self.detail_requests = 0
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self.latency = latency
+        self.page_fn = page_fn or default_page
+        self.etag = etag
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                cookie = SimpleCookie(self.headers.get("Cookie", ""))
+                session = cookie["session"].value if "session" in cookie else ""
+                if session in stub.signed_out and not self.path.startswith("/ab/account-security/login"):
+                    self.send_response(302)
+                    self.send_header("Location", "/ab/account-security/login")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                with stub._lock:
+                    stub.requests += 1
+                    stub.sessions[session] = stub.sessions.get(session, 0) + 1
+                    throttle = stub._rng.random() < stub.throttle_rate
+                    if stub.session_rps and not throttle:
+                        now = time.monotonic()
+                        throttle = now - stub._session_last.get(session, float("-inf")) < 1.0 / stub.session_rps
+                        if not throttle:
+                            stub._session_last[session] = now
+                    if throttle:
+                        stub.throttled += 1
+                if throttle:
+                    self.send_response(429)
+                    self.send_header("Retry-After", str(stub.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if stub.latency:
+                    time.sleep(stub.latency)
+                url = urlparse(self.path)
+                if stub.detail_fn is not None and url.path.startswith("/jobs/"):
+                    with stub._lock:
+                        stub.detail_requests += 1
+                    body = stub.detail_fn(url.path.rstrip("/").rsplit("/", 1)[-1]).encode("utf-8")
+                else:
+                    params = parse_qs(url.query)
+                    query = params.get("q", ["jobs"])[0]
+                    page = int(params.get("page", ["1"])[0])
+                    body = stub.page_fn(query, page).encode("utf-8")
+                tag = f'"{hashlib.md5(body).hexdigest()}"' if stub.etag else None
+                if tag and self.headers.get("If-None-Match") == tag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", tag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if tag:
+                    self.send_header("ETag", tag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "StubServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
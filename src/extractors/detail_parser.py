@@ -0,0 +1,94 @@
+import html as html_lib
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from extractors.ssr_state import format_money, get_path, iter_state_blobs
+
+logger = logging.getLogger("detail_parser")
+
+# Fields the search results page does not carry; only a job's own page has them
+DETAIL_FIELDS = ("Total Spent", "Project Length", "Weekly Hours")
+
+DURATION_RE = re.compile(
+    r"\b(Less than (?:a|1) month|1 to 3 months|3 to 6 months|More than 6 months|\d+\s*(?:-|to)\s*\d+\s*months)\b",
+    re.IGNORECASE,
+)
+WORKLOAD_RE = re.compile(
+    r"(Less than 30 hrs/week|More than 30 hrs/week|30\+ hrs/week|Hours to be determined|\d+\s*-\s*\d+\s*hrs/week)",
+    re.IGNORECASE,
+)
+SPENT_RE = re.compile(r"(\$\s?\d[\d,]*(?:\.\d+)?[KkMm]?\+?)\s*(?:total\s+)?spent", re.IGNORECASE)
+_TAG_RE = re.compile(r"<(script|style|template)\b.*?</\1\s*>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+_SPACE_RE = re.compile(r"\s+")
+
+# Key names the job detail state uses for each field, most specific first
+_STATE_KEYS = {
+    "Project Length": ("engagementDuration", "durationLabel", "duration"),
+    "Weekly Hours": ("workload", "engagement"),
+    "Total Spent": ("totalCharges", "totalSpent"),
+}
+
+def _find_key(state: Any, key: str, max_nodes: int = 50_000) -> Any:
+    """Value of the shallowest `key` anywhere in the state document."""
+    queue = [state]
+    seen = 0
+    while queue and seen < max_nodes:
+        nxt = []
+        for obj in queue:
+            seen += 1
+            if isinstance(obj, dict):
+                value = obj.get(key)
+                if value not in (None, "", [], {}):
+                    return value
+                nxt.extend(v for v in obj.values() if isinstance(v, (dict, list)))
+            elif isinstance(obj, list):
+                nxt.extend(o for o in obj if isinstance(o, (dict, list)))
+        queue = nxt
+    return None
+
+def _state_value(field: str, value: Any) -> str:
+    if field == "Total Spent":
+        amount = get_path(value, "amount", "rawValue") if isinstance(value, dict) else value
+        return format_money(amount) if amount is not None else ""
+    if isinstance(value, dict):
+        value = get_path(value, "label", "name", "text")
+    return str(value).strip() if isinstance(value, (str, int, float)) else ""
+
+def _from_state(page: str) -> Dict[str, str]:
+    fields: Dict[str, str] = {}
+    for state in iter_state_blobs(page):
+        for field, keys in _STATE_KEYS.items():
+            if fields.get(field):
+                continue
+            for key in keys:
+                value = _state_value(field, _find_key(state, key))
+                if value:
+                    fields[field] = value
+                    break
+    return fields
+
+def _first(pattern: re.Pattern, text: str) -> Optional[str]:
+    m = pattern.search(text)
+    return _SPACE_RE.sub(" ", m.group(1)).strip() if m else None
+
+def parse_job_detail(page: str) -> Dict[str, str]:
+    """
+    Total Spent, Project Length and Weekly Hours from a job's detail page.
+    The embedded state JSON is used when present; missing fields fall back to
+    the page's visible text. Fields that cannot be found are left out.
+    """
+    fields = _from_state(page)
+    if all(fields.get(f) for f in DETAIL_FIELDS):
+        return fields
+    text = _SPACE_RE.sub(" ", html_lib.unescape(_TAG_RE.sub(" ", page)))
+    for field, pattern in (
+        ("Project Length", DURATION_RE),
+        ("Weekly Hours", WORKLOAD_RE),
+        ("Total Spent", SPENT_RE),
+    ):
+        if not fields.get(field):
+            value = _first(pattern, text)
+            if value:
+                fields[field] = value.replace("$ ", "$")
+    return fields
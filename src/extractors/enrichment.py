@@ -0,0 +1,195 @@
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from extractors.detail_parser import DETAIL_FIELDS
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
+
+logger = logging.getLogger("enrichment")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS enriched_jobs (
+    job_id      TEXT PRIMARY KEY,
+    fields      TEXT NOT NULL,
+    enriched_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Priority tiers: a job the writer is blocked on jumps ahead of everything queued
+URGENT, NORMAL = 0, 1
+
+class EnrichmentStore:
+    """Detail fields already fetched, keyed by Job ID, so later runs skip those pages."""
+
+    def __init__(self, path: str, ttl: float = 86400):
+        self.path = path
+        self.ttl = ttl
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        # Enrichment workers share the connection; the lock serializes them
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, job_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields, enriched_at FROM enriched_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+        return json.loads(row[0])
+
+    def put(self, job_id: str, fields: Dict[str, str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO enriched_jobs (job_id, fields, enriched_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(fields, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+@dataclass
+class EnrichStats:
+    submitted: int = 0
+    complete: int = 0  # already had every detail field (e.g. from the embedded state)
+    cached: int = 0
+    fetched: int = 0
+    failed: int = 0
+    expired: int = 0  # still queued when the time budget ran out; written without details
+    busy: float = 0.0  # seconds spent fetching, summed over workers
+
+class DetailEnricher:
+    """
+    Fetches job detail pages for the fields search results lack, on its own
+    pool of `workers` threads fed from a priority queue.
+
+    Requests go through `fetcher.fetch_one`, so they share the search phase's
+    sessions, proxy health scores, rate limits and retry policy. A job whose detail
+    fields are already present, stored, or being fetched is not requested
+    again. Each job gets a Future that resolves to the fields found, or an
+    empty dict on failure.
+    """
+
+    def __init__(
+        self,
+        fetcher: ConcurrentFetcher,
+        workers: int = 4,
+        store: Optional[EnrichmentStore] = None,
+    ):
+        self.fetcher = fetcher
+        self.workers = max(1, int(workers))
+        self.store = store
+        self.stats = EnrichStats()
+        self._queue: List[Tuple[int, int, Future, WorkItem, str]] = []
+        self._inflight: Dict[str, Future] = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"enrich-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, job: Dict[str, Any]) -> Optional[Future]:
+        """Queue `job` for enrichment; None when there is nothing to fetch."""
+        if all(job.get(f) for f in DETAIL_FIELDS):
+            self.stats.complete += 1
+            return None
+        job_id = str(job.get("Job ID") or "")
+        url = job.get("URL") or ""
+        if not url:
+            return None
+        key = job_id or url
+        with self._cond:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            self.stats.submitted += 1
+            future = Future()
+            cached = self.store.get(job_id) if self.store is not None and job_id else None
+            if cached is not None:
+                self.stats.cached += 1
+                future.set_result(cached)
+                return future
+            self._inflight[key] = future
+            future.add_done_callback(lambda _, k=key: self._forget(k))
+            item = WorkItem(seq=self._seq, query=job.get("Query") or "", page=0, url=url)
+            heapq.heappush(self._queue, (NORMAL, self._seq, future, item, job_id))
+            self._seq += 1
+            self._cond.notify()
+        return future
+
+    def _forget(self, key: str) -> None:
+        with self._cond:
+            self._inflight.pop(key, None)
+
+    def prioritize(self, future: Future) -> None:
+        """Move a queued job to the front; the stale queue entry is skipped later."""
+        with self._cond:
+            for _, seq, queued, item, job_id in self._queue:
+                if queued is future:
+                    heapq.heappush(self._queue, (URGENT, seq, future, item, job_id))
+                    self._cond.notify()
+                    return
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                _, _, future, item, job_id = heapq.heappop(self._queue)
+                # Duplicate (prioritized) entries and cancelled jobs are dropped here
+                if future.done() or future.running() or not future.set_running_or_notify_cancel():
+                    continue
+            started = time.monotonic()
+            try:
+                result = self.fetcher.fetch_one(item)
+                error = result[2] if result is not None else None
+                fields = {k: v for k, v in (result[1] or {}).items() if v} if result and error is None else {}
+            except Exception as e:  # never leave the writer waiting on this job
+                error, fields = e, {}
+            with self._cond:
+                self.stats.busy += time.monotonic() - started
+                if error is not None:
+                    self.stats.failed += 1
+                else:
+                    self.stats.fetched += 1
+            if error is not None:
+                logger.warning("Detail page %s failed: %s", item.url, error)
+            elif self.store is not None and job_id:
+                self.store.put(job_id, fields)
+            future.set_result(fields)
+
+    def expire(self) -> int:
+        """Give up on every job not started yet (time budget spent); returns how many."""
+        with self._cond:
+            queued, self._queue = self._queue, []
+        expired = sum(1 for entry in queued if entry[2].cancel())
+        self.stats.expired += expired
+        return expired
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for entry in self._queue:
+                entry[2].cancel()
+            self._queue.clear()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from extractors.proxy_manager import ProxyManager
+from extractors.rate_control import RateController
+from extractors.session_pool import IdentitySignedOut, SessionPool
+
+logger = logging.getLogger("fetch_engine")
+
+# Answers that mean the exit IP is being throttled or blocked
+BAN_STATUSES = (403, 429)
+
+@dataclass(frozen=True)
+class WorkItem:
+    """One (query, page) unit of work. `seq` fixes its position in the output order."""
+    seq: int
+    query: str
+    page: int
+    url: str
+
+# fetch_fn(item, proxies) returns either parsed jobs or, when parsing runs in a separate stage, raw HTML;
+# with a session pool it is also passed the pooled identity to send the request as (identity=None: none left)
+FetchFn = Callable[..., Any]
+ShouldFetchFn = Callable[[WorkItem], bool]
+# cached_fn(item) returns what fetch_fn would, without a request (e.g. from a response cache), or None;
+# with a session pool it is also passed the identity the request would go out as (identity=None: none left)
+CachedFn = Callable[..., Any]
+FetchResult = Tuple[WorkItem, Any, Optional[Exception]]
+
+class PageChain:
+    """
+    Holds each query's page back until the consumer has taken the query's
+    previous page, so a cut-off decided while handling page p stops page p+1
+    before it is requested. Pages whose predecessor is not planned (page 1,
+    or one already done in a resumed run) are ready at once.
+    """
+
+    def __init__(self, items: List[WorkItem]):
+        self._planned = {(it.query, it.page) for it in items}
+        self._consumed: Set[Tuple[str, int]] = set()
+        self._cancelled = False
+        self._cond = threading.Condition()
+
+    def _ready(self, item: WorkItem) -> bool:
+        prev = (item.query, item.page - 1)
+        return self._cancelled or prev not in self._planned or prev in self._consumed
+
+    def ready(self, item: WorkItem) -> bool:
+        with self._cond:
+            return self._ready(item)
+
+    def wait(self, item: WorkItem) -> None:
+        with self._cond:
+            while not self._ready(item):
+                self._cond.wait()
+
+    def consumed(self, item: WorkItem) -> None:
+        with self._cond:
+            self._consumed.add((item.query, item.page))
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """Release every waiter, e.g. when the consumer stops early."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+class ConcurrentFetcher:
+    """
+    Fans work items out over a thread pool and yields results in `seq` order.
+
+    `concurrency` caps in-flight requests globally; `per_proxy_limit` additionally
+    caps in-flight requests routed through any single proxy. Each outcome is
+    reported back to the proxy manager's health scores. An optional
+    RateController paces requests, adapts how many run at once (never more
+    than `concurrency`) and schedules retries. With concurrency 1
+    items are fetched inline, exactly like the sequential loop.
+
+    `should_fetch` is consulted right before each request; items it rejects are
+    dropped from the output, which lets callers cancel the rest of a query.
+    `cached_fn` is tried next: an item it answers is not paced, takes no proxy
+    or identity and is not reported to any health score, since nothing was sent.
+    With a session pool it looks up the identity the pool would pick (peek()),
+    so a page cached for one signed-in account is not served as another.
+
+    With a `session_pool`, each request is sent as one of its identities. An
+    identity with a sticky proxy exits through it instead of a rotation proxy,
+    so that request takes no rotation slot and is not scored against the
+    pool; it is paced against the sticky proxy. A request answered as signed
+    out is sent again right away as another identity.
+    """
+
+    def __init__(
+        self,
+        fetch_fn: FetchFn,
+        concurrency: int = 1,
+        proxy_manager: Optional[ProxyManager] = None,
+        per_proxy_limit: Optional[int] = None,
+        should_fetch: Optional[ShouldFetchFn] = None,
+        rate_controller: Optional[RateController] = None,
+        session_pool: Optional[SessionPool] = None,
+        cached_fn: Optional[CachedFn] = None,
+    ):
+        self.fetch_fn = fetch_fn
+        self.cached_fn = cached_fn
+        self.session_pool = session_pool
+        self.rate_controller = rate_controller
+        self.should_fetch = should_fetch
+        self.skipped = 0
+        self._skipped_lock = threading.Lock()
+        self.concurrency = max(1, int(concurrency))
+        self.proxy_manager = proxy_manager
+        self.per_proxy_limit = max(1, int(per_proxy_limit)) if per_proxy_limit else None
+        self._in_flight: Dict[str, int] = {}
+        self._slot_freed = threading.Condition()
+
+    def _acquire_proxy(self) -> Optional[str]:
+        if not self.proxy_manager:
+            return None
+        with self._slot_freed:
+            while True:
+                busy = {p for p, n in self._in_flight.items() if self.per_proxy_limit and n >= self.per_proxy_limit}
+                proxy_url = self.proxy_manager.next(exclude=busy)
+                if proxy_url or not busy:
+                    break
+                # Every proxy is at its in-flight cap: wait for one to free up
+                self._slot_freed.wait()
+            if proxy_url:
+                self._in_flight[proxy_url] = self._in_flight.get(proxy_url, 0) + 1
+            return proxy_url
+
+    def _release_proxy(self, proxy_url: str) -> None:
+        with self._slot_freed:
+            self._in_flight[proxy_url] -= 1
+            self._slot_freed.notify()
+
+    def _report(self, proxy_url: str, latency: float, error: Optional[Exception]) -> None:
+        if error is None:
+            self.proxy_manager.report_success(proxy_url, latency)
+            return
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status in BAN_STATUSES and not getattr(error, "identity", None):
+            self.proxy_manager.report_failure(proxy_url, banned=True)
+        elif isinstance(error, (requests.ConnectionError, requests.Timeout)) or (status or 0) >= 500:
+            self.proxy_manager.report_failure(proxy_url)
+        else:
+            # 404s, parse errors and answers aimed at a pooled identity (error.identity) say nothing about the proxy
+            self.proxy_manager.report_neutral(proxy_url)
+
+    def fetch_one(self, item: WorkItem) -> Optional[FetchResult]:
+        """Fetch a single item with proxy, pacing and retry handling; None if `should_fetch` rejects it."""
+        if self.should_fetch is not None and not self.should_fetch(item):
+            with self._skipped_lock:
+                self.skipped += 1
+            return None
+        if self.cached_fn is not None:
+            try:
+                if self.session_pool is not None:
+                    batch = self.cached_fn(item, identity=self.session_pool.peek())
+                else:
+                    batch = self.cached_fn(item)
+            except Exception as e:  # e.g. a cached page that fails to parse
+                return item, [], e
+            if batch is not None:
+                return item, batch, None
+        host = urlsplit(item.url).netloc
+        attempt = 0
+        while True:
+            identity = self.session_pool.acquire() if self.session_pool is not None else None
+            sticky = identity is not None and identity.proxy is not None
+            proxy_url = identity.proxy if sticky else self._acquire_proxy()
+            proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
+            if self.rate_controller:
+                self.rate_controller.acquire(host, proxy_url)
+            started = time.monotonic()
+            error: Optional[Exception] = None
+            batch: Any = []
+            try:
+                if self.session_pool is not None:
+                    batch = self.fetch_fn(item, proxies, identity=identity)
+                else:
+                    batch = self.fetch_fn(item, proxies)
+            except Exception as e:  # surfaced to the caller, which decides how to log it
+                error = e
+            finally:
+                if proxy_url and not sticky:
+                    self._release_proxy(proxy_url)
+                if identity is not None:
+                    self.session_pool.release(identity, error)
+            latency = time.monotonic() - started
+            if proxy_url and not sticky:
+                self._report(proxy_url, latency, error)
+            if isinstance(error, IdentitySignedOut):
+                # Not the page's failure: it goes out again as another identity, without using up a retry
+                if self.rate_controller:
+                    self.rate_controller.release(host, proxy_url, latency, None, attempt)
+                continue
+            if not self.rate_controller:
+                return item, batch, error
+            delay = self.rate_controller.release(host, proxy_url, latency, error, attempt)
+            if delay is None:
+                return item, batch, error
+            logger.info("Retrying %s in %.1fs (attempt %d): %s", item.url, delay, attempt + 1, error)
+            time.sleep(delay)
+            attempt += 1
+
+    def run(self, items: Iterable[WorkItem], chained: bool = False) -> Iterator[FetchResult]:
+        """
+        Yield (item, batch, error) for every work item, ordered by `seq`.
+        At most a few windows of completed results are buffered ahead of the
+        oldest outstanding item, so memory stays bounded on long runs.
+
+        With `chained`, a query's page is requested only after the consumer
+        has taken its previous page (see PageChain), so `should_fetch` sees
+        every decision made on earlier pages; other queries' pages keep the
+        workers busy meanwhile.
+        """
+        ordered = sorted(items, key=lambda it: it.seq)
+        if self.concurrency == 1:
+            # Inline: each page is handled before the next one is fetched, so every run is chained
+            for item in ordered:
+                result = self.fetch_one(item)
+                if result is not None:
+                    yield result
+            return
+
+        window = self.concurrency * 4
+        chain = PageChain(ordered) if chained else None
+        pending: Deque[Tuple[WorkItem, Future]] = deque()
+        source = iter(ordered)
+        nxt = next(source, None)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fetch") as pool:
+            while True:
+                # Items go out in seq order; a chained page waits at the head until its predecessor is consumed.
+                # That predecessor has a lower seq, so it is already pending whenever the head has to wait.
+                while nxt is not None and len(pending) < window and (chain is None or chain.ready(nxt) or not pending):
+                    pending.append((nxt, pool.submit(self.fetch_one, nxt)))
+                    nxt = next(source, None)
+                if not pending:
+                    return
+                item, future = pending.popleft()
+                result = future.result()
+                if result is not None:
+                    yield result
+                if chain is not None:
+                    chain.consumed(item)
@@ -0,0 +1,217 @@
+import re
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Nodes are bs4 Tags or objects from extractors.html_backend that expose the same API
+Node = Any
+
+# Patterns are compiled once at import; the helpers they replace recompiled them per call.
+MONEY_RE = re.compile(r"\$\s?\d[\d,]*(\.\d{2})?(\s?-\s?\$\s?\d[\d,]*(\.\d{2})?)?|\$\s?\d[\d,]*\+?")
+PROPOSALS_RE = re.compile(r"Proposals\s*:\s*(\d+)", re.IGNORECASE)
+COUNTRY_RE = re.compile(
+    r"\b(United States|United Kingdom|Canada|Australia|Germany|France|India|Pakistan|"
+    r"Bangladesh|Philippines|Brazil|Spain|Italy|Netherlands|UAE|Saudi Arabia|Singapore|"
+    r"New Zealand|Poland|Mexico|Turkey|Japan|China|South Korea|South Africa)\b",
+    re.IGNORECASE,
+)
+RATING_OF_FIVE_RE = re.compile(r"(\d\.\d{1,2})\s*/?\s*5")
+RATING_BARE_RE = re.compile(r"\b(\d\.\d{1,2})\b")
+JOB_ID_RE = re.compile(r"(\d{7,})")
+
+PAYMENT_NEEDLES = ("Hourly", "Fixed Price", "Fixed")
+EXPERIENCE_NEEDLES = ("Entry", "Intermediate", "Expert")
+HOURLY_BUDGET_NEEDLES = ("per hour", "/hr", "$/hr")
+# Labels the budget amount follows on a card ("Hourly: $15.00 - $40.00", "Est. budget: $500")
+BUDGET_NEEDLES = ("Est. budget", "Budget:") + PAYMENT_NEEDLES
+BUDGET_LABEL_GAP = 12  # most characters between a label and its amount ("-price: ")
+POSTED_NEEDLES = ("ago", "hour", "minute", "day", "week", "month")
+
+class CardElements:
+    """
+    The elements of a card that field extraction needs, found in one walk over
+    its descendants. Each attribute mirrors the CSS selector it replaces:
+
+      title_el     a[data-test='job-tile-title'], a[href*='/jobs/']  (else h2 a, h3 a)
+      desc_el      [data-test='job-description-text'], p, .text-body-sm
+      tokens       [data-test='token']
+      skill_tags   a[href*='/o/profiles/skills/'], .o-tag-skill, .up-skill-badge
+    """
+
+    __slots__ = ("title_el", "desc_el", "tokens", "skill_tags")
+
+    def __init__(self, node: Node, title_el: Optional[Node] = None):
+        # A caller that already resolved the card's title anchor passes it in
+        self.title_el: Optional[Node] = title_el
+        self.desc_el: Optional[Node] = None
+        self.tokens: List[Node] = []
+        self.skill_tags: List[Node] = []
+        heading_anchor: Optional[Node] = None
+
+        for el in node.descendants:
+            if el.name is None:  # text, comments and other non-element nodes
+                continue
+            name = el.name
+            attrs = el.attrs
+            data_test = attrs.get("data-test")
+            classes = attrs.get("class") or ()
+            href = (attrs.get("href") or "") if name == "a" else ""
+
+            if name == "a":
+                if self.title_el is None and _is_title_anchor(el):
+                    self.title_el = el
+                elif heading_anchor is None and _under_heading(el):
+                    heading_anchor = el
+            if self.desc_el is None and (
+                data_test == "job-description-text" or name == "p" or "text-body-sm" in classes
+            ):
+                self.desc_el = el
+            if data_test == "token":
+                self.tokens.append(el)
+            if "/o/profiles/skills/" in href or "o-tag-skill" in classes or "up-skill-badge" in classes:
+                self.skill_tags.append(el)
+
+        if self.title_el is None:
+            # Another fallback for heading anchors
+            self.title_el = heading_anchor
+
+    def skills(self) -> List[str]:
+        tags = self.tokens or self.skill_tags
+        return [s for s in (t.get_text(strip=True) for t in tags) if s]
+
+def find_title_anchor(node: Node) -> Optional[Node]:
+    """The anchor CardElements would pick as the card's title, without walking every descendant."""
+    anchors = node.find_all("a")
+    for a in anchors:
+        if _is_title_anchor(a):
+            return a
+    return next((a for a in anchors if _under_heading(a)), None)
+
+def _is_title_anchor(el: Node) -> bool:
+    return el.get("data-test") == "job-tile-title" or "/jobs/" in (el.get("href") or "")
+
+def _under_heading(el: Node) -> bool:
+    parent = el.parent
+    while parent is not None:
+        if parent.name in ("h2", "h3"):
+            return True
+        parent = parent.parent
+    return False
+
+def resolve_innermost_cards(
+    root: Node, candidates: List[Node], key: Callable[[Node], Hashable] = id
+) -> List[Tuple[Node, Node]]:
+    """
+    Map every job title anchor under `root` to the innermost candidate that
+    contains it, and drop candidates that are ancestors of another resolved
+    card. Nested section/article/li wrappers around one job therefore yield a
+    single (card, title anchor) pair instead of one extraction per wrapper.
+    Pairs are returned in document order; `key` gives each node a stable identity.
+    """
+    candidate_ids = {key(c) for c in candidates}
+
+    def innermost(anchor: Node) -> Optional[Node]:
+        parent = anchor.parent
+        while parent is not None:
+            if key(parent) in candidate_ids:
+                return parent
+            parent = parent.parent
+        return None
+
+    anchors = root.find_all("a")
+    cards: Dict[Hashable, Tuple[Node, Node]] = {}
+    # Title anchors take precedence; heading anchors only claim cards without one
+    for anchor in [a for a in anchors if _is_title_anchor(a)] + [
+        a for a in anchors if not _is_title_anchor(a) and _under_heading(a)
+    ]:
+        card = innermost(anchor)
+        if card is not None and key(card) not in cards:
+            cards[key(card)] = (card, anchor)
+
+    overlapping = set()
+    for card, _ in cards.values():
+        parent = card.parent
+        while parent is not None:
+            if key(parent) in cards:
+                overlapping.add(key(parent))
+            parent = parent.parent
+
+    return [cards[k] for k in map(key, candidates) if k in cards and k not in overlapping]
+
+class CardText:
+    """
+    A job card's visible text, serialized once and lowercased once.
+    Every field is computed lazily from that single string and cached, so a
+    caller only pays for the fields it actually reads.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+
+    def window(self, needles: Sequence[str], radius: int = 24) -> Optional[str]:
+        """Return a whitespace-normalized window around the first needle (in priority order) present."""
+        for n in needles:
+            idx = self.lower.find(n.lower())
+            if idx != -1:
+                start = max(0, idx - radius)
+                end = min(len(self.text), idx + len(n) + radius)
+                return " ".join(self.text[start:end].split())
+        return None
+
+    @cached_property
+    def payment_type(self) -> Optional[str]:
+        return self.window(PAYMENT_NEEDLES)
+
+    @cached_property
+    def experience(self) -> Optional[str]:
+        return self.window(EXPERIENCE_NEEDLES)
+
+    @cached_property
+    def budget(self) -> Optional[str]:
+        # Only an amount right after its label counts: other dollar figures on
+        # the card, like the client's "$20K+ spent", are not the budget
+        for n in BUDGET_NEEDLES:
+            needle = n.lower()
+            idx = self.lower.find(needle)
+            while idx != -1:
+                start = idx + len(needle)
+                m = MONEY_RE.search(self.text, start)
+                if m and m.start() - start <= BUDGET_LABEL_GAP:
+                    return m.group(0)
+                idx = self.lower.find(needle, start)
+        if self.payment_type and "Hourly" in self.payment_type:
+            return self.window(HOURLY_BUDGET_NEEDLES)
+        return None
+
+    @cached_property
+    def proposals(self) -> Optional[int]:
+        m = PROPOSALS_RE.search(self.text)
+        return int(m.group(1)) if m else None
+
+    @cached_property
+    def location(self) -> Optional[str]:
+        m = COUNTRY_RE.search(self.text)
+        return m.group(1) if m else None
+
+    @cached_property
+    def rating(self) -> Optional[float]:
+        m = RATING_OF_FIVE_RE.search(self.text)
+        if m:
+            return float(m.group(1))
+        # Sometimes just "4.9" appears
+        m = RATING_BARE_RE.search(self.text)
+        if m:
+            val = float(m.group(1))
+            if 0.0 <= val <= 5.0:
+                return val
+        return None
+
+    @cached_property
+    def posted_text(self) -> Optional[str]:
+        return self.window(POSTED_NEEDLES)
+
+def job_id_from_url(url: str) -> str:
+    # Upwork job urls typically contain a long numeric id or token
+    # Heuristic: first run of 7+ digits
+    m = JOB_ID_RE.search(url)
+    return m.group(1) if m else ""
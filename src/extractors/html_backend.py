@@ -0,0 +1,157 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger("html_backend")
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional dependency
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+class HtmlBackend(ABC):
+    """
+    Builds a document tree and exposes the small node API the extractors use:
+    `name`, `attrs`, `parent`, `descendants`, `get()`, `get_text()`, `find_all()`
+    and `select()` with BeautifulSoup semantics.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def parse(self, html: str) -> Any:
+        """The document tree for `html`, whose nodes the other methods accept."""
+
+    def select(self, root: Any, css: str) -> List[Any]:
+        """Nodes matching `css`, in document order and without duplicates."""
+        return root.select(css)
+
+    def key(self, node: Any) -> Hashable:
+        """A stable identity for `node`, usable in sets and dicts."""
+        return id(node)
+
+class SoupBackend(HtmlBackend):
+    """BeautifulSoup with the given tree builder ('html.parser' or 'lxml')."""
+
+    def __init__(self, features: str = "html.parser"):
+        self.name = features
+        self.features = features
+
+    def parse(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, self.features)
+
+# Strings under these tags are not part of BeautifulSoup's get_text() output
+_NON_TEXT_PARENTS = frozenset(("script", "style", "template"))
+
+class LexborNode:
+    """Wraps a selectolax (lexbor) element so it reads like a bs4 Tag."""
+
+    __slots__ = ("_node", "_attrs")
+
+    def __init__(self, node):
+        self._node = node
+        self._attrs: Optional[Dict[str, Any]] = None
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        if self._attrs is None:
+            attrs = dict(self._node.attributes)
+            if "class" in attrs:
+                # bs4 treats class as a multi-valued attribute
+                attrs["class"] = (attrs["class"] or "").split()
+            self._attrs = attrs
+        return self._attrs
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+    @property
+    def parent(self) -> Optional["LexborNode"]:
+        parent = self._node.parent
+        if parent is None or not parent.is_element_node:
+            return None
+        return LexborNode(parent)
+
+    @property
+    def descendants(self) -> Iterator["LexborNode"]:
+        it = self._node.traverse()
+        next(it, None)  # traverse() starts with the node itself
+        for n in it:
+            yield LexborNode(n)
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        parts = []
+        for n in self._node.traverse(include_text=True):
+            if not n.is_text_node:
+                continue
+            if n.parent is not None and n.parent.tag in _NON_TEXT_PARENTS:
+                continue
+            s = n.text_content or ""
+            if strip:
+                s = s.strip()
+                if not s:
+                    continue
+            parts.append(s)
+        return separator.join(parts)
+
+    def find_all(self, tag: str) -> List["LexborNode"]:
+        return [LexborNode(n) for n in self._node.css(tag)]
+
+    def select(self, css: str) -> List["LexborNode"]:
+        seen = set()
+        out = []
+        # lexbor yields a node once per selector in a list that it matches
+        for n in self._node.css(css):
+            if n.mem_id not in seen:
+                seen.add(n.mem_id)
+                out.append(LexborNode(n))
+        return out
+
+class LexborBackend(HtmlBackend):
+    """selectolax's lexbor engine: an HTML5 parser and CSS matcher written in C."""
+
+    name = "selectolax"
+
+    def parse(self, html: str) -> LexborNode:
+        return LexborNode(LexborHTMLParser(html).root)
+
+    def key(self, node: LexborNode) -> Hashable:
+        return node._node.mem_id
+
+def available_backends() -> List[str]:
+    names = []
+    if LexborHTMLParser is not None:
+        names.append("selectolax")
+    if HAVE_LXML:
+        names.append("lxml")
+    names.append("html.parser")
+    return names
+
+def get_backend(name: Optional[str] = None) -> HtmlBackend:
+    """
+    Return the named backend, or the fastest installed one for None / 'auto'.
+    An unavailable backend falls back to the pure-Python 'html.parser'.
+    """
+    name = (name or "auto").lower()
+    available = available_backends()
+    if name == "auto":
+        name = available[0]
+    elif name not in available:
+        logger.warning("HTML backend '%s' is not installed; falling back to html.parser", name)
+        name = "html.parser"
+
+    if name == "selectolax":
+        return LexborBackend()
+    return SoupBackend(name)
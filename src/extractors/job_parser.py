@@ -1,12 +1,27 @@
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from requests.cookies import RequestsCookieJar
 
-from utils.time_utils import parse_relative_time_to_iso, now_iso
+from extractors.field_engine import CardElements, CardText, find_title_anchor, job_id_from_url, resolve_innermost_cards
+from extractors.html_backend import get_backend
+from extractors.proxy_manager import redact
+from extractors.rate_control import THROTTLE_STATUSES
+from extractors.response_cache import CachedResponse, ResponseCache
+from extractors.session_pool import Identity, IdentitySignedOut, IdentityThrottled, logged_out_reason
+from extractors.ssr_state import parse_ssr_jobs
+from filters.job_filters import JobFilter
+from utils.metrics import Metrics
+from utils.normalize import normalize_jobs
+from utils.time_utils import parse_relative_time_to_iso
 
 logger = logging.getLogger("job_parser")
 
@@ -22,29 +37,247 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
+@dataclass
+class ParseStats:
+    """Cumulative candidate accounting across every page parsed by one UpworkJobParser."""
+    pages: int = 0
+    ssr_pages: int = 0  # pages served from the embedded state JSON instead of the DOM
+    candidates: int = 0
+    pruned: int = 0
+    jobs: int = 0
+    rejected: Dict[str, int] = field(default_factory=dict)  # filter key -> jobs it dropped client-side
+
+    def merge(self, other: "ParseStats") -> None:
+        self.pages += other.pages
+        self.ssr_pages += other.ssr_pages
+        self.candidates += other.candidates
+        self.pruned += other.pruned
+        self.jobs += other.jobs
+        self.add_rejections(other.rejected)
+
+    def add_rejections(self, counts: Dict[str, int]) -> None:
+        for reason, n in counts.items():
+            self.rejected[reason] = self.rejected.get(reason, 0) + n
+
 class UpworkJobParser:
     """
     Lightweight HTML parser for Upwork job search results pages.
     Works best with valid cookies. Without cookies, fewer fields may be present.
+    With a `job_filter`, cards that fail it are dropped before their costly fields are extracted.
+    With `metrics`, fetches and parses are timed and counted (and profiled when those stages are).
+    A fetch given a pooled `identity` is sent with that identity's own session and cookies instead.
     """
 
-    def __init__(self, cookies: Optional[RequestsCookieJar] = None, timeout: int = 30):
+    def __init__(
+        self,
+        cookies: Optional[RequestsCookieJar] = None,
+        timeout: int = 30,
+        pool_size: int = 10,
+        html_backend: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        connect_timeout: Optional[float] = None,
+        job_filter: Optional[JobFilter] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         self.cookies = cookies
+        self.metrics = metrics
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        # A dead proxy fails the connect phase; don't let it hold a worker for the full read timeout
+        self.connect_timeout = connect_timeout or timeout
+        self.pool_size = pool_size
+        self.cache = cache
+        self.job_filter = job_filter
+        # 'auto' picks selectolax, then lxml, then the pure-Python html.parser
+        self.backend = get_backend(html_backend)
+        self.session = self._new_session()
+        # One session (and keep-alive pool) per proxy; None is the direct connection
+        self._sessions: Dict[Optional[str], requests.Session] = {None: self.session}
+        # And one per pooled identity, carrying that identity's cookies
+        self._identity_sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        self.stats = ParseStats()
+        self._stats_lock = threading.Lock()
+
+    def _new_session(self, cookies: Optional[RequestsCookieJar] = None) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        # Size the keep-alive pool for the number of threads sharing this session
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        cookies = cookies if cookies is not None else self.cookies
         if cookies:
-            self.session.cookies.update(cookies)
+            session.cookies.update(cookies)
+        return session
+
+    def session_for(
+        self, proxies: Optional[Dict[str, str]] = None, identity: Optional[Identity] = None
+    ) -> requests.Session:
+        """The session dedicated to this identity, else to this proxy, created on first use."""
+        if identity is not None:
+            with self._sessions_lock:
+                session = self._identity_sessions.get(identity.name)
+                if session is None:
+                    session = self._identity_sessions[identity.name] = self._new_session(identity.cookies)
+                return session
+        key = (proxies or {}).get("https")
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._new_session()
+            return session
 
     def fetch_and_parse(self, url: str, proxies: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        html, fetched_at = self.fetch_page(url, proxies=proxies)
+        return self._parse_html(html, fetched_at)
+
+    def parse_html(self, html: str, fetched_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Parse a page fetched elsewhere (a worker stage, an archive). Relative
+        times like "3 hours ago" are anchored to `fetched_at` (epoch seconds).
+        """
+        return self._parse_html(html, fetched_at)
+
+    def fetch_html(
+        self, url: str, proxies: Optional[Dict[str, str]] = None, identity: Optional[Identity] = None
+    ) -> str:
+        return self.fetch_page(url, proxies=proxies, identity=identity)[0]
+
+    def fetch_page(
+        self, url: str, proxies: Optional[Dict[str, str]] = None, identity: Optional[Identity] = None
+    ) -> Tuple[str, float]:
+        """
+        The page body and when it was downloaded; for a cached body, when it was first downloaded.
+        As a pooled `identity`, raises IdentitySignedOut or IdentityThrottled when the answer says so.
+        """
+        if self.metrics is None:
+            return self._fetch_page(url, proxies, identity)
+        with self.metrics.stage("fetch"):
+            return self._fetch_page(url, proxies, identity)
+
+    def cached_page(self, url: str, identity: Optional[Identity] = None) -> Optional[Tuple[str, float]]:
+        """
+        A fresh cached copy of the page and when it was downloaded, served
+        without a request; None when it has to be fetched (or revalidated).
+        With a pooled `identity`, only a copy fetched as that identity is served.
+        """
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(url, identity))
+        if cached is None or not cached.fresh:
+            return None
+        return self._cache_hit(url, cached)
+
+    def _cache_key(self, url: str, identity: Optional[Identity]) -> str:
+        # Keyed on the configured cookies, not the session jar the server keeps updating;
+        # each pooled identity is signed in as its own account, so it gets its own entries
+        return self.cache.key_for(url, identity.cookies if identity is not None else self.cookies)
+
+    def _cache_hit(self, url: str, cached: CachedResponse) -> Tuple[str, float]:
+        logger.debug("Cache hit: %s", url)
+        if self.metrics is not None:
+            self.metrics.inc("cache_lookups_total", result="hit")
+        return cached.body, cached.fetched_at
+
+    def _fetch_page(
+        self, url: str, proxies: Optional[Dict[str, str]], identity: Optional[Identity]
+    ) -> Tuple[str, float]:
+        cached = None
+        headers: Dict[str, str] = {}
+        if self.cache is not None:
+            key = self._cache_key(url, identity)
+            cached = self.cache.get(key)
+            if cached is not None and cached.fresh:
+                return self._cache_hit(url, cached)
+            if cached is not None:
+                headers = cached.validators()
+
         logger.debug("Fetching URL: %s", url)
-        resp = self.session.get(url, timeout=self.timeout, proxies=proxies, allow_redirects=True)
+        session = self.session_for(proxies, identity)
+        started = time.perf_counter()
+        resp = session.get(
+            url,
+            timeout=(self.connect_timeout, self.timeout),
+            proxies=proxies,
+            allow_redirects=True,
+            headers=headers,
+        )
+        if self.metrics is not None:
+            self._record_response(resp, started, proxies, cached is not None)
+        if identity is not None:
+            reason = logged_out_reason(resp, [c.name for c in identity.cookies], session.cookies)
+            if reason is not None:
+                raise IdentitySignedOut(identity.name, reason, resp)
+            if resp.status_code in THROTTLE_STATUSES:
+                raise IdentityThrottled(identity.name, resp)
+        if resp.status_code == 304 and cached is not None:
+            logger.debug("Cache revalidated: %s", url)
+            self.cache.revalidated(cached)
+            return cached.body, cached.fetched_at
         resp.raise_for_status()
+        fetched_at = time.time()
         html = resp.text
-        return self._parse_html(html)
+        if self.cache is not None and "no-store" not in resp.headers.get("Cache-Control", ""):
+            self.cache.put(key, url, html, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), fetched_at)
+        return html, fetched_at
+
+    def _record_response(
+        self, resp: requests.Response, started: float, proxies: Optional[Dict[str, str]], revalidating: bool
+    ) -> None:
+        proxy = (proxies or {}).get("https")
+        proxy = redact(proxy) if proxy else "direct"
+        self.metrics.timed("fetch_seconds", started, time.perf_counter())
+        self.metrics.inc("fetch_responses_total", status=str(resp.status_code))
+        self.metrics.inc("fetch_bytes_total", len(resp.content), proxy=proxy)
+        if self.cache is not None:
+            result = "revalidated" if resp.status_code == 304 and revalidating else "miss"
+            self.metrics.inc("cache_lookups_total", result=result)
+
+    def record_stats(self, delta: ParseStats, seconds: Optional[float] = None) -> None:
+        """Fold in counts from parsed pages (inline, or in a worker process that took `seconds`)."""
+        with self._stats_lock:
+            self.stats.merge(delta)
+        if self.metrics is not None:
+            if seconds is not None:
+                self.metrics.observe("parse_seconds", seconds)
+            self.metrics.inc("parse_pages_total", delta.ssr_pages, source="ssr")
+            self.metrics.inc("parse_pages_total", delta.pages - delta.ssr_pages, source="dom")
+            self.metrics.inc("parse_candidates_total", delta.candidates)
+            self.metrics.inc("parse_pruned_total", delta.pruned)
+            self.metrics.inc("parse_jobs_total", delta.jobs)
+            for reason, n in delta.rejected.items():
+                self.metrics.inc("parse_rejected_total", n, filter=reason)
+
+    def _parse_html(self, html: str, fetched_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        if self.metrics is None:
+            return self._parse(html, fetched_at)
+        with self.metrics.timer("parse_seconds"), self.metrics.stage("parse"):
+            return self._parse(html, fetched_at)
 
-    def _parse_html(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, "html.parser")
+    def _parse(self, html: str, fetched_at: Optional[float]) -> List[Dict[str, Any]]:
+        # One clock reading per page: every relative time on it was rendered at the same moment
+        if fetched_at is None:
+            fetched_at = time.time()
+
+        # Fast path: the server-rendered state blob carries every field as typed JSON
+        ssr_jobs = parse_ssr_jobs(html)
+        rejected: Counter = Counter()
+        if ssr_jobs is not None:
+            if self.job_filter is not None:
+                # Every field is already decoded here, so filtering is all that is left to save
+                kept = []
+                for job in ssr_jobs:
+                    reason = self.job_filter.reject_job(job)
+                    if reason:
+                        rejected[reason] += 1
+                    else:
+                        kept.append(job)
+                ssr_jobs = kept
+            self.record_stats(ParseStats(pages=1, ssr_pages=1, jobs=len(ssr_jobs), rejected=dict(rejected)))
+            logger.debug("Parsed %d jobs from embedded state JSON", len(ssr_jobs))
+            return normalize_jobs(ssr_jobs, fetched_at)
+
+        soup = self.backend.parse(html)
 
         # Upwork’s job search markup evolves; we use robust heuristics.
         # Strategy:
@@ -53,26 +286,48 @@ class UpworkJobParser:
         jobs: List[Dict[str, Any]] = []
 
         # Pattern A: React SSR list items with data-test attributes
-        list_candidates = soup.select("[data-test='job-tile-list'] li, li[data-test='job-tile-list-item']")
-        if not list_candidates:
-            # Pattern B: generic cards
-            list_candidates = soup.select("section, article, li")
+        list_candidates = self.backend.select(soup, "[data-test='job-tile-list'] li, li[data-test='job-tile-list-item']")
+        if list_candidates:
+            cards = [(node, None) for node in list_candidates]
+        else:
+            # Pattern B: generic cards. Wrappers nest, so keep only the innermost card per title anchor.
+            list_candidates = self.backend.select(soup, "section, article, li")
+            cards = resolve_innermost_cards(soup, list_candidates, key=self.backend.key)
 
-        for node in list_candidates:
-            job = self._extract_job_from_node(node)
+        now = datetime.fromtimestamp(fetched_at, timezone.utc)
+        for node, title_el in cards:
+            job = self._extract_job_from_node(node, title_el, rejected, now)
             if job:
                 jobs.append(job)
 
-        logger.debug("Parsed %d jobs from HTML", len(jobs))
-        return jobs
+        pruned = len(list_candidates) - len(cards)
+        self.record_stats(
+            ParseStats(pages=1, candidates=len(list_candidates), pruned=pruned, jobs=len(jobs), rejected=dict(rejected))
+        )
+
+        logger.debug("Parsed %d jobs from HTML (%d candidates, %d pruned)", len(jobs), len(list_candidates), pruned)
+        return normalize_jobs(jobs, fetched_at)
 
-    def _extract_job_from_node(self, node) -> Optional[Dict[str, Any]]:
-        # Title + URL
-        title_el = node.select_one("a[data-test='job-tile-title'], a[href*='/jobs/']")
-        if not title_el:
-            # Another fallback for heading anchors
-            title_el = node.select_one("h2 a, h3 a")
+    def _extract_job_from_node(
+        self, node, title_el=None, rejected: Optional[Counter] = None, now: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        card = None
+        if self.job_filter is not None:
+            # Judge the card on its cheap fields before walking it for description and skills
+            if title_el is None:
+                title_el = find_title_anchor(node)
+            if not title_el or not title_el.get_text(strip=True):
+                return None
+            card = CardText(node.get_text(" ", strip=True))
+            reason = self.job_filter.reject_card(card)
+            if reason:
+                if rejected is not None:
+                    rejected[reason] += 1
+                return None
 
+        # Locate title, description and skill elements in a single walk of the card
+        elements = CardElements(node, title_el)
+        title_el = elements.title_el
         if not title_el or not title_el.get_text(strip=True):
             return None
 
@@ -80,39 +335,32 @@ class UpworkJobParser:
         href = title_el.get("href", "")
         url = href if href.startswith("http") else urljoin(UPWORK_BASE, href)
 
-        # Payment type, budget, experience
-        payment_type = self._find_text(node, ["Hourly", "Fixed Price", "Fixed"])
-        experience = self._find_text(node, ["Entry", "Intermediate", "Expert"])
-
-        # Budget & hourly rate range heuristics
-        budget_text = self._find_money_text(node)
-        if not budget_text and payment_type and "Hourly" in payment_type:
-            budget_text = self._find_text(node, ["per hour", "/hr", "$/hr"])
-
-        # Proposals
-        proposals = self._find_numeric_after(node, ["Proposals"])
+        # Serialize the card text once; every text-derived field reads from it
+        if card is None:
+            card = CardText(node.get_text(" ", strip=True))
+        payment_type = card.payment_type
+        experience = card.experience
+        budget_text = card.budget
+        proposals = card.proposals
 
         # Client country & rating (visible with cookies)
-        location = self._find_country(node)
-        rating = self._find_rating(node)
+        location = card.location
+        rating = card.rating
 
         # Posted time (may be relative like "3 hours ago")
-        posted_text = self._find_text(node, ["ago", "hour", "minute", "day", "week", "month"])
-        time_posted_iso = parse_relative_time_to_iso(posted_text) if posted_text else None
+        posted_text = card.posted_text
+        time_posted_iso = parse_relative_time_to_iso(posted_text, now) if posted_text else None
 
         # Description snippet
-        desc_el = node.select_one("[data-test='job-description-text'], p, .text-body-sm")
+        desc_el = elements.desc_el
         description = desc_el.get_text(" ", strip=True) if desc_el else ""
 
         # Skills tags
-        skills = [t.get_text(strip=True) for t in node.select("[data-test='token']")] or [
-            s.get_text(strip=True) for s in node.select("a[href*='/o/profiles/skills/'], .o-tag-skill, .up-skill-badge")
-        ]
-        skills = [s for s in skills if s]
+        skills = elements.skills()
 
         job = {
-            "Date Scraped": now_iso(),
-            "Job ID": self._infer_job_id_from_url(url),
+            "Date Scraped": "",  # set for the whole page by normalize_jobs
+            "Job ID": job_id_from_url(url),
             "Time Posted": time_posted_iso or "",
             "Project Payment Type": payment_type or "",
             "Budget": budget_text or "",
@@ -122,85 +370,10 @@ class UpworkJobParser:
             "URL": url,
             "Description": description,
             "Location": location or "",
-            "Total Spent": "",  # requires job detail or client card; may be filled on detail fetch (not implemented)
+            "Total Spent": "",  # only on the job's detail page; filled in by enrichment when enabled
             "Feedback": rating if rating is not None else "",
             "Proposals": proposals if proposals is not None else "",
-            "Project Length": "",  # could be extracted from detail view
-            "Weekly Hours": "",     # could be extracted from detail view
+            "Project Length": "",  # detail page, as above
+            "Weekly Hours": "",     # detail page, as above
         }
         return job
-
-    @staticmethod
-    def _infer_job_id_from_url(url: str) -> str:
-        # Upwork job urls typically contain a long numeric id or token
-        # Heuristic: last sequence of digits 7+
-        import re
-        m = re.search(r"(\d{7,})", url)
-        return m.group(1) if m else ""
-
-    @staticmethod
-    def _find_text(node, needles: List[str]) -> Optional[str]:
-        text = node.get_text(" ", strip=True)
-        for n in needles:
-            if n.lower() in text.lower():
-                # return a short window around the needle
-                idx = text.lower().find(n.lower())
-                start = max(0, idx - 24)
-                end = min(len(text), idx + len(n) + 24)
-                snippet = text[start:end]
-                # clean snippet roughly
-                snippet = " ".join(snippet.split())
-                return snippet
-        return None
-
-    @staticmethod
-    def _find_money_text(node) -> Optional[str]:
-        import re
-        text = node.get_text(" ", strip=True)
-        # Match ranges like "$10.00-$20.00", "$50+", or "$1,000"
-        m = re.search(r"\$\s?\d[\d,]*(\.\d{2})?(\s?-\s?\$\s?\d[\d,]*(\.\d{2})?)?|\$\s?\d[\d,]*\+?", text)
-        return m.group(0) if m else None
-
-    @staticmethod
-    def _find_numeric_after(node, labels: List[str]) -> Optional[int]:
-        import re
-        text = node.get_text(" ", strip=True)
-        for lbl in labels:
-            m = re.search(rf"{lbl}\s*:\s*(\d+)", text, flags=re.IGNORECASE)
-            if m:
-                try:
-                    return int(m.group(1))
-                except ValueError:
-                    return None
-        return None
-
-    @staticmethod
-    def _find_country(node) -> Optional[str]:
-        # Countries often appear as a token or small text with a flag icon; fall back to capitalized word
-        import re
-        text = node.get_text(" ", strip=True)
-        m = re.search(r"\b(United States|United Kingdom|Canada|Australia|Germany|France|India|Pakistan|"
-                      r"Bangladesh|Philippines|Brazil|Spain|Italy|Netherlands|UAE|Saudi Arabia|Singapore|"
-                      r"New Zealand|Poland|Mexico|Turkey|Japan|China|South Korea|South Africa)\b", text, re.I)
-        return m.group(1) if m else None
-
-    @staticmethod
-    def _find_rating(node) -> Optional[float]:
-        import re
-        text = node.get_text(" ", strip=True)
-        m = re.search(r"(\d\.\d{1,2})\s*/?\s*5", text)
-        if m:
-            try:
-                return float(m.group(1))
-            except ValueError:
-                return None
-        # Sometimes just "4.9" appears
-        m2 = re.search(r"\b(\d\.\d{1,2})\b", text)
-        if m2:
-            try:
-                val = float(m2.group(1))
-                if 0.0 <= val <= 5.0:
-                    return val
-            except ValueError:
-                return None
-        return None
\ No newline at end of file
@@ -0,0 +1,353 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from extractors.fetch_engine import ConcurrentFetcher, FetchResult, PageChain, WorkItem
+from extractors.job_parser import ParseStats, UpworkJobParser
+from filters.job_filters import JobFilter
+from output.page_archive import ArchiveReader
+
+logger = logging.getLogger("parse_pool")
+
+# Set once per worker process by _init_worker / _init_replay_worker
+_worker_parser: Optional[UpworkJobParser] = None
+_worker_archive: Optional[ArchiveReader] = None
+
+def _init_worker(html_backend: str, job_filter: Optional[JobFilter] = None) -> None:
+    global _worker_parser
+    _worker_parser = UpworkJobParser(html_backend=html_backend, job_filter=job_filter)
+
+def _init_replay_worker(html_backend: str, job_filter: Optional[JobFilter], archive_path: str) -> None:
+    global _worker_archive
+    _init_worker(html_backend, job_filter)
+    # Each worker maps the segment itself, so page bodies never cross the process boundary
+    _worker_archive = ArchiveReader(archive_path)
+
+def _parse_page(html: str, fetched_at: Optional[float] = None) -> Tuple[List[Dict[str, Any]], ParseStats, float]:
+    """Runs in a worker process: parse one page and report its counts and CPU time."""
+    _worker_parser.stats = ParseStats()
+    started = time.perf_counter()
+    jobs = _worker_parser.parse_html(html, fetched_at)
+    return jobs, _worker_parser.stats, time.perf_counter() - started
+
+def _replay_page(index: int) -> Tuple[List[Dict[str, Any]], ParseStats, float]:
+    page = _worker_archive.read(index)
+    # The data describes the page as it was when fetched, not when replayed
+    return _parse_page(page.html, page.fetched_at)
+
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage, summed over its workers."""
+    workers: int = 0
+    items: int = 0
+    busy: float = 0.0  # seconds spent working (fetch stage: including pacing and retries)
+    blocked: float = 0.0  # seconds spent waiting for room in the next stage
+
+    def utilization(self, wall: float) -> float:
+        if wall <= 0 or self.workers <= 0:
+            return 0.0
+        return min(1.0, self.busy / (self.workers * wall))
+
+@dataclass
+class PipelineStats:
+    fetch: StageStats = field(default_factory=StageStats)
+    parse: StageStats = field(default_factory=StageStats)
+    wall: float = 0.0
+    max_queue_depth: int = 0
+
+    def bottleneck(self) -> str:
+        if self.fetch.utilization(self.wall) >= self.parse.utilization(self.wall):
+            return "fetch"
+        return "parse"
+
+class ParsePipeline:
+    """
+    Two-stage scrape pipeline: fetch threads -> bounded HTML queue -> parser processes.
+
+    Parsing is CPU-bound and holds the GIL, so it runs in a process pool of
+    `workers` processes while the fetcher's threads only do network I/O. The
+    queue between the stages holds at most `queue_size` pages; when parsing
+    falls behind, fetch threads block on it, and at most a fixed window of
+    items is admitted ahead of the oldest unfinished one, so memory stays
+    bounded. Results are yielded in `seq` order, like ConcurrentFetcher.run().
+    If a worker process dies, the pool is unusable; the pages it held and all
+    later ones are then parsed in this process instead of coming back empty.
+
+    The fetcher's fetch_fn must return (html, fetched_at), as UpworkJobParser.fetch_page does.
+    """
+
+    def __init__(
+        self,
+        fetcher: ConcurrentFetcher,
+        parser: UpworkJobParser,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.fetcher = fetcher
+        self.parser = parser
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.queue_size = max(1, int(queue_size or self.workers * 2))
+        self.stats = PipelineStats(
+            fetch=StageStats(workers=fetcher.concurrency),
+            parse=StageStats(workers=self.workers),
+        )
+        self._stats_lock = threading.Lock()
+        self._done: Dict[int, Optional[FetchResult]] = {}
+        self._done_cond = threading.Condition()
+        self._broken = threading.Event()
+        self._inline_lock = threading.Lock()
+
+    def _finish(self, seq: int, result: Optional[FetchResult]) -> None:
+        with self._done_cond:
+            self._done[seq] = result
+            self._done_cond.notify_all()
+
+    def _fetch(self, raw: "queue.Queue", item: WorkItem) -> None:
+        started = time.monotonic()
+        try:
+            result = self.fetcher.fetch_one(item)
+        except Exception as e:  # never leave the consumer waiting on a seq
+            result = (item, None, e)
+        fetched = time.monotonic()
+        with self._stats_lock:
+            self.stats.fetch.busy += fetched - started
+            self.stats.fetch.items += 1
+        if result is None:
+            self._finish(item.seq, None)
+            return
+        _, page, error = result
+        if error is not None or not page:
+            self._finish(item.seq, (item, [], error))
+            return
+        raw.put((item, page))
+        depth = raw.qsize()
+        with self._stats_lock:
+            self.stats.fetch.blocked += time.monotonic() - fetched
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+
+    def _pool_broken(self, error: Exception) -> None:
+        if not self._broken.is_set():
+            self._broken.set()
+            logger.error("A parse worker died (%s); parsing the remaining pages in this process", error)
+
+    def _parse_inline(self, item: WorkItem, html: str, fetched_at: float) -> None:
+        started = time.perf_counter()
+        try:
+            # The parser is not thread-safe; callbacks and the dispatcher may both get here
+            with self._inline_lock:
+                jobs = self.parser.parse_html(html, fetched_at)
+        except Exception as e:  # parse errors are reported per page, like inline parsing
+            self._finish(item.seq, (item, [], e))
+            return
+        with self._stats_lock:
+            self.stats.parse.busy += time.perf_counter() - started
+            self.stats.parse.items += 1
+        self._finish(item.seq, (item, jobs, None))
+
+    def _dispatch(self, raw: "queue.Queue", pool: ProcessPoolExecutor, stop: threading.Event) -> None:
+        # Cap pages handed to the pool so the HTML queue, not the pool's own queue, absorbs bursts
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        while True:
+            entry = raw.get()
+            if entry is None:
+                return
+            item, (html, fetched_at) = entry
+            if stop.is_set():
+                continue
+            if self._broken.is_set():
+                self._parse_inline(item, html, fetched_at)
+                continue
+            slots.acquire()
+            try:
+                future = pool.submit(_parse_page, html, fetched_at)
+            except BrokenProcessPool as e:
+                slots.release()
+                self._pool_broken(e)
+                self._parse_inline(item, html, fetched_at)
+                continue
+            except Exception as e:  # shut-down pool
+                slots.release()
+                self._finish(item.seq, (item, [], e))
+                continue
+            future.add_done_callback(partial(self._parsed, item, html, fetched_at, slots))
+
+    def _parsed(
+        self, item: WorkItem, html: str, fetched_at: float, slots: threading.BoundedSemaphore, future: Future
+    ) -> None:
+        slots.release()
+        try:
+            jobs, delta, elapsed = future.result()
+        except BrokenProcessPool as e:
+            # Not this page's fault: the pool lost a worker, which fails every page it still held
+            self._pool_broken(e)
+            self._parse_inline(item, html, fetched_at)
+            return
+        except Exception as e:  # parse errors are reported per page, like inline parsing
+            self._finish(item.seq, (item, [], e))
+            return
+        self.parser.record_stats(delta, elapsed)
+        with self._stats_lock:
+            self.stats.parse.busy += elapsed
+            self.stats.parse.items += 1
+        self._finish(item.seq, (item, jobs, None))
+
+    def run(self, items: Iterable[WorkItem], chained: bool = False) -> Iterator[FetchResult]:
+        """
+        Yield (item, jobs, error) for every work item, ordered by `seq`.
+        `chained` holds each query's page back until its previous page has
+        been consumed, as in ConcurrentFetcher.run().
+        """
+        ordered = sorted(items, key=lambda it: it.seq)
+        chain = PageChain(ordered) if chained else None
+        window = self.fetcher.concurrency * 4 + self.queue_size + self.workers * 2
+        admission = threading.Semaphore(window)
+        stop = threading.Event()
+        raw: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        started = time.monotonic()
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.fetcher.concurrency, thread_name_prefix="fetch")
+        # spawn: forking a process that already runs fetch threads is unsafe
+        parse_pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.parser.backend.name, self.parser.job_filter),
+        )
+        # Start every worker now: a pool that spawns on submit can start one while it is being torn
+        # down after a worker death, and then waits on that process forever
+        for _ in range(self.workers):
+            parse_pool.submit(os.getpid)
+
+        def feed() -> None:
+            for item in ordered:
+                admission.acquire()
+                if chain is not None:
+                    chain.wait(item)
+                if stop.is_set():
+                    return
+                fetch_pool.submit(self._fetch, raw, item)
+
+        feeder = threading.Thread(target=feed, name="pipeline-feed", daemon=True)
+        dispatcher = threading.Thread(
+            target=self._dispatch, args=(raw, parse_pool, stop), name="pipeline-dispatch", daemon=True
+        )
+        feeder.start()
+        dispatcher.start()
+        try:
+            for item in ordered:
+                with self._done_cond:
+                    while item.seq not in self._done:
+                        self._done_cond.wait()
+                    result = self._done.pop(item.seq)
+                admission.release()
+                if result is not None:
+                    yield result
+                if chain is not None:
+                    chain.consumed(item)
+        finally:
+            # Also reached when the consumer stops early: let in-flight fetches drain, then stop both pools
+            stop.set()
+            if chain is not None:
+                chain.cancel()
+            for _ in range(window):
+                admission.release()
+            feeder.join()
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            raw.put(None)
+            dispatcher.join()
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+            self.stats.wall += time.monotonic() - started
+
+class ArchiveReplay:
+    """
+    Re-parses every page of a PageArchive across `workers` processes, with no
+    network access. Results are yielded as (item, jobs, error) in archive
+    order, with a bounded window of pages in flight. If a worker process dies,
+    the remaining pages are parsed in this process.
+    """
+
+    def __init__(self, path: str, parser: UpworkJobParser, workers: Optional[int] = None):
+        self.path = path
+        self.parser = parser
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.stats = PipelineStats(parse=StageStats(workers=self.workers))
+
+    def _pool_broken(self, error: Exception) -> bool:
+        logger.error("A parse worker died (%s); parsing the remaining pages in this process", error)
+        return True
+
+    def run(self) -> Iterator[FetchResult]:
+        reader = ArchiveReader(self.path)
+        started = time.monotonic()
+        logger.info("Replaying %d archived pages from %s with %d workers", len(reader), self.path, self.workers)
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_replay_worker,
+            initargs=(self.parser.backend.name, self.parser.job_filter, self.path),
+        )
+        window = self.workers * 4
+        pending: Deque[Tuple[int, Optional[Future]]] = deque()
+        indices = iter(reader.ordered())
+        seq = 0
+        broken = False
+
+        def submit(i: int) -> None:
+            nonlocal broken
+            future = None
+            if not broken:
+                try:
+                    future = pool.submit(_replay_page, i)
+                except BrokenProcessPool as e:
+                    broken = self._pool_broken(e)
+            pending.append((i, future))
+
+        try:
+            for i in indices:
+                submit(i)
+                if len(pending) >= window:
+                    break
+            while pending:
+                i, future = pending.popleft()
+                # Stands in for the page if even its metadata is unreadable
+                item = WorkItem(seq=seq, query="", page=0, url=f"{self.path}#{i}")
+                seq += 1
+                try:
+                    meta = reader.read(i, body=False)
+                    item = WorkItem(seq=item.seq, query=meta.query, page=meta.page, url=meta.url)
+                    if future is not None:
+                        try:
+                            jobs, delta, elapsed = future.result()
+                        except BrokenProcessPool as e:
+                            # Not this page's fault: the pool lost a worker, which fails every page it still held
+                            broken = broken or self._pool_broken(e)
+                            future = None
+                    if future is None:
+                        page = reader.read(i)
+                        started_page = time.perf_counter()
+                        jobs = self.parser.parse_html(page.html, page.fetched_at)
+                        delta, elapsed = None, time.perf_counter() - started_page
+                except Exception as e:  # a corrupt record or parse failure costs one page, not the run
+                    yield item, [], e
+                else:
+                    if delta is not None:
+                        self.parser.record_stats(delta, elapsed)
+                    self.stats.parse.busy += elapsed
+                    self.stats.parse.items += 1
+                    yield item, jobs, None
+                nxt = next(indices, None)
+                if nxt is not None:
+                    submit(nxt)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            reader.close()
+            self.stats.wall += time.monotonic() - started
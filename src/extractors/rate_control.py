@@ -0,0 +1,251 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+
+logger = logging.getLogger("rate_control")
+
+# Answers that mean "slow down" (throttled or blocked) and transient upstream failures
+THROTTLE_STATUSES = (403, 429)
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, at most `burst` banked.
+    A rate of 0 disables pacing. `pause()` blocks the bucket outright, e.g. for
+    the duration of a Retry-After.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = max(0.0, rate)
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def wait_time(self) -> float:
+        """Seconds until acquire() would return, without taking a token."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.rate <= 0:
+                return 0.0
+            tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            return max(0.0, (1.0 - tokens) / self.rate)
+
+    def reserve(self) -> float:
+        """
+        Take a token now, even one not yet earned, and return how long to wait
+        before using it. Later callers see the debt in wait_time(), so callers
+        choosing between buckets spread out instead of queueing on one.
+        """
+        with self._lock:
+            now = time.monotonic()
+            blocked = max(0.0, self.blocked_until - now)
+            if self.rate <= 0:
+                return blocked
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            return max(blocked, -self.tokens / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class AimdLimiter:
+    """
+    Concurrency limit tuned by additive-increase / multiplicative-decrease:
+    each success adds 1/limit (about +1 per round trip at full load); each
+    congestion signal multiplies the limit by a factor below 1. Signals within
+    `cooldown` seconds of a decrease are ignored, so one burst of 429s from
+    requests already in flight counts once.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: Optional[int] = None, cooldown: float = 1.0):
+        self.cooldown = cooldown
+        self._last_decrease = 0.0
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_congestion(self, factor: float) -> None:
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            before = int(self.limit)
+            self.limit = max(float(self.minimum), self.limit * factor)
+            if int(self.limit) < before:
+                logger.info("Concurrency limit lowered %d -> %d", before, int(self.limit))
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds; accepts delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+@dataclass
+class RateStats:
+    requests: int = 0
+    throttled: int = 0  # 403/429 answers
+    failed: int = 0  # 5xx, connection errors, timeouts
+    retries: int = 0
+    gave_up: int = 0
+
+class RateController:
+    """
+    Paces requests per host and per proxy with token buckets, adapts overall
+    concurrency with AIMD, and decides whether and when a failed request is
+    retried (honouring Retry-After, otherwise exponential back-off with full
+    jitter).
+
+    Callers bracket every request with `acquire()` and `release()`; `release()`
+    returns the delay before a retry, or None when the outcome is final.
+    """
+
+    def __init__(
+        self,
+        host_rps: float = 0.0,
+        proxy_rps: float = 0.0,
+        burst: float = 1.0,
+        initial_concurrency: int = 4,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        latency_target: Optional[float] = None,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        seed: Optional[int] = None,
+    ):
+        self.host_rps = host_rps
+        self.proxy_rps = proxy_rps
+        self.burst = burst
+        self.max_retries = max(0, max_retries)
+        self.latency_target = latency_target
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.limiter = AimdLimiter(initial_concurrency, maximum=max_concurrency)
+        self.stats = RateStats()
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._proxies: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def _bucket(self, table: Dict[str, TokenBucket], key: str, rate: float) -> TokenBucket:
+        with self._lock:
+            bucket = table.get(key)
+            if bucket is None:
+                bucket = table[key] = TokenBucket(rate, self.burst)
+            return bucket
+
+    def acquire(self, host: str, proxy: Optional[str] = None) -> None:
+        self.limiter.acquire()
+        self._bucket(self._hosts, host, self.host_rps).acquire()
+        if proxy:
+            self._bucket(self._proxies, proxy, self.proxy_rps).acquire()
+        with self._lock:
+            self.stats.requests += 1
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            # Never earlier than asked; a little jitter keeps workers from returning in lockstep
+            return min(retry_after, self.backoff_cap) + self._rng.uniform(0, self.backoff_base)
+        return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def release(
+        self,
+        host: str,
+        proxy: Optional[str],
+        latency: float,
+        error: Optional[Exception],
+        attempt: int,
+    ) -> Optional[float]:
+        self.limiter.release()
+        if error is None:
+            if self.latency_target and latency > self.latency_target:
+                self.limiter.on_congestion(0.9)
+            else:
+                self.limiter.on_success()
+            return None
+
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+
+        if status in THROTTLE_STATUSES:
+            self.limiter.on_congestion(0.5)
+            with self._lock:
+                self.stats.throttled += 1
+            # A ban is tied to the exit IP: pause the proxy if there is one, else the host
+            pause = retry_after if retry_after is not None else self.backoff(attempt)
+            if getattr(error, "identity", None):
+                # Throttled as one pooled identity, which the pool has already paused; retry as another
+                retry_after = None
+            elif proxy:
+                self._bucket(self._proxies, proxy, self.proxy_rps).pause(pause)
+                # Only this proxy is paused; the retry can go out through another one
+                retry_after = None
+            else:
+                self._bucket(self._hosts, host, self.host_rps).pause(pause)
+        elif (status or 0) >= 500 or isinstance(error, RETRYABLE_ERRORS):
+            self.limiter.on_congestion(0.75)
+            with self._lock:
+                self.stats.failed += 1
+        else:
+            return None
+
+        with self._lock:
+            if attempt >= self.max_retries:
+                self.stats.gave_up += 1
+                return None
+            self.stats.retries += 1
+        return self.backoff(attempt, retry_after)
@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger("response_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    url           TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    size          INTEGER NOT NULL,
+    raw_size      INTEGER NOT NULL,
+    body          BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme/host, sort query parameters and drop the fragment."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+def cookie_identity(cookies: Optional[Iterable]) -> str:
+    """Short digest of the cookie jar, so authenticated and anonymous pages never share an entry."""
+    if not cookies:
+        return "anon"
+    pairs = sorted(f"{c.name}={c.value}" for c in cookies)
+    if not pairs:
+        return "anon"
+    return hashlib.sha1("; ".join(pairs).encode("utf-8")).hexdigest()[:16]
+
+@dataclass
+class CachedResponse:
+    key: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0  # served from cache after a 304
+    misses: int = 0  # full bodies downloaded and stored
+    evictions: int = 0
+    bytes_saved: int = 0  # body bytes not downloaded thanks to the cache
+
+class ResponseCache:
+    """
+    Disk-backed HTML response cache (SQLite, zlib-compressed bodies).
+
+    Entries younger than `ttl` seconds are served without a request. Older
+    entries are revalidated with If-None-Match / If-Modified-Since when the
+    upstream sent validators. Total stored size is capped at `max_bytes`,
+    evicting least recently used entries first.
+    """
+
+    def __init__(self, path: str, ttl: float = 900, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key_for(url: str, cookies: Optional[Iterable] = None, identity: Optional[str] = None) -> str:
+        """`identity` names the cookies' owner in place of their digest, e.g. a pool whose members share pages."""
+        return f"{identity or cookie_identity(cookies)}|{normalize_url(url)}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fetched_at, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        etag, last_modified, fetched_at, blob = row
+        fresh = now - fetched_at < self.ttl
+        if not fresh and not (etag or last_modified):
+            # Stale and not revalidatable: behaves like a miss
+            return None
+        body = zlib.decompress(blob).decode("utf-8")
+        if fresh:
+            with self._lock:
+                self.stats.hits += 1
+                self.stats.bytes_saved += len(body.encode("utf-8"))
+        return CachedResponse(key, body, etag, last_modified, fetched_at, fresh)
+
+    def revalidated(self, entry: CachedResponse) -> None:
+        """The upstream answered 304: the stored body is current again."""
+        with self._lock:
+            self.stats.revalidated += 1
+            self.stats.bytes_saved += len(entry.body.encode("utf-8"))
+            with self._conn:
+                self._conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), entry.key))
+
+    def put(
+        self,
+        key: str,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        raw = body.encode("utf-8")
+        blob = zlib.compress(raw, 6)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, url, etag, last_modified, fetched_at, accessed_at, size, raw_size, body) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, etag, last_modified, fetched_at or now, now, len(blob), len(raw), blob),
+                )
+            self._total += len(blob) - (old[0] if old else 0)
+            self.stats.misses += 1
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Trim to 90% of the cap so eviction does not run on every store
+        target = int(self.max_bytes * 0.9)
+        with self._conn:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+            doomed = []
+            for key, size in rows:
+                if self._total <= target:
+                    break
+                doomed.append((key,))
+                self._total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.stats.evictions += len(doomed)
+        logger.debug("Evicted %d cached responses (%d bytes stored)", len(doomed), self._total)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
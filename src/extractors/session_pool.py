@@ -0,0 +1,186 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.cookies import RequestsCookieJar
+
+from extractors.cookie_handler import CookieHandler
+from extractors.rate_control import TokenBucket, parse_retry_after
+from utils.metrics import Metrics
+
+logger = logging.getLogger("session_pool")
+
+# Where Upwork sends a request whose session is no longer signed in
+LOGIN_PATHS = ("/ab/account-security/login", "/login")
+
+@dataclass
+class Identity:
+    name: str
+    cookies: RequestsCookieJar = field(repr=False)
+    proxy: Optional[str] = None  # sticky exit for every request made under this identity
+    requests: int = 0
+    throttled: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    logged_out: Optional[str] = None  # why it was taken out of rotation
+
+class IdentityThrottled(requests.HTTPError):
+    """A 403/429 answered to one pooled identity; that identity is paused, the others carry on."""
+
+    def __init__(self, identity: str, response: requests.Response):
+        super().__init__(f"{response.status_code} for identity {identity}: {response.url}", response=response)
+        self.identity = identity
+
+class IdentitySignedOut(requests.RequestException):
+    """The answer to a pooled identity shows its session was signed out; the request goes out again as another."""
+
+    def __init__(self, identity: str, reason: str, response: requests.Response):
+        super().__init__(f"identity {identity} is signed out ({reason}): {response.url}", response=response)
+        self.identity = identity
+        self.reason = reason
+
+def logged_out_reason(
+    resp: requests.Response, cookie_names: List[str], jar: Optional[RequestsCookieJar] = None
+) -> Optional[str]:
+    """Why `resp` shows its session is signed out, or None if it looks signed in. `jar` is the session's cookies."""
+    if resp.status_code == 401:
+        return "401 Unauthorized"
+    for r in list(resp.history) + [resp]:
+        path = urlsplit(r.url).path.rstrip("/")
+        if any(path.endswith(p) for p in LOGIN_PATHS):
+            return f"redirected to {path}"
+    # Signing out expires the session's cookies, dropping them from the jar (rotation only replaces values)
+    if jar is not None:
+        cleared = [name for name in cookie_names if name not in jar]
+        if cleared:
+            return f"cookie {cleared[0]} cleared"
+    return None
+
+class SessionPool:
+    """
+    Authenticated identities to spread requests over. Each identity is a
+    cookie string (and optionally a sticky proxy) loaded from a JSON file:
+
+      [{"name": "acct-1", "cookies": "name=value; ...", "proxy": "http://host:port"}, ...]
+
+    Each identity gets its own `rps` token bucket, and `concurrency` caps its
+    in-flight requests. acquire() hands out the identity that can go soonest,
+    least loaded first; release() takes the request's outcome. IdentityThrottled
+    (a 403/429) pauses that identity, for Retry-After when given.
+    IdentitySignedOut (a 401, a redirect to the login page, auth cookies
+    cleared) takes it out of rotation for the rest of the run.
+    """
+
+    def __init__(
+        self,
+        identities: List[Identity],
+        rps: float = 0.0,
+        burst: float = 1.0,
+        concurrency: Optional[int] = None,
+        pause: float = 60.0,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.identities = identities
+        self.concurrency = max(1, int(concurrency)) if concurrency else None
+        self.pause = pause
+        self.metrics = metrics
+        self._buckets: Dict[str, TokenBucket] = {i.name: TokenBucket(rps, burst) for i in identities}
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "SessionPool":
+        identities = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            logger.warning("Identities file not found: %s", path)
+            entries = []
+        for n, entry in enumerate(entries, 1):
+            jar = CookieHandler(cookie_string=entry.get("cookies", "")).get_requests_cookiejar()
+            name = entry.get("name") or f"identity-{n}"
+            if jar is None:
+                logger.warning("Identity %s has no cookies; skipping it", name)
+                continue
+            identities.append(Identity(name=name, cookies=jar, proxy=entry.get("proxy") or None))
+        logger.info("Loaded %d identities from %s", len(identities), path)
+        return cls(identities, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.identities)
+
+    def active(self) -> int:
+        with self._cond:
+            return sum(1 for i in self.identities if i.logged_out is None)
+
+    def _pick(self, free: List[Identity]) -> Identity:
+        return min(free, key=lambda i: (self._buckets[i.name].wait_time(), i.in_flight, i.requests))
+
+    def peek(self) -> Optional[Identity]:
+        """The identity acquire() would hand out now, without reserving it; None when all are signed out."""
+        with self._cond:
+            active = [i for i in self.identities if i.logged_out is None]
+            if not active:
+                return None
+            free = [i for i in active if self.concurrency is None or i.in_flight < self.concurrency]
+            return self._pick(free or active)
+
+    def acquire(self) -> Optional[Identity]:
+        """
+        The identity to send the next request as, once its rate budget allows;
+        None when every identity has been signed out.
+        """
+        with self._cond:
+            while True:
+                active = [i for i in self.identities if i.logged_out is None]
+                if not active:
+                    return None
+                free = [i for i in active if self.concurrency is None or i.in_flight < self.concurrency]
+                if free:
+                    break
+                # Every identity is at its in-flight cap: wait for one to free up
+                self._cond.wait()
+            identity = self._pick(free)
+            identity.in_flight += 1
+            wait = self._buckets[identity.name].reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return identity
+
+    def release(self, identity: Identity, error: Optional[Exception] = None) -> None:
+        """Record how a request made as `identity` went; `error` is what fetching raised, if anything."""
+        with self._cond:
+            identity.in_flight -= 1
+            identity.requests += 1
+            if error is None:
+                outcome = "ok"
+            elif isinstance(error, IdentitySignedOut):
+                outcome = "logged_out"
+                if identity.logged_out is None:
+                    identity.logged_out = error.reason
+                    logger.warning(
+                        "Identity %s is signed out (%s); taking it out of rotation", identity.name, error.reason
+                    )
+                    if all(i.logged_out is not None for i in self.identities):
+                        logger.warning("Every pooled identity is signed out; continuing with the configured cookies")
+            elif isinstance(error, IdentityThrottled):
+                identity.throttled += 1
+                outcome = "throttled"
+            else:
+                identity.failed += 1
+                outcome = "error"
+            self._cond.notify_all()
+        if outcome == "throttled":
+            retry_after = parse_retry_after(error.response.headers.get("Retry-After"))
+            self._buckets[identity.name].pause(retry_after if retry_after is not None else self.pause)
+        if self.metrics is not None:
+            self.metrics.inc("identity_requests_total", identity=identity.name, outcome=outcome)
+
+    def snapshot(self) -> List[Identity]:
+        with self._cond:
+            return [Identity(**vars(i)) for i in self.identities]
@@ -0,0 +1,269 @@
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from extractors.field_engine import job_id_from_url
+
+logger = logging.getLogger("ssr_state")
+
+UPWORK_BASE = "https://www.upwork.com"
+
+# Nuxt 3 / Next.js ship their state as a JSON script tag
+_JSON_SCRIPT_RE = re.compile(
+    r"<script\b[^>]*\bid=[\"'](__NUXT_DATA__|__NEXT_DATA__)[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+# Older pages assign a plain JSON literal to a window global
+_WINDOW_STATE_RE = re.compile(r"window\.(__INITIAL_STATE__|__NUXT__|__APOLLO_STATE__)\s*=\s*(?=[{\[])")
+
+# devalue (Nuxt 3) encodes these sentinels as negative indices
+_DEVALUE_CONSTANTS = {-1: None, -2: None, -3: float("nan"), -4: float("inf"), -5: float("-inf"), -6: -0.0}
+_DEVALUE_WRAPPERS = {"Reactive", "ShallowReactive", "Ref", "ShallowRef", "EmptyRef", "EmptyShallowRef"}
+
+PAYMENT_TYPES = {1: "Fixed Price", 2: "Hourly", "FIXED": "Fixed Price", "HOURLY": "Hourly"}
+TIERS = {1: "Entry level", 2: "Intermediate", 3: "Expert"}
+
+def revive_devalue(payload: List[Any]) -> Any:
+    """Rebuild the object graph from a Nuxt 3 `__NUXT_DATA__` (devalue) array."""
+    revived: Dict[int, Any] = {}
+
+    def hydrate(idx: int) -> Any:
+        if idx in _DEVALUE_CONSTANTS:
+            return _DEVALUE_CONSTANTS[idx]
+        if idx in revived:
+            return revived[idx]
+        value = payload[idx]
+        if isinstance(value, list):
+            if value and isinstance(value[0], str):
+                tag = value[0]
+                if tag in _DEVALUE_WRAPPERS:
+                    out = hydrate(value[1]) if len(value) > 1 else None
+                elif tag in ("Date", "BigInt", "RegExp"):
+                    out = value[1]
+                elif tag == "Set":
+                    out = [hydrate(i) for i in value[1:]]
+                elif tag in ("Map", "null"):
+                    out = {}
+                    revived[idx] = out
+                    for k, v in zip(value[1::2], value[2::2]):
+                        key = hydrate(k) if tag == "Map" else k
+                        out[str(key)] = hydrate(v)
+                else:
+                    out = None
+                revived[idx] = out
+                return out
+            out_list: List[Any] = []
+            revived[idx] = out_list
+            out_list.extend(hydrate(i) for i in value)
+            return out_list
+        if isinstance(value, dict):
+            out_dict: Dict[str, Any] = {}
+            revived[idx] = out_dict
+            for k, v in value.items():
+                out_dict[k] = hydrate(v)
+            return out_dict
+        revived[idx] = value
+        return value
+
+    return hydrate(0) if payload else None
+
+def iter_state_blobs(html: str) -> Iterator[Any]:
+    """Yield every decodable application-state document embedded in the page."""
+    for m in _JSON_SCRIPT_RE.finditer(html):
+        try:
+            data = json.loads(m.group(2))
+        except ValueError:
+            logger.debug("Undecodable %s blob", m.group(1))
+            continue
+        if m.group(1).upper() == "__NUXT_DATA__" and isinstance(data, list):
+            data = revive_devalue(data)
+        yield data
+
+    decoder = json.JSONDecoder()
+    for m in _WINDOW_STATE_RE.finditer(html):
+        try:
+            data, _ = decoder.raw_decode(html, m.end())
+        except ValueError:
+            # Nuxt 2 emits a JS function call rather than JSON; leave it to the DOM path
+            continue
+        yield data
+
+def _looks_like_job(obj: Any) -> bool:
+    return isinstance(obj, dict) and "title" in obj and ("ciphertext" in obj or "uid" in obj)
+
+def find_job_list(state: Any, max_nodes: int = 200_000) -> Optional[List[Dict[str, Any]]]:
+    """Breadth-first search for the shallowest list whose items look like job postings."""
+    queue = [state]
+    seen = 0
+    while queue and seen < max_nodes:
+        nxt = []
+        for obj in queue:
+            seen += 1
+            if isinstance(obj, list):
+                if obj and _looks_like_job(obj[0]):
+                    return [o for o in obj if _looks_like_job(o)]
+                nxt.extend(o for o in obj if isinstance(o, (dict, list)))
+            elif isinstance(obj, dict):
+                nxt.extend(v for v in obj.values() if isinstance(v, (dict, list)))
+        queue = nxt
+    return None
+
+def get_path(obj: Any, *paths: str) -> Any:
+    """First non-empty value among dotted `paths`."""
+    for path in paths:
+        cur = obj
+        for part in path.split("."):
+            cur = cur.get(part) if isinstance(cur, dict) else None
+            if cur is None:
+                break
+        if cur not in (None, "", []):
+            return cur
+    return None
+
+def format_money(value: Any, decimals: int = 2) -> str:
+    """`value` as dollars (e.g. $1,250.00), or "" when it is not a number."""
+    try:
+        return f"${float(value):,.{decimals}f}"
+    except (TypeError, ValueError):
+        return ""
+
+def _iso(value: Any) -> str:
+    """Render an API timestamp the way the DOM path does (UTC isoformat)."""
+    if not isinstance(value, str) or not value:
+        return ""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).isoformat()
+    except ValueError:
+        return value
+
+def _budget(raw: Dict[str, Any], payment_type: str) -> str:
+    if payment_type == "Hourly":
+        # Unset hourly budgets come through as 0
+        lo = get_path(raw, "hourlyBudget.min", "hourlyBudgetMin") or None
+        hi = get_path(raw, "hourlyBudget.max", "hourlyBudgetMax") or None
+        if lo is not None and hi is not None:
+            return f"{format_money(lo)} - {format_money(hi)}"
+        if lo is not None or hi is not None:
+            return format_money(lo if lo is not None else hi)
+        return ""
+    amount = get_path(raw, "amount.amount", "budget.amount", "amount")
+    if not amount:
+        return ""
+    whole = float(amount).is_integer() if isinstance(amount, (int, float)) else False
+    return format_money(amount, 0 if whole else 2)
+
+# What a malformed value raises while a field is mapped (a dict where a label was expected, ...)
+_FIELD_ERRORS = (TypeError, ValueError, AttributeError)
+
+def _text(value: Any) -> str:
+    """A text field's value: strings stripped, numbers formatted, anything else rejected."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{value:g}"
+    raise TypeError(f"expected text, got {type(value).__name__}")
+
+def _count(value: Any) -> Any:
+    """Feedback and Proposals: a number, or the label the state gives instead (e.g. a proposals tier)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return _text(value)
+
+def _skills(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise TypeError(f"expected a list, got {type(value).__name__}")
+    skills = []
+    for s in value:
+        try:
+            name = _text((s.get("prettyName") or s.get("name")) if isinstance(s, dict) else s)
+        except TypeError:
+            continue  # one odd tag does not cost the job its other skills
+        if name:
+            skills.append(name)
+    return skills
+
+# Reads one output field from a job object and the record mapped so far
+FieldFn = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+def _text_at(*paths: str) -> FieldFn:
+    return lambda raw, job: _text(get_path(raw, *paths))
+
+def _count_at(*paths: str) -> FieldFn:
+    return lambda raw, job: _count(get_path(raw, *paths))
+
+def _payment_type(raw: Dict[str, Any], job: Dict[str, Any]) -> str:
+    kind = get_path(raw, "type", "jobType")
+    return PAYMENT_TYPES.get(kind.upper() if isinstance(kind, str) else kind, "")
+
+def _skill_level(raw: Dict[str, Any], job: Dict[str, Any]) -> str:
+    tier = get_path(raw, "tierText", "contractorTier", "tier")
+    return TIERS.get(tier, "") if isinstance(tier, int) and not isinstance(tier, bool) else _text(tier)
+
+def _total_spent(raw: Dict[str, Any], job: Dict[str, Any]) -> str:
+    total_spent = get_path(raw, "client.totalSpent")
+    return format_money(total_spent) if total_spent is not None else ""
+
+# Output fields in column order (URL goes between the two groups): how each is
+# read from a job object and the record so far, and its type when left empty
+_FIELDS_BEFORE_URL = (
+    ("Time Posted", lambda raw, job: _iso(get_path(raw, "publishedOn", "createdOn", "renewedOn")), str),
+    ("Project Payment Type", _payment_type, str),
+    ("Budget", lambda raw, job: _budget(raw, job["Project Payment Type"]), str),
+    ("Skill Level", _skill_level, str),
+    ("Skills", lambda raw, job: _skills(get_path(raw, "attrs", "skills")), list),
+    ("Title", _text_at("title"), str),
+)
+_FIELDS_AFTER_URL = (
+    ("Description", _text_at("description"), str),
+    ("Location", _text_at("client.location.country"), str),
+    ("Total Spent", _total_spent, str),
+    ("Feedback", _count_at("client.totalFeedback", "client.feedback"), str),
+    ("Proposals", _count_at("totalApplicants", "proposalsTier"), str),
+    ("Project Length", _text_at("durationLabel", "duration.label", "duration"), str),
+    ("Weekly Hours", _text_at("engagement", "workload"), str),
+)
+
+def _map_fields(raw: Dict[str, Any], job: Dict[str, Any], fields: Tuple[Tuple[str, FieldFn, type], ...]) -> None:
+    for name, compute, empty in fields:
+        try:
+            job[name] = compute(raw, job)
+        except _FIELD_ERRORS as e:
+            logger.warning("Job %s: dropping malformed %s from the embedded state (%s)", job["Job ID"] or "?", name, e)
+            job[name] = empty()
+
+def map_job(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map one job object from the embedded state onto the scraper's output schema.
+    Each field is coerced to its output type on its own; a value of the wrong
+    shape is logged and left empty instead of failing the job (and its page).
+    """
+    ciphertext = get_path(raw, "ciphertext")
+    url = urljoin(UPWORK_BASE, f"/jobs/{ciphertext.strip()}") if isinstance(ciphertext, str) else ""
+    job_id = job_id_from_url(url)
+    if not job_id:
+        uid = get_path(raw, "uid", "id")
+        job_id = str(uid) if isinstance(uid, (str, int)) and not isinstance(uid, bool) else ""
+
+    job: Dict[str, Any] = {"Date Scraped": "", "Job ID": job_id}  # set by normalize_jobs
+    _map_fields(raw, job, _FIELDS_BEFORE_URL)
+    job["URL"] = url
+    _map_fields(raw, job, _FIELDS_AFTER_URL)
+    return job
+
+def parse_ssr_jobs(html: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Jobs from the page's embedded application state, or None when no state blob
+    with a job list is present (the caller then falls back to DOM heuristics).
+    """
+    for state in iter_state_blobs(html):
+        raw_jobs = find_job_list(state)
+        if raw_jobs:
+            return [map_job(r) for r in raw_jobs]
+    return None
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.job_identity import job_key
+
+logger = logging.getLogger("dedup")
+
+@dataclass
+class _BloomSlice:
+    capacity: int
+    error_rate: float
+    bits: int
+    hashes: int
+    array: bytearray
+    count: int = 0
+
+class BloomFilter:
+    """
+    Scalable Bloom filter: when a slice fills up to its capacity, a new slice
+    with twice the capacity and half the error rate is added, so the overall
+    false-positive rate stays below `error_rate` however many keys arrive.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-6):
+        self.count = 0
+        self._slices: List[_BloomSlice] = []
+        self._add_slice(max(1, int(capacity)), error_rate / 2)
+
+    def _add_slice(self, capacity: int, error_rate: float) -> None:
+        bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        self._slices.append(_BloomSlice(capacity, error_rate, bits, hashes, bytearray((bits + 7) // 8)))
+
+    @staticmethod
+    def _hashes(key: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        for s in self._slices:
+            array, bits = s.array, s.bits
+            # Enhanced double hashing: the step grows each probe, so a step that shares a factor
+            # with `bits` cannot cycle over a few positions. Most absent keys miss on the first probes
+            p, step = h1 % bits, h2 % bits
+            for i in range(s.hashes):
+                if not array[p >> 3] & (1 << (p & 7)):
+                    break
+                p = (p + step) % bits
+                step = (step + i + 1) % bits
+            else:
+                return True
+        return False
+
+    def add(self, key: str) -> None:
+        s = self._slices[-1]
+        if s.count >= s.capacity:
+            self._add_slice(s.capacity * 2, s.error_rate / 2)
+            s = self._slices[-1]
+        h1, h2 = self._hashes(key)
+        p, step = h1 % s.bits, h2 % s.bits
+        for i in range(s.hashes):
+            s.array[p >> 3] |= 1 << (p & 7)
+            p = (p + step) % s.bits
+            step = (step + i + 1) % s.bits
+        s.count += 1
+        self.count += 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(s.array) for s in self._slices)
+
+@dataclass
+class DedupStats:
+    unique: int = 0
+    merged: int = 0  # duplicates folded into a record still in the window
+    late: int = 0  # duplicates that arrived after their record was written; dropped
+    keyless: int = 0  # records without Job ID or URL, passed through as-is
+
+class StreamingDeduper:
+    """
+    Drops repeat sightings of a job across queries while streaming.
+
+    Accepted records wait in a FIFO window of `window` records before they are
+    released. A duplicate that arrives while its record is still waiting adds
+    its query to that record's "Queries" list. One that arrives later can only
+    be dropped, because the record has already been written.
+
+    Fingerprints of released records are kept in an exact LRU of the most
+    recent `lru_size` keys; keys evicted from it go into a Bloom filter. Memory
+    stays bounded over long polling runs, at the cost of a rare false positive
+    (about `error_rate`) that drops a genuinely new job.
+    """
+
+    def __init__(
+        self,
+        window: int = 500,
+        lru_size: int = 100_000,
+        capacity: int = 1_000_000,
+        error_rate: float = 1e-6,
+    ):
+        self.window = max(0, int(window))
+        self.lru_size = max(1, int(lru_size))
+        self.accepted = 0  # records taken in so far; their output order is acceptance order
+        self.released = 0
+        self.stats = DedupStats()
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._bloom = BloomFilter(capacity, error_rate)
+
+    def _seen(self, key: str) -> bool:
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            return True
+        return key in self._bloom
+
+    def prime(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Register records written by an earlier process (e.g. before a resume) as already released."""
+        n = 0
+        for job in jobs:
+            key = job_key(job)
+            if key and not self._seen(key):
+                self._bloom.add(key)
+                n += 1
+        return n
+
+    def push(self, jobs: List[Dict[str, Any]], query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Take in one page of records; returns the records released from the window, in order."""
+        for job in jobs:
+            q = query or job.get("Query")
+            key = job_key(job)
+            if not key:
+                self.stats.keyless += 1
+                self._accept(f"\0{self.accepted}", job, q)
+                continue
+            held = self._pending.get(key)
+            if held is not None:
+                if q and q not in held["Queries"]:
+                    held["Queries"].append(q)
+                self.stats.merged += 1
+            elif self._seen(key):
+                self.stats.late += 1
+            else:
+                self.stats.unique += 1
+                self._accept(key, job, q)
+        return self._release(self.window)
+
+    def _accept(self, key: str, job: Dict[str, Any], query: Optional[str]) -> None:
+        job["Queries"] = [query] if query else []
+        self._pending[key] = job
+        self.accepted += 1
+
+    def _release(self, keep: int) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        while len(self._pending) > keep:
+            key, job = self._pending.popitem(last=False)
+            if not key.startswith("\0"):
+                self._recent[key] = None
+                if len(self._recent) > self.lru_size:
+                    # Keys only move into the Bloom filter once they age out of the exact set
+                    self._bloom.add(self._recent.popitem(last=False)[0])
+            out.append(job)
+        self.released += len(out)
+        return out
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Release every record still in the window (end of run or polling cycle)."""
+        return self._release(0)
@@ -0,0 +1,119 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from extractors.field_engine import CardText
+from utils.normalize import budget_range, experience_level, payment_kind
+
+class JobFilter:
+    """
+    Client-side evaluation of the search filters that build_search_url sends as
+    URL params. The server treats them as hints, so non-matching jobs still come
+    back.
+
+    Predicates run cheapest first (payment type, budget, country, experience)
+    and stop at the first failure, whose config key is reported as the reason.
+    A field that could not be extracted never rejects a job: the filter only
+    drops what it can tell is wrong.
+
+    A budget is a fixed price or an hourly rate, so each has its own bounds:
+    budget_min/budget_max apply to fixed-price jobs and hourly_min/hourly_max
+    to hourly ones. A job whose payment type is unknown is never rejected on
+    its budget.
+    """
+
+    def __init__(
+        self,
+        payment_types: Optional[Iterable[str]] = None,
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None,
+        countries: Optional[Iterable[str]] = None,
+        experience: Optional[Iterable[str]] = None,
+        hourly_min: Optional[float] = None,
+        hourly_max: Optional[float] = None,
+    ):
+        self.payment_types = {payment_kind(p) or p.lower() for p in payment_types or ()}
+        self.budget_min = budget_min
+        self.budget_max = budget_max
+        self.hourly_min = hourly_min
+        self.hourly_max = hourly_max
+        # (min, max, reason) per payment kind
+        self._bounds = {
+            kind: (low, high, reason)
+            for kind, low, high, reason in (
+                ("fixed", budget_min, budget_max, "budget"),
+                ("hourly", hourly_min, hourly_max, "hourly_rate"),
+            )
+            if low is not None or high is not None
+        }
+        self.countries = {c.strip().lower() for c in countries or () if c.strip()}
+        self.experience = {experience_level(e) or e.lower() for e in experience or ()}
+
+    @classmethod
+    def from_config(cls, filter_cfg: Dict[str, Any]) -> Optional["JobFilter"]:
+        """The filter for a `filters` config block; None when it constrains nothing or sets client_side=false."""
+        if not filter_cfg or not filter_cfg.get("client_side", True):
+            return None
+        job_filter = cls(
+            payment_types=_as_list(filter_cfg.get("payment_type")),
+            budget_min=_as_amount(filter_cfg.get("budget_min")),
+            budget_max=_as_amount(filter_cfg.get("budget_max")),
+            countries=_as_list(filter_cfg.get("include_countries")),
+            experience=_as_list(filter_cfg.get("experience")),
+            hourly_min=_as_amount(filter_cfg.get("hourly_min")),
+            hourly_max=_as_amount(filter_cfg.get("hourly_max")),
+        )
+        return job_filter if job_filter.active else None
+
+    @property
+    def active(self) -> bool:
+        return bool(
+            self.payment_types
+            or self._bounds
+            or self.countries
+            or self.experience
+        )
+
+    def reject_card(self, card: CardText) -> Optional[str]:
+        """Why a DOM card fails the filters, or None; reads only the card's lazily computed cheap fields."""
+        return self._reject(
+            lambda: card.payment_type,
+            lambda: card.budget,
+            lambda: card.location,
+            lambda: card.experience,
+        )
+
+    def reject_job(self, job: Dict[str, Any]) -> Optional[str]:
+        """Why an extracted job record fails the filters, or None."""
+        return self._reject(
+            lambda: job.get("Project Payment Type"),
+            lambda: job.get("Budget"),
+            lambda: job.get("Location"),
+            lambda: job.get("Skill Level"),
+        )
+
+    def _reject(self, payment, budget, location, level) -> Optional[str]:
+        kind = payment_kind(payment() or "") if self.payment_types or self._bounds else None
+        if self.payment_types and kind is not None and kind not in self.payment_types:
+            return "payment_type"
+        if kind in self._bounds:
+            low, high, reason = self._bounds[kind]
+            span = budget_range(budget() or "")
+            # Budgets are ranges: keep a job whose range overlaps [low, high]
+            if span is not None and ((low is not None and span[1] < low) or (high is not None and span[0] > high)):
+                return reason
+        if self.countries:
+            country = (location() or "").strip().lower()
+            if country and country not in self.countries:
+                return "include_countries"
+        if self.experience:
+            found = experience_level(level() or "")
+            if found is not None and found not in self.experience:
+                return "experience"
+        return None
+
+def _as_amount(value: Any) -> Optional[float]:
+    return float(value) if value not in (None, "") else None
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value else []
+    return [str(v) for v in value or []]
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Iterator
+from dataclasses import dataclass, field
+from typing import Iterator, Set
 
 @dataclass
 class PagePlan:
@@ -8,4 +8,23 @@ class PagePlan:
 
     def iter_pages(self) -> Iterator[int]:
         for p in range(1, self.total_pages + 1):
-            yield p
\ No newline at end of file
+            yield p
+
+@dataclass
+class IncrementalCutoff:
+    """
+    Stops paginating a query once a page is mostly jobs already seen in earlier runs.
+    With sort=recency every later page is older still, so it would be all repeats.
+    """
+    threshold: float = 0.8
+    stopped: Set[str] = field(default_factory=set)
+
+    def observe(self, query: str, seen: int, total: int) -> bool:
+        """Record one parsed page; returns True when this page stops the query."""
+        if total and seen / total >= self.threshold and query not in self.stopped:
+            self.stopped.add(query)
+            return True
+        return False
+
+    def is_stopped(self, query: str) -> bool:
+        return query in self.stopped
@@ -0,0 +1,139 @@
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("schedule")
+
+@dataclass
+class QuerySchedule:
+    query: str
+    interval: float
+    due: float = 0.0
+    rate: Optional[float] = None  # new jobs per second, smoothed; None until the first poll
+    last_poll: Optional[float] = None
+    polls: int = 0
+    new_jobs: int = 0
+
+@dataclass
+class PollResult:
+    """What one poll of a query found."""
+    new: int = 0
+    saturated: bool = False  # every page fetched was mostly new, so some jobs may lie beyond them
+    failed: bool = False
+
+class PollScheduler:
+    """
+    Decides when each query is polled next, from how fast new jobs arrive for it.
+
+    After each poll, the new jobs found since the previous poll give a sample
+    of the query's arrival rate, which is smoothed exponentially; the first
+    poll counts as covering `initial_interval`. The next poll is timed for
+    about `target_new` new jobs, within [min_interval, max_interval]. A query
+    that gets busier is polled sooner. One that finds nothing has its rate
+    decay, and so its interval grows, towards max_interval, but at most
+    doubling per poll, so a single quiet poll cannot park a query for an
+    hour. A poll whose pages were all new may have missed jobs further down,
+    so it halves the interval instead.
+
+    Due times sit in a heap, so picking the next query is O(log n) however
+    many queries are watched.
+    """
+
+    def __init__(
+        self,
+        queries: Iterable[str],
+        min_interval: float = 60.0,
+        max_interval: float = 3600.0,
+        initial_interval: float = 300.0,
+        target_new: float = 1.0,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.min_interval = max(1.0, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.initial_interval = min(max(float(initial_interval), self.min_interval), self.max_interval)
+        self.target_new = max(0.1, float(target_new))
+        self.smoothing = min(max(float(smoothing), 0.01), 1.0)
+        self.clock = clock
+        self.queries: Dict[str, QuerySchedule] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        now = clock()
+        for i, q in enumerate(dict.fromkeys(queries)):
+            self.queries[q] = QuerySchedule(query=q, interval=self.initial_interval, due=now)
+            heapq.heappush(self._heap, (now, i, q))
+        self._order = len(self.queries)
+
+    def next_due(self) -> float:
+        """When the earliest query is due (clock time)."""
+        return self._heap[0][0]
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Remove and return every query due by `now`, earliest first; they must be passed back to record()."""
+        now = self.clock() if now is None else now
+        due: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def record(self, query: str, new: int, saturated: bool = False, failed: bool = False) -> float:
+        """
+        Feed back one poll of `query` that found `new` new jobs and reschedule
+        it; returns the seconds until its next poll. A failed poll is retried
+        after the same interval and leaves the rate estimate alone.
+        """
+        s = self.queries[query]
+        now = self.clock()
+        if not failed:
+            s.polls += 1
+            s.new_jobs += new
+            elapsed = now - s.last_poll if s.last_poll is not None else self.initial_interval
+            sample = new / max(elapsed, 1e-3)
+            s.rate = sample if s.rate is None else s.rate + self.smoothing * (sample - s.rate)
+            # The time for `target_new` jobs to arrive, at the smoothed rate
+            wanted = self.target_new / s.rate if s.rate > 0 else self.max_interval
+            s.interval = min(wanted, s.interval * 2)
+            if saturated:
+                s.interval = s.interval / 2
+            s.interval = min(max(s.interval, self.min_interval), self.max_interval)
+            s.last_poll = now
+        s.due = now + s.interval
+        heapq.heappush(self._heap, (s.due, self._order, query))
+        self._order += 1
+        return s.interval
+
+    def run(
+        self,
+        poll: Callable[[List[str]], Dict[str, PollResult]],
+        stop: threading.Event,
+        max_cycles: int = 0,
+    ) -> int:
+        """
+        Sleep until queries are due and hand them to `poll` together, until
+        `stop` is set (or after `max_cycles` polls). Returns the polls made.
+        """
+        cycles = 0
+        while not stop.is_set():
+            delay = self.next_due() - self.clock()
+            if delay > 0 and stop.wait(delay):
+                break
+            due = self.pop_due()
+            if not due:
+                continue
+            results = poll(due)
+            for q in due:
+                r = results.get(q) or PollResult(failed=True)
+                interval = self.record(q, r.new, saturated=r.saturated, failed=r.failed)
+                logger.info(
+                    "Watch: '%s' had %d new jobs%s; next poll in %.0fs",
+                    q,
+                    r.new,
+                    " (poll failed)" if r.failed else "",
+                    interval,
+                )
+            cycles += 1
+            if max_cycles and cycles >= max_cycles:
+                break
+        return cycles
@@ -0,0 +1,65 @@
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.job_identity import job_key
+from utils.time_utils import now_iso
+
+logger = logging.getLogger("seen_index")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_jobs (
+    key        TEXT PRIMARY KEY,
+    job_id     TEXT,
+    url        TEXT,
+    query      TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+class SeenJobsIndex:
+    """
+    Persistent on-disk set of jobs already scraped, keyed by job_key() (Job ID, else canonical URL).
+    Lets repeated polling runs emit only new jobs and stop paginating early.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        count = self._conn.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+        logger.info("Seen-jobs index %s holds %d jobs", path, count)
+
+    def partition(self, jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split `jobs` into (new, already_seen) with a single lookup."""
+        keys = [job_key(j) for j in jobs]
+        wanted = [k for k in keys if k]
+        seen = set()
+        if wanted:
+            placeholders = ",".join("?" * len(wanted))
+            rows = self._conn.execute(f"SELECT key FROM seen_jobs WHERE key IN ({placeholders})", wanted)
+            seen = {r[0] for r in rows}
+        new, old = [], []
+        for k, j in zip(keys, jobs):
+            # Jobs without any identity cannot be tracked and are always treated as new
+            (old if k in seen else new).append(j)
+        return new, old
+
+    def mark(self, jobs: List[Dict[str, Any]], query: Optional[str] = None) -> None:
+        ts = now_iso()
+        rows = [(job_key(j), j.get("Job ID"), j.get("URL"), query, ts, ts) for j in jobs if job_key(j)]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO seen_jobs (key, job_id, url, query, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET last_seen = excluded.last_seen",
+                rows,
+            )
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,19 +1,39 @@
 import argparse
+import hashlib
 import json
 import logging
 import os
+import signal
 import sys
+import threading
+import time
+from dataclasses import asdict
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from extractors.detail_parser import parse_job_detail
+from extractors.enrichment import DetailEnricher, EnrichmentStore
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
 from extractors.job_parser import UpworkJobParser
-from extractors.proxy_manager import ProxyManager
+from extractors.parse_pool import ArchiveReplay, ParsePipeline
+from extractors.proxy_manager import ProxyManager, redact
+from extractors.rate_control import RateController
+from extractors.response_cache import ResponseCache
+from extractors.session_pool import SessionPool
 from extractors.cookie_handler import CookieHandler
 from filters.query_builder import build_search_url
-from filters.pagination import PagePlan
+from filters.dedup import StreamingDeduper
+from filters.job_filters import JobFilter
+from filters.pagination import IncrementalCutoff, PagePlan
+from filters.schedule import PollResult, PollScheduler
+from filters.seen_index import SeenJobsIndex
 from utils.logger import configure_logging
+from utils.metrics import Metrics
 from utils.time_utils import now_iso
-from output.data_exporter import DataExporter
+from output.checkpoint import CheckpointJournal
+from output.data_exporter import DataExporter, read_records
+from output.page_archive import PageArchive
+from output.page_writer import PageWriter
 
 def load_json(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
@@ -36,12 +56,47 @@ def main() -> None:
         default=os.path.join(os.path.dirname(__file__), "..", "data"),
         help="Directory to write output files.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Number of pages fetched in parallel (overrides the 'concurrency' config key).",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Number of processes parsing pages; 0 parses inline in the fetch threads (overrides 'parse_workers').",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Emit only jobs not seen in earlier runs and stop paginating once pages are mostly repeats.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint journal, appending to its output files.",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        default=None,
+        help="Re-parse pages from a page archive instead of fetching (no network); uses all cores by default.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and poll each query on its own schedule, adapted to how often it gets new jobs.",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Enable debug logging.",
     )
     args = parser.parse_args()
+    if args.watch and args.replay:
+        parser.error("--watch and --replay cannot be combined")
 
     configure_logging(level=logging.DEBUG if args.verbose else logging.INFO)
     logger = logging.getLogger("main")
@@ -62,6 +117,14 @@ def main() -> None:
     per_page = max(1, int(config.get("per_page", 10)))
     filters = config.get("filters", {}) or {}
 
+    # Run metrics: per-stage timings and counters, a JSON report, optional Prometheus export and profiles
+    metrics_cfg = config.get("metrics") or {}
+    metrics = None
+    if metrics_cfg.get("enabled"):
+        metrics = Metrics(profile=metrics_cfg.get("profile") or (), trace=bool(metrics_cfg.get("trace", False)))
+        if metrics_cfg.get("prometheus_port"):
+            metrics.serve(int(metrics_cfg["prometheus_port"]), host=metrics_cfg.get("prometheus_host", "127.0.0.1"))
+
     # Cookies & proxies
     cookie_string = config.get("cookies", "")
     use_proxies = bool(config.get("use_proxies", False))
@@ -72,21 +135,109 @@ def main() -> None:
     cookie_handler = CookieHandler(cookie_string=cookie_string)
     session_cookies = cookie_handler.get_requests_cookiejar()
 
-    proxy_manager = ProxyManager(proxy_file) if use_proxies else None
+    # Several signed-in identities, each with its own session, rate budget and optional sticky proxy
+    pool_cfg = config.get("session_pool") or {}
+    session_pool = None
+    if pool_cfg.get("enabled") and not args.replay:
+        session_pool = SessionPool.from_file(
+            pool_cfg.get("path") or os.path.join(os.path.dirname(__file__), "..", "data", "identities.json"),
+            rps=float(pool_cfg.get("rps", 0)),
+            burst=float(pool_cfg.get("burst", 1)),
+            concurrency=pool_cfg.get("concurrency"),
+            pause=float(pool_cfg.get("pause_seconds", 60)),
+            metrics=metrics,
+        )
 
-    exporter = DataExporter()
-    parser_engine = UpworkJobParser(cookies=session_cookies)
+    proxy_manager = (
+        ProxyManager(
+            proxy_file,
+            failure_threshold=int(config.get("proxy_failure_threshold", 3)),
+            quarantine_base=float(config.get("proxy_quarantine_seconds", 30)),
+            metrics=metrics,
+        )
+        if use_proxies
+        else None
+    )
+
+    concurrency = args.concurrency if args.concurrency is not None else config.get("concurrency", 1)
+    concurrency = max(1, int(concurrency))
+    per_proxy_limit = config.get("per_proxy_concurrency")
+    parse_workers = args.parse_workers if args.parse_workers is not None else config.get("parse_workers", 0)
+    parse_workers = max(0, int(parse_workers))
+    if args.watch and parse_workers:
+        # A poll is a handful of pages; parse processes would be respawned every cycle for little gain
+        logger.info("Watch mode parses pages inline; ignoring parse_workers=%d", parse_workers)
+        parse_workers = 0
+    if metrics is not None and parse_workers and "parse" in metrics.profile_stages:
+        # cProfile only sees this process; worker parses are still timed and counted
+        logger.info("Parse profiling covers inline parsing only; set parse_workers=0 to profile it")
+
+    # Detail-page enrichment for the fields search results lack; never in replays (no network)
+    enrich_cfg = config.get("enrichment") or {}
+    enrich_enabled = bool(enrich_cfg.get("enabled")) and not args.replay
+    enrich_workers = max(1, int(enrich_cfg.get("workers", 4))) if enrich_enabled else 0
+
+    # Pacing, AIMD concurrency and retries; search plus detail workers are the ceiling AIMD may climb to
+    rate_cfg = config.get("rate_limit") or {}
+    rate_controller = RateController(
+        host_rps=float(rate_cfg.get("host_rps", 0)),
+        proxy_rps=float(rate_cfg.get("proxy_rps", 0)),
+        burst=float(rate_cfg.get("burst", 1)),
+        initial_concurrency=int(rate_cfg.get("initial_concurrency", concurrency + enrich_workers)),
+        max_concurrency=concurrency + enrich_workers,
+        max_retries=int(rate_cfg.get("max_retries", 3)),
+        latency_target=rate_cfg.get("latency_target"),
+    )
+
+    # Optional disk cache of fetched pages, shared across runs
+    cache_cfg = config.get("response_cache") or {}
+    response_cache = None
+    if cache_cfg.get("enabled"):
+        response_cache = ResponseCache(
+            path=cache_cfg.get("path") or os.path.join(args.outdir, "http_cache.sqlite3"),
+            # A poll must see the live page, so watch mode always revalidates (a 304 is still cheap)
+            ttl=0 if args.watch else float(cache_cfg.get("ttl_seconds", 900)),
+            max_bytes=int(float(cache_cfg.get("max_mb", 256)) * 1024 * 1024),
+        )
+
+    exporter = DataExporter(metrics=metrics)
+    parser_engine = UpworkJobParser(
+        cookies=session_cookies,
+        # Search and detail fetches share the sessions, so size their pools for both
+        pool_size=concurrency + enrich_workers,
+        html_backend=config.get("html_backend", "auto"),
+        cache=response_cache,
+        connect_timeout=float(config.get("connect_timeout", 10)),
+        # The server treats search filters as hints; enforce them while parsing
+        job_filter=JobFilter.from_config(filters),
+        metrics=metrics,
+    )
 
     ensure_dir(args.outdir)
 
-    all_results: List[Dict[str, Any]] = []
+    total_items = 0
     run_started = now_iso()
-    logger.info("Scrape started at %s", run_started)
+    logger.info(
+        "Scrape started at %s (concurrency=%d, parse_workers=%d, html_backend=%s)",
+        run_started,
+        concurrency,
+        parse_workers,
+        parser_engine.backend.name,
+    )
 
-    for q in queries:
-        page_plan = PagePlan(total_pages=pages, per_page=per_page)
-        logger.info("Query '%s' with %d pages × %d per page", q, pages, per_page)
+    # Incremental mode: a persistent index of jobs from earlier runs
+    # Replays regenerate data from old pages, so they never consult or update the seen-jobs index
+    # Watching is only useful for new jobs, so it is always incremental
+    incremental = not args.replay and (args.watch or args.incremental or bool(config.get("incremental", False)))
+    seen_index = None
+    cutoff = None
+    if incremental:
+        seen_index = SeenJobsIndex(config.get("seen_index") or os.path.join(args.outdir, "seen_jobs.sqlite3"))
+        cutoff = IncrementalCutoff(threshold=float(config.get("incremental_cutoff", 0.8)))
 
+    def plan_query(q: str, start: int) -> List[WorkItem]:
+        page_plan = PagePlan(total_pages=pages, per_page=per_page)
+        items = []
         for p in page_plan.iter_pages():
             url = build_search_url(
                 query=q,
@@ -94,41 +245,457 @@ def main() -> None:
                 per_page=per_page,
                 filter_cfg=filters,
             )
+            items.append(WorkItem(seq=start + len(items), query=q, page=p, url=url))
+        return items
 
-            # Rotate proxy (if any)
-            proxies = proxy_manager.next_requests_proxy() if proxy_manager else None
-            try:
-                batch = parser_engine.fetch_and_parse(url=url, proxies=proxies)
-            except Exception as e:
-                logger.exception("Error parsing page %s: %s", url, e)
-                batch = []
-
-            # Inject metadata & limit to per_page if upstream returns more
-            for item in batch[:per_page]:
-                item.setdefault("Date Scraped", now_iso())
-                item.setdefault("Query", q)
-                item.setdefault("Source", "Upwork Jobs Search")
-                all_results.append(item)
+    work_items: List[WorkItem] = []
+    for q in queries if not (args.replay or args.watch) else []:
+        logger.info("Query '%s' with %d pages × %d per page", q, pages, per_page)
+        work_items.extend(plan_query(q, len(work_items)))
+
+    # Progress journal, so an interrupted run can be resumed instead of restarted
+    checkpoint_cfg = config.get("checkpoint") or {}
+    journal = None
+    resume_state = None
+    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    # A watch never finishes, so there is no run to resume; the seen-jobs index carries it across restarts
+    if checkpoint_cfg.get("enabled", True) and not args.replay and not args.watch:
+        journal_path = checkpoint_cfg.get("path") or os.path.join(args.outdir, "checkpoint.jsonl")
+        journal = CheckpointJournal(
+            journal_path,
+            sync_every=int(checkpoint_cfg.get("fsync_every", 32)),
+            sync_interval=float(checkpoint_cfg.get("fsync_seconds", 5)),
+        )
+        if args.resume:
+            resume_state = CheckpointJournal.load(journal_path)
+            if resume_state is None or resume_state.finished:
+                logger.info("No interrupted run in %s; starting a new run", journal_path)
+                resume_state = None
+    elif args.resume:
+        logger.warning("--resume needs the checkpoint journal; starting a new run")
+
+    plan = hashlib.sha1(
+        json.dumps([queries, pages, per_page, filters], sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    if resume_state is not None:
+        if resume_state.plan != plan:
+            logger.warning("Queries or filters changed since the interrupted run; resuming by (query, page)")
+        timestamp = resume_state.run
+        work_items = [it for it in work_items if (it.query, it.page) not in resume_state.completed]
+        total_items = resume_state.total_items
+        if cutoff is not None:
+            cutoff.stopped.update(resume_state.stopped)
+        logger.info(
+            "Resuming run %s: %d pages already done, %d left",
+            timestamp,
+            len(resume_state.completed),
+            len(work_items),
+        )
+
+    if incremental:
+        # Page-major order: every query's first page goes out together; chained fetching (below) then
+        # holds each later page back until the query's previous page has been judged
+        work_items.sort(key=lambda it: (it.page, it.seq))
+        work_items = [WorkItem(seq=i, query=it.query, page=it.page, url=it.url) for i, it in enumerate(work_items)]
+
+    # Optional archive of every fetched page, for re-parsing later with --replay
+    archive_cfg = config.get("page_archive") or {}
+    page_archive = None
+    if archive_cfg.get("enabled") and not args.replay:
+        archive_path = archive_cfg.get("path") or os.path.join(args.outdir, f"upwork_pages_{timestamp}.pga")
+        page_archive = PageArchive(archive_path, run_id=timestamp)
+        logger.info("Archiving fetched pages -> %s", archive_path)
+
+    def fetch_page(item: WorkItem, proxies, identity=None):
+        html, fetched_at = parser_engine.fetch_page(url=item.url, proxies=proxies, identity=identity)
+        return fetched_page(item, html, fetched_at)
+
+    def cached_page(item: WorkItem, identity=None):
+        # Checked before any rate, proxy or identity budget is spent on the item
+        page = parser_engine.cached_page(item.url, identity)
+        return fetched_page(item, *page) if page is not None else None
+
+    def cached_detail(item: WorkItem, identity=None):
+        page = parser_engine.cached_page(item.url, identity)
+        return parse_job_detail(page[0]) if page is not None else None
+
+    def fetched_page(item: WorkItem, html: str, fetched_at: float):
+        if page_archive is not None:
+            page_archive.append(item.url, item.query, item.page, html, seq=item.seq, fetched_at=fetched_at)
+        # With parse workers, fetch threads only download and pages are parsed in separate processes
+        return (html, fetched_at) if parse_workers else parser_engine.parse_html(html, fetched_at)
+
+    fetcher = ConcurrentFetcher(
+        fetch_fn=fetch_page,
+        concurrency=concurrency,
+        proxy_manager=proxy_manager,
+        per_proxy_limit=per_proxy_limit,
+        should_fetch=(lambda item: not cutoff.is_stopped(item.query)) if cutoff else None,
+        rate_controller=rate_controller,
+        session_pool=session_pool,
+        cached_fn=cached_page if response_cache is not None else None,
+    )
+    enricher = None
+    enrichment_store = None
+    if enrich_enabled:
+        enrichment_store = EnrichmentStore(
+            enrich_cfg.get("store") or os.path.join(args.outdir, "enriched_jobs.sqlite3"),
+            ttl=float(enrich_cfg.get("ttl_hours", 24)) * 3600,
+        )
+        # Same proxies, health scores and rate limits as the search phase
+        detail_fetcher = ConcurrentFetcher(
+            fetch_fn=lambda item, proxies, identity=None: parse_job_detail(
+                parser_engine.fetch_html(url=item.url, proxies=proxies, identity=identity)
+            ),
+            concurrency=enrich_workers,
+            proxy_manager=proxy_manager,
+            per_proxy_limit=per_proxy_limit,
+            rate_controller=rate_controller,
+            session_pool=session_pool,
+            cached_fn=cached_detail if response_cache is not None else None,
+        )
+        enricher = DetailEnricher(detail_fetcher, workers=enrich_workers, store=enrichment_store)
+
+    pipeline = None
+    replay = None
+    if args.replay:
+        replay = ArchiveReplay(args.replay, parser_engine, workers=parse_workers or None)
+    elif parse_workers:
+        pipeline = ParsePipeline(
+            fetcher,
+            parser_engine,
+            workers=parse_workers,
+            queue_size=config.get("parse_queue_size"),
+        )
+
+    # Streaming outputs: each page is appended and flushed as soon as it is processed
+    output_formats = config.get("output_formats") or ["json", "csv"]
+    sinks = {}
+    try:
+        for fmt in output_formats:
+            fmt = fmt.lower()
+            path = os.path.join(args.outdir, f"upwork_jobs_{timestamp}.{fmt}")
+            if fmt == "sqlite":
+                # One store accumulates every run; repeated jobs are updated in place
+                path = config.get("job_store") or os.path.join(args.outdir, "upwork_jobs.sqlite3")
+            resume_at = None
+            if resume_state is not None:
+                path = resume_state.outputs.get(fmt, path)
+                resume_at = resume_state.positions.get(fmt) if os.path.exists(path) else None
+            sinks[fmt] = exporter.open_sink(fmt, path, resume=resume_at)
+            logger.info("%s %s -> %s", "Appending" if resume_at else "Writing", fmt.upper(), sinks[fmt].path)
+        if journal is not None:
+            journal.before_sync = lambda: [sink.sync() for sink in sinks.values()]
+            journal.start(timestamp, plan, {fmt: sink.path for fmt, sink in sinks.items()}, resume=resume_state)
+
+        # Cross-query dedup: later sightings of a job are merged into its "Queries" list
+        dedup_cfg = config.get("dedup") or {}
+        deduper = None
+        if dedup_cfg.get("enabled"):
+            deduper = StreamingDeduper(
+                window=int(dedup_cfg.get("window", 500)),
+                lru_size=int(dedup_cfg.get("lru_size", 100_000)),
+                capacity=int(dedup_cfg.get("capacity", 1_000_000)),
+                error_rate=float(dedup_cfg.get("error_rate", 1e-6)),
+            )
+            if resume_state is not None and resume_state.positions:
+                # The window's memory died with the interrupted process; rebuild it from what was written
+                fmt = next((f for f in ("jsonl", "csv", "json", "columnar") if f in sinks), None)
+                if fmt is not None:
+                    primed = deduper.prime(read_records(fmt, sinks[fmt].path))
+                    logger.info("Dedup: primed with %d jobs already written", primed)
+        # Jobs count as seen only once written and journaled: a crash in between re-emits them rather than losing them
+        writer = PageWriter(
+            sinks,
+            journal=journal,
+            deduper=deduper,
+            on_durable=(lambda item, jobs: seen_index.mark(jobs, query=item.query)) if seen_index else None,
+            written=total_items,
+            enricher=enricher,
+            max_waiting=int(enrich_cfg.get("max_waiting", 256)),
+        )
+        budget_factor = float(enrich_cfg.get("time_budget_factor", 2.0))
+        scheduler = None
+
+        def handle(item: WorkItem, batch: List[Dict[str, Any]], error: Optional[Exception]) -> int:
+            """Write one fetched page; returns how many of its jobs were new and not duplicates of another query's."""
+            nonlocal total_items
+            if error is not None:
+                logger.error("Error parsing page %s: %s", item.url, error, exc_info=error)
+
+            # Inject metadata & limit to per_page if upstream returns more (archived pages are kept whole)
+            page_items = batch if replay else batch[:per_page]
+            scraped = page_items
+            stopped = False
+            if seen_index is not None:
+                fresh, repeats = seen_index.partition(page_items)
+                stopped = cutoff.observe(item.query, seen=len(repeats), total=len(page_items))
+                if stopped:
+                    logger.info(
+                        "Query '%s' page %d: %d/%d jobs already seen; skipping remaining pages",
+                        item.query,
+                        item.page,
+                        len(repeats),
+                        len(page_items),
+                    )
+                page_items = fresh
+            for job in page_items:
+                job.setdefault("Query", item.query)
+                job.setdefault("Source", "Upwork Jobs Search")
+            # Failed pages stay out of the journal, so a resumed run retries them
+            kept = writer.write_page(item, page_items, ok=error is None, stopped=stopped, payload=scraped)
+            total_items += kept
+            if metrics is not None:
+                metrics.inc("pages_total", outcome="error" if error is not None else "ok")
+                metrics.inc("jobs_written_total", kept)
 
             logger.info(
-                "Query '%s' page %d: collected %d items (total=%d)",
-                q,
-                p,
-                len(batch[:per_page]),
-                len(all_results),
+                "Query '%s' page %d: collected %d items%s (total=%d)",
+                item.query,
+                item.page,
+                len(page_items),
+                f", {kept} after dedup" if deduper is not None else "",
+                total_items,
             )
+            return kept
 
-    # Export
-    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    json_path = os.path.join(args.outdir, f"upwork_jobs_{timestamp}.json")
-    csv_path = os.path.join(args.outdir, f"upwork_jobs_{timestamp}.csv")
+        def flush(started: float) -> None:
+            # Detail pages still queued get at most `time_budget_factor` × the search phase's duration
+            deadline = None
+            if enricher is not None and budget_factor > 0:
+                now = time.monotonic()
+                deadline = now + budget_factor * (now - started)
+            writer.flush(deadline=deadline)
+
+        if args.watch:
+            watch_cfg = config.get("watch") or {}
+            scheduler = PollScheduler(
+                queries,
+                min_interval=float(watch_cfg.get("min_interval", 60)),
+                max_interval=float(watch_cfg.get("max_interval", 3600)),
+                initial_interval=float(watch_cfg.get("initial_interval", 300)),
+                target_new=float(watch_cfg.get("target_new", 1.0)),
+                smoothing=float(watch_cfg.get("smoothing", 0.3)),
+            )
+            polled = 0
+
+            def poll(due: List[str]) -> Dict[str, PollResult]:
+                nonlocal polled
+                started = time.monotonic()
+                items: List[WorkItem] = []
+                for q in due:
+                    cutoff.stopped.discard(q)
+                    items.extend(plan_query(q, 0))
+                # Page-major, as in incremental runs; seqs keep growing so archived pages replay in order
+                items.sort(key=lambda it: (it.page, due.index(it.query)))
+                items = [WorkItem(seq=polled + i, query=it.query, page=it.page, url=it.url) for i, it in enumerate(items)]
+                polled += len(items)
+                results = {q: PollResult() for q in due}
+                for item, batch, error in fetcher.run(items, chained=True):
+                    results[item.query].new += handle(item, batch, error)
+                    if error is not None:
+                        results[item.query].failed = True
+                flush(started)
+                for q, r in results.items():
+                    # No page was mostly repeats, so newer jobs may have pushed some past the last page
+                    r.saturated = not cutoff.is_stopped(q)
+                if metrics is not None and metrics_cfg.get("prometheus_file"):
+                    metrics.write_prometheus(metrics_cfg["prometheus_file"])
+                return results
+
+            # SIGTERM finishes the current poll, then shuts down like Ctrl-C
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            logger.info("Watching %d queries; press Ctrl-C to stop", len(queries))
+            try:
+                scheduler.run(poll, stop, max_cycles=int(watch_cfg.get("max_cycles", 0)))
+            except KeyboardInterrupt:
+                logger.info("Interrupted; shutting down")
+        else:
+            search_started = time.monotonic()
 
-    exporter.to_json(all_results, json_path)
-    exporter.to_csv(all_results, csv_path)
+            # Results arrive in work-item order, so output is identical to a sequential run
+            if replay is not None:
+                results = replay.run()
+            else:
+                # Incremental runs judge each page before asking for the query's next one
+                results = (pipeline or fetcher).run(work_items, chained=incremental)
+            for item, batch, error in results:
+                handle(item, batch, error)
+            flush(search_started)
+            if journal is not None:
+                journal.finish()
+    finally:
+        if journal is not None:
+            journal.close()
+        # Closing terminates the JSON array, so partial runs still leave valid files
+        for sink in sinks.values():
+            sink.close()
+        if seen_index is not None:
+            seen_index.close()
+        if response_cache is not None:
+            response_cache.close()
+        if page_archive is not None:
+            page_archive.close()
+        if enricher is not None:
+            enricher.close()
+            enrichment_store.close()
 
-    logger.info("Wrote JSON -> %s", json_path)
-    logger.info("Wrote CSV  -> %s", csv_path)
-    logger.info("Scrape finished at %s (items=%d)", now_iso(), len(all_results))
+    stats = parser_engine.stats
+    logger.info(
+        "Parser: %d pages (%d from embedded state), %d card candidates, %d pruned as nested duplicates, %d jobs",
+        stats.pages,
+        stats.ssr_pages,
+        stats.candidates,
+        stats.pruned,
+        stats.jobs,
+    )
+    if stats.rejected:
+        logger.info(
+            "Filters: %d jobs dropped client-side (%s)",
+            sum(stats.rejected.values()),
+            ", ".join(f"{k}={v}" for k, v in sorted(stats.rejected.items(), key=lambda kv: -kv[1])),
+        )
+    if pipeline is not None:
+        ps = pipeline.stats
+        logger.info(
+            "Pipeline: fetch %d workers %.0f%% busy (%.1fs blocked on a full queue), "
+            "parse %d workers %.0f%% busy, peak queue %d/%d; bottleneck: %s",
+            ps.fetch.workers,
+            ps.fetch.utilization(ps.wall) * 100,
+            ps.fetch.blocked,
+            ps.parse.workers,
+            ps.parse.utilization(ps.wall) * 100,
+            ps.max_queue_depth,
+            pipeline.queue_size,
+            ps.bottleneck(),
+        )
+    if replay is not None:
+        rp = replay.stats.parse
+        logger.info(
+            "Replay: %d pages re-parsed by %d workers in %.1fs (%.0f%% busy)",
+            rp.items,
+            rp.workers,
+            replay.stats.wall,
+            rp.utilization(replay.stats.wall) * 100,
+        )
+    if page_archive is not None:
+        logger.info(
+            "Page archive: %d pages, %.1f KiB stored (%.1f KiB raw)",
+            page_archive.count,
+            page_archive.stored_bytes / 1024,
+            page_archive.raw_bytes / 1024,
+        )
+    if deduper is not None:
+        ds = deduper.stats
+        logger.info(
+            "Dedup: %d unique jobs, %d cross-query repeats merged, %d late repeats dropped",
+            ds.unique,
+            ds.merged,
+            ds.late,
+        )
+    if "sqlite" in sinks:
+        store = sinks["sqlite"]
+        logger.info("Job store: %d jobs added, %d updated in place (%s)", store.inserted, store.updated, store.path)
+    if enricher is not None:
+        es = enricher.stats
+        logger.info(
+            "Enrichment: %d detail pages fetched (%d failed), %d from store, %d already complete, "
+            "%d skipped at the time budget",
+            es.fetched,
+            es.failed,
+            es.cached,
+            es.complete,
+            es.expired,
+        )
+    if scheduler is not None:
+        for sq in scheduler.queries.values():
+            logger.info(
+                "Watch: '%s' polled %d times, %d new jobs, %.1f jobs/hour, last interval %.0fs",
+                sq.query,
+                sq.polls,
+                sq.new_jobs,
+                (sq.rate or 0.0) * 3600,
+                sq.interval,
+            )
+    if incremental:
+        logger.info("Incremental: %d page requests skipped after cut-off", fetcher.skipped)
+    rs = rate_controller.stats
+    if not args.replay:
+        logger.info(
+            "Requests: %d sent, %d throttled, %d failed, %d retried, %d given up; final concurrency limit %d",
+            rs.requests,
+            rs.throttled,
+            rs.failed,
+            rs.retries,
+            rs.gave_up,
+            int(rate_controller.limiter.limit),
+        )
+    if proxy_manager is not None:
+        for h in sorted(proxy_manager.snapshot(), key=lambda x: -x.score()):
+            logger.info(
+                "Proxy %s: %d ok, %d failed, latency %.2fs, error rate %.0f%%, ban rate %.0f%%%s",
+                redact(h.url),
+                h.successes,
+                h.failures,
+                h.latency,
+                h.error_rate * 100,
+                h.ban_rate * 100,
+                " (quarantined)" if h.quarantined_until else "",
+            )
+    if session_pool is not None:
+        for ident in session_pool.snapshot():
+            logger.info(
+                "Identity %s: %d requests, %d throttled, %d failed%s",
+                ident.name,
+                ident.requests,
+                ident.throttled,
+                ident.failed,
+                f" (signed out: {ident.logged_out})" if ident.logged_out else "",
+            )
+    if response_cache is not None:
+        cs = response_cache.stats
+        logger.info(
+            "Response cache: %d hits, %d revalidated (304), %d misses, %d evicted, %.1f KiB of downloads saved",
+            cs.hits,
+            cs.revalidated,
+            cs.misses,
+            cs.evictions,
+            cs.bytes_saved / 1024,
+        )
+    if metrics is not None:
+        report_path = metrics_cfg.get("report") or os.path.join(args.outdir, f"run_report_{timestamp}.json")
+        extra: Dict[str, Any] = {
+            "args": vars(args),
+            "html_backend": parser_engine.backend.name,
+            "items": writer.written,
+            "outputs": {
+                fmt: {"path": sink.path, "bytes": os.path.getsize(sink.path) if os.path.exists(sink.path) else None}
+                for fmt, sink in sinks.items()
+            },
+            "parser": asdict(parser_engine.stats),
+            "requests": asdict(rate_controller.stats),
+        }
+        if pipeline is not None:
+            extra["pipeline"] = asdict(pipeline.stats)
+        if deduper is not None:
+            extra["dedup"] = asdict(deduper.stats)
+        if enricher is not None:
+            extra["enrichment"] = asdict(enricher.stats)
+        if response_cache is not None:
+            extra["response_cache"] = asdict(response_cache.stats)
+        if proxy_manager is not None:
+            extra["proxies"] = [dict(asdict(h), url=redact(h.url)) for h in proxy_manager.snapshot()]
+        if session_pool is not None:
+            extra["identities"] = [
+                {k: v for k, v in vars(i).items() if k not in ("cookies", "proxy")} for i in session_pool.snapshot()
+            ]
+        metrics.write_report(report_path, extra)
+        if metrics_cfg.get("prometheus_file"):
+            metrics.write_prometheus(metrics_cfg["prometheus_file"])
+        metrics.close()
+        logger.info("Run report: %s", report_path)
+    logger.info("Scrape finished at %s (items=%d)", now_iso(), writer.written)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
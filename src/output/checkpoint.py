@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger("checkpoint")
+
+Unit = Tuple[str, int]  # (query, page)
+
+@dataclass
+class CheckpointState:
+    """What an interrupted run had durably finished, as read back from its journal."""
+    run: str
+    plan: str
+    outputs: Dict[str, str]  # format -> path
+    completed: Set[Unit] = field(default_factory=set)
+    positions: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # format -> (offset, count)
+    stopped: Set[str] = field(default_factory=set)  # queries halted by the incremental cut-off
+    total_items: int = 0
+    finished: bool = False
+
+def _consistent(positions: Dict[str, Tuple[int, int]], outputs: Dict[str, str]) -> bool:
+    # A record is only usable if every output still holds the bytes it vouches for
+    for fmt, (offset, _) in positions.items():
+        path = outputs.get(fmt)
+        if not path or not os.path.exists(path) or os.path.getsize(path) < offset:
+            return False
+    return True
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines journal of completed (query, page) units and the
+    output positions right after each one was written.
+
+    Every record is flushed to the OS immediately, which survives a killed
+    process. fsync, which also survives a power loss, is batched: it runs
+    every `sync_every` records or `sync_interval` seconds, after `before_sync`
+    has synced the outputs, so the journal never points past durable output.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync_every: int = 32,
+        sync_interval: float = 5.0,
+        before_sync: Optional[Callable[[], None]] = None,
+    ):
+        self.path = path
+        self.sync_every = max(1, int(sync_every))
+        self.sync_interval = sync_interval
+        self.before_sync = before_sync
+        self.syncs = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._f = None
+
+    @staticmethod
+    def load(path: str) -> Optional[CheckpointState]:
+        """Read a journal back; None if there is none. A torn last line is ignored."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except FileNotFoundError:
+            return None
+        state: Optional[CheckpointState] = None
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            kind = rec.get("type")
+            if kind == "run":
+                state = CheckpointState(run=rec["run"], plan=rec.get("plan", ""), outputs=rec.get("outputs", {}))
+            elif state is None:
+                continue
+            elif kind == "unit":
+                positions = {fmt: tuple(pos) for fmt, pos in rec.get("positions", {}).items()}
+                if not _consistent(positions, state.outputs):
+                    # Outputs lost data past this point (e.g. power loss before their fsync)
+                    logger.warning("Checkpoint %s: outputs end before a journaled page; resuming from the last intact one", path)
+                    break
+                state.completed.add((rec["query"], int(rec["page"])))
+                state.positions = positions
+                state.total_items = int(rec.get("total", state.total_items))
+                if rec.get("stopped"):
+                    state.stopped.add(rec["query"])
+            elif kind == "snapshot":
+                state.completed.update((q, int(p)) for q, p in rec.get("completed", []))
+                state.positions = {fmt: tuple(pos) for fmt, pos in rec.get("positions", {}).items()}
+                state.stopped.update(rec.get("stopped", []))
+                state.total_items = int(rec.get("total", 0))
+            elif kind == "done":
+                state.finished = True
+        return state
+
+    def start(self, run: str, plan: str, outputs: Dict[str, str], resume: Optional[CheckpointState] = None) -> None:
+        """
+        Begin journaling a run. When resuming, the journal is rewritten as one
+        snapshot of `resume`, dropping torn or unusable trailing records.
+        """
+        lines = [{"type": "run", "run": run, "plan": plan, "outputs": outputs}]
+        if resume is not None:
+            lines.append({
+                "type": "snapshot",
+                "completed": sorted([q, p] for q, p in resume.completed),
+                "positions": resume.positions,
+                "stopped": sorted(resume.stopped),
+                "total": resume.total_items,
+            })
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def record(
+        self,
+        query: str,
+        page: int,
+        positions: Dict[str, Tuple[int, int]],
+        items: int,
+        total: int,
+        stopped: bool = False,
+    ) -> None:
+        rec = {
+            "type": "unit",
+            "query": query,
+            "page": page,
+            "items": items,
+            "total": total,
+            "positions": positions,
+        }
+        if stopped:
+            rec["stopped"] = True
+        self._append(rec)
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def finish(self) -> None:
+        """Mark the run complete, so a later --resume starts afresh."""
+        self._append({"type": "done"})
+        self.sync()
+
+    def _append(self, rec: Dict) -> None:
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def sync(self) -> None:
+        if self._f is None or self._f.closed:
+            return
+        if self.before_sync is not None:
+            self.before_sync()
+        os.fsync(self._f.fileno())
+        self.syncs += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._f is not None and not self._f.closed:
+            self.sync()
+            self._f.close()
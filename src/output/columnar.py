@@ -0,0 +1,378 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+    pq = None
+
+logger = logging.getLogger("columnar")
+
+# Columns that repeat a handful of values across a run: stored as integer codes into a dictionary
+DICTIONARY_COLUMNS = (
+    "Query",
+    "Source",
+    "Location",
+    "Skill Level",
+    "Project Payment Type",
+    "Payment Type",
+    "Experience Level",
+    "Project Length",
+    "Weekly Hours",
+)
+
+# Column file: a sequence of self-delimiting row groups, each
+#   header | metadata JSON | one zlib-compressed chunk per column
+# The metadata names each column's encoding and chunk length, and carries the
+# values a "dict" column added to the file-wide dictionary in this group, so the
+# file needs no footer: any prefix of whole groups is a complete file.
+MAGIC = b"UPWC"
+GROUP_HEADER = struct.Struct("<4sIII")  # magic, meta_len, body_len, crc32(meta + body)
+
+_SCALARS = (str, int, float, type(None))
+
+def _code_type(size: int) -> str:
+    return "B" if size <= 0x100 else "H" if size <= 0x10000 else "I"
+
+def _decode_group(buf, offset: int) -> Optional[Tuple[Dict[str, Any], int, int]]:
+    """(metadata, body offset, group length) of the group at `offset`; None if it is truncated or corrupt."""
+    end = offset + GROUP_HEADER.size
+    if end > len(buf):
+        return None
+    magic, meta_len, body_len, crc = GROUP_HEADER.unpack_from(buf, offset)
+    if magic != MAGIC or end + meta_len + body_len > len(buf):
+        return None
+    if zlib.crc32(buf[end:end + meta_len + body_len]) != crc:
+        return None
+    meta = json.loads(bytes(buf[end:end + meta_len]).decode("utf-8"))
+    return meta, end + meta_len, GROUP_HEADER.size + meta_len + body_len
+
+class ColumnarSink:
+    """
+    Compressed column-chunked output. Rows are buffered into row groups of
+    up to `row_group_size`; position() and sync() close the current group
+    early, so a checkpointed run gets a group per page and resumes exactly
+    like the text formats (truncate to the offset, keep appending).
+
+    Columns listed in DICTIONARY_COLUMNS are dictionary-encoded against one
+    dictionary for the whole file, grown group by group; every other column
+    is a JSON array, so values keep their types. A key some rows of a group
+    lack reads back as None for them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: Optional[Tuple[int, int]] = None,
+        columns: Sequence[str] = (),
+        row_group_size: int = 1000,
+        level: int = 6,
+    ):
+        self.path = path
+        self.columns = list(columns)
+        self._declared = set(self.columns)
+        self.row_group_size = row_group_size
+        self.level = level
+        self.count = 0
+        self.groups = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._codes: Dict[str, Dict[Any, int]] = {name: {} for name in DICTIONARY_COLUMNS}
+        if resume is not None:
+            offset, self.count = resume
+            os.truncate(path, offset)
+            # Rebuild the dictionaries from the groups already in the file
+            with open(path, "rb") as f:
+                buf = _mapped(f)
+                for meta, _, _ in _iter_groups(buf):
+                    for name, encoding, _, _, added in meta["columns"]:
+                        if encoding != "json":
+                            codes = self._codes.setdefault(name, {})
+                            for value in added:
+                                codes[value] = len(codes)
+                    self.groups += 1
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+            self._f = open(path, "ab")
+        else:
+            self._f = open(path, "wb")
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._pending.append(row)
+            self.count += 1
+            if len(self._pending) >= self.row_group_size:
+                self._flush_group()
+
+    def _flush_group(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        # A group stores the declared columns its rows have, in order, then any others as first seen
+        present: Dict[str, None] = {}
+        for row in rows:
+            present.update(dict.fromkeys(row))
+        names = [name for name in self.columns if name in present]
+        names += [name for name in present if name not in self._declared]
+        entries = []
+        chunks = []
+        for name in names:
+            values = [row.get(name) for row in rows]
+            added: List[Any] = []
+            if name in self._codes and all(isinstance(v, _SCALARS) for v in values):
+                codes = self._codes[name]
+                for value in values:
+                    if value not in codes:
+                        codes[value] = len(codes)
+                        added.append(value)
+                encoding = _code_type(len(codes))
+                packed = array(encoding, [codes[v] for v in values])
+                if sys.byteorder == "big":
+                    packed.byteswap()
+                raw = packed.tobytes()
+            else:
+                encoding = "json"
+                raw = json.dumps(values, ensure_ascii=False).encode("utf-8")
+            chunk = zlib.compress(raw, self.level)
+            entries.append([name, encoding, len(chunk), len(raw), added])
+            chunks.append(chunk)
+        meta = json.dumps({"rows": len(rows), "columns": entries}, ensure_ascii=False).encode("utf-8")
+        body = b"".join(chunks)
+        self._f.write(GROUP_HEADER.pack(MAGIC, len(meta), len(body), zlib.crc32(meta + body)) + meta + body)
+        self._f.flush()
+        self.groups += 1
+
+    def position(self) -> Tuple[int, int]:
+        """(byte offset, record count) after everything written so far."""
+        self._flush_group()
+        return self._f.tell(), self.count
+
+    def sync(self) -> None:
+        if not self._f.closed:
+            self._flush_group()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._flush_group()
+            self._f.close()
+
+    def __enter__(self) -> "ColumnarSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def _iter_groups(buf) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """(metadata, body offset, group length) of each whole group, up to a torn or corrupt tail."""
+    offset = 0
+    while offset < len(buf):
+        decoded = _decode_group(buf, offset)
+        if decoded is None:
+            break
+        yield decoded
+        offset += decoded[2]
+
+def _mapped(f) -> Any:
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+def read_columnar(path: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Records from a ColumnarSink file. With `columns`, only those chunks are decompressed."""
+    wanted = set(columns) if columns is not None else None
+    dictionaries: Dict[str, List[Any]] = {}
+    with open(path, "rb") as f:
+        buf = _mapped(f)
+        try:
+            for meta, pos, _ in _iter_groups(buf):
+                names = []
+                values = []
+                for name, encoding, size, _, added in meta["columns"]:
+                    dictionary = dictionaries.setdefault(name, []) if encoding != "json" else None
+                    if dictionary is not None:
+                        dictionary.extend(added)
+                    if wanted is None or name in wanted:
+                        raw = zlib.decompress(buf[pos:pos + size])
+                        if dictionary is None:
+                            column = json.loads(raw)
+                        else:
+                            codes = array(encoding)
+                            codes.frombytes(raw)
+                            if sys.byteorder == "big":
+                                codes.byteswap()
+                            column = [dictionary[c] for c in codes]
+                        names.append(name)
+                        values.append(column)
+                    pos += size
+                for row in zip(*values):
+                    yield dict(zip(names, row))
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+# Parquet column types; anything else is a string column
+PARQUET_TYPES = {
+    "Budget Min": "float64",
+    "Budget Max": "float64",
+    "Feedback": "float64",
+    "Proposals": "int64",
+    "Skills": "list",
+    "Queries": "list",
+}
+
+# Parquet column that collects keys outside the declared schema, as a JSON object
+PARQUET_SPILL_COLUMN = "Extra"
+
+def _parquet_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if kind == "string":
+        return value if isinstance(value, str) else str(value)
+    if value == "":
+        return None
+    if kind == "float64":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if kind == "int64":
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if kind == "list":
+        return [str(v) for v in value] if isinstance(value, list) else [s.strip() for s in str(value).split(",")]
+    return None
+
+class ParquetSink:
+    """
+    Parquet output through pyarrow, one row group per `row_group_size` rows,
+    zstd-compressed with dictionary pages for DICTIONARY_COLUMNS. Columns are
+    typed: budgets and feedback are doubles, proposals integers, skills and
+    queries string lists; keys outside `columns` go to the Extra column.
+
+    A Parquet file is only readable once its footer is written on close(), so
+    it cannot be appended to: a resumed run copies the rows the checkpoint
+    counted out of the previous file into a new one, then carries on. An
+    interrupted run that never reached close() (killed outright) leaves no
+    footer; that file is kept as <path>.interrupted and its rows are lost.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: Optional[Tuple[int, int]] = None,
+        columns: Sequence[str] = (),
+        row_group_size: int = 10_000,
+    ):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output")
+        self.path = path
+        self.columns = list(columns)
+        self.row_group_size = row_group_size
+        self.count = 0
+        self._known = set(self.columns)
+        self._pending: List[Dict[str, Any]] = []
+        fields = []
+        for name in self.columns + [PARQUET_SPILL_COLUMN]:
+            kind = PARQUET_TYPES.get(name, "string")
+            fields.append(pa.field(name, pa.list_(pa.string()) if kind == "list" else getattr(pa, kind)()))
+        self.schema = pa.schema(fields)
+        previous = None
+        if resume is not None and os.path.exists(path):
+            previous = path + ".resume"
+            os.replace(path, previous)
+        self._writer = pq.ParquetWriter(
+            path,
+            self.schema,
+            compression="zstd",
+            use_dictionary=[name for name in DICTIONARY_COLUMNS if name in self._known],
+        )
+        if previous is not None:
+            self._carry_over(previous, resume[1])
+
+    def _carry_over(self, previous: str, count: int) -> None:
+        """Copy the first `count` rows of the interrupted run's file, then drop it."""
+        try:
+            parquet = pq.ParquetFile(previous)
+            for batch in parquet.iter_batches(batch_size=self.row_group_size):
+                if self.count >= count:
+                    break
+                batch = batch.slice(0, count - self.count)
+                table = pa.Table.from_batches([batch]).select(self.schema.names).cast(self.schema)
+                self._writer.write_table(table)
+                self.count += table.num_rows
+        except (OSError, KeyError, pa.ArrowException) as e:
+            kept = os.path.splitext(previous)[0] + ".interrupted"
+            os.replace(previous, kept)
+            logger.error(
+                "Cannot read the interrupted Parquet output (%s); %d of its %d rows are lost, the file is kept as %s",
+                e,
+                count - self.count,
+                count,
+                kept,
+            )
+            return
+        os.remove(previous)
+        if self.count < count:
+            logger.warning("Parquet output held %d of the %d rows checkpointed", self.count, count)
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._pending.append(row)
+            self.count += 1
+            if len(self._pending) >= self.row_group_size:
+                self._flush_group()
+
+    def _flush_group(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        data = {
+            name: [_parquet_value(row.get(name), PARQUET_TYPES.get(name, "string")) for row in rows]
+            for name in self.columns
+        }
+        extra = []
+        for row in rows:
+            spill = {k: v for k, v in row.items() if k not in self._known}
+            extra.append(json.dumps(spill, ensure_ascii=False, default=str) if spill else None)
+        data[PARQUET_SPILL_COLUMN] = extra
+        self._writer.write_table(pa.Table.from_pydict(data, schema=self.schema))
+
+    def position(self) -> Tuple[int, int]:
+        # The file is rewritten on resume from its first `count` rows, so only the count matters
+        return 0, self.count
+
+    def sync(self) -> None:
+        """Nothing to force: a Parquet file only becomes readable once close() writes its footer."""
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._flush_group()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def read_parquet(path: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Records from a ParquetSink file, with the Extra column unpacked back into each record."""
+    if pq is None:
+        raise ImportError("pyarrow is required to read Parquet output")
+    parquet = pq.ParquetFile(path)
+    for group in range(parquet.num_row_groups):
+        for row in parquet.read_row_group(group, columns=columns).to_pylist():
+            extra = row.pop(PARQUET_SPILL_COLUMN, None)
+            if extra:
+                row.update(json.loads(extra))
+            yield row
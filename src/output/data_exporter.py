@@ -1,13 +1,246 @@
 import csv
 import json
-from typing import Any, Dict, List
+import logging
+import os
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from output.columnar import ColumnarSink, ParquetSink, pq, read_columnar, read_parquet
+from output.job_store import JobStore
+from utils.metrics import Metrics
+
+logger = logging.getLogger("data_exporter")
+
+# Preferred column order for tabular outputs
+COLUMNS = [
+    "Date Scraped",
+    "Job ID",
+    "Time Posted",
+    "Project Payment Type",
+    "Payment Type",
+    "Budget",
+    "Budget Min",
+    "Budget Max",
+    "Skill Level",
+    "Experience Level",
+    "Title",
+    "URL",
+    "Description",
+    "Location",
+    "Total Spent",
+    "Feedback",
+    "Proposals",
+    "Project Length",
+    "Weekly Hours",
+    "Skills",
+    "Query",
+    "Queries",
+    "Source",
+]
+
+# CSV column that collects keys outside the declared schema, as a JSON object
+SPILL_COLUMN = "Extra"
+
+def _csv_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    r_copy = dict(r)
+    # Serialize lists as comma-joined strings for CSV
+    if isinstance(r_copy.get("Skills"), list):
+        r_copy["Skills"] = ", ".join(r_copy["Skills"])
+    if isinstance(r_copy.get("Queries"), list):
+        r_copy["Queries"] = "; ".join(r_copy["Queries"])
+    return r_copy
+
+class RecordSink(ABC):
+    """
+    Incremental writer: records are appended as each page finishes and flushed
+    to disk, so memory stays flat and a crash keeps everything written so far.
+
+    `resume` is a (byte offset, record count) pair from position(): the file is
+    cut back to that offset and writing continues after the records before it.
+    """
+
+    def __init__(self, path: str, resume: Optional[Tuple[int, int]] = None):
+        self.path = path
+        self.count = 0
+        self.resumed = resume is not None
+        if resume is not None:
+            offset, self.count = resume
+            # Anything past the checkpoint is a partial page or a closing bracket
+            os.truncate(path, offset)
+            self._f = open(path, "a", newline="", encoding="utf-8")
+        else:
+            self._f = open(path, "w", newline="", encoding="utf-8")
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for r in rows:
+            self._write_one(r)
+            self.count += 1
+        self._f.flush()
+
+    @abstractmethod
+    def _write_one(self, row: Dict[str, Any]) -> None:
+        """Append one record to the open file."""
+
+    def position(self) -> Tuple[int, int]:
+        """(byte offset, record count) after everything written so far."""
+        self._f.flush()
+        return self._f.buffer.tell(), self.count
+
+    def sync(self) -> None:
+        """Force written records to stable storage."""
+        if not self._f.closed:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self) -> "RecordSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class JsonlSink(RecordSink):
+    """One JSON object per line."""
+
+    def _write_one(self, row: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(row, ensure_ascii=False))
+        self._f.write("\n")
+
+class JsonArraySink(RecordSink):
+    """A JSON array laid out like DataExporter.to_json; the closing bracket is written on close()."""
+
+    def __init__(self, path: str, resume: Optional[Tuple[int, int]] = None):
+        super().__init__(path, resume)
+        if not self.resumed:
+            self._f.write("[")
+
+    def _write_one(self, row: Dict[str, Any]) -> None:
+        body = json.dumps(row, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._f.write(("," if self.count else "") + "\n  " + body)
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.write("\n]" if self.count else "]")
+        super().close()
+
+class CsvSink(RecordSink):
+    """
+    CSV with a declared column set written up front. Keys outside `columns`
+    are kept as a JSON object in the spill column instead of widening the header.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: Optional[Tuple[int, int]] = None,
+        columns: Sequence[str] = COLUMNS,
+        spill_column: str = SPILL_COLUMN,
+    ):
+        super().__init__(path, resume)
+        self.columns = list(columns)
+        self.spill_column = spill_column
+        self._known = set(self.columns)
+        self._writer = csv.DictWriter(self._f, fieldnames=self.columns + [spill_column])
+        if not self.resumed:
+            self._writer.writeheader()
+
+    def _write_one(self, row: Dict[str, Any]) -> None:
+        out = _csv_row(row)
+        extra = {k: out.pop(k) for k in list(out) if k not in self._known}
+        if extra:
+            out[self.spill_column] = json.dumps(extra, ensure_ascii=False, default=str)
+        self._writer.writerow(out)
+
+SINKS = {
+    "json": JsonArraySink,
+    "jsonl": JsonlSink,
+    "csv": CsvSink,
+    "sqlite": JobStore,
+    "columnar": partial(ColumnarSink, columns=COLUMNS),
+    "parquet": partial(ParquetSink, columns=COLUMNS),
+}
+
+def read_records(fmt: str, path: str) -> Iterator[Dict[str, Any]]:
+    """Read records back from a sink's file, including one left unterminated by a crash."""
+    fmt = fmt.lower()
+    if fmt == "columnar":
+        yield from read_columnar(path)
+        return
+    if fmt == "parquet":
+        yield from read_parquet(path)
+        return
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "json":
+            text = f.read().rstrip()
+            yield from json.loads(text if text.endswith("]") else text + "\n]")
+        else:
+            raise ValueError(f"Unknown output format: {fmt!r} (expected one of {', '.join(SINKS)})")
+
+class MeteredSink:
+    """Times and counts the writes of the sink it wraps; everything else passes through."""
+
+    def __init__(self, sink: Any, fmt: str, metrics: Metrics):
+        self.sink = sink
+        self.fmt = fmt
+        self.metrics = metrics
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        with self.metrics.timer("export_write_seconds", format=self.fmt), self.metrics.stage("export"):
+            self.sink.write(rows)
+        self.metrics.inc("export_rows_total", len(rows), format=self.fmt)
+
+    def sync(self) -> None:
+        with self.metrics.timer("export_sync_seconds", format=self.fmt):
+            self.sink.sync()
+
+    def position(self) -> Tuple[int, int]:
+        return self.sink.position()
+
+    def close(self) -> None:
+        with self.metrics.timer("export_close_seconds", format=self.fmt), self.metrics.stage("export"):
+            self.sink.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.sink, name)
 
 class DataExporter:
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics
+
+    def open_sink(self, fmt: str, path: str, resume: Optional[Tuple[int, int]] = None) -> Union[RecordSink, ColumnarSink, ParquetSink, JobStore, MeteredSink]:
+        """
+        Open a streaming sink for `fmt` (one of SINKS), optionally resuming an
+        existing file. Without pyarrow, 'parquet' falls back to the built-in
+        'columnar' format, written next to `path` with a .columnar extension.
+        """
+        fmt = fmt.lower()
+        if fmt == "parquet" and pq is None:
+            fmt = "columnar"
+            path = os.path.splitext(path)[0] + ".columnar"
+            logger.warning("pyarrow is not installed; writing the columnar format to %s instead of Parquet", path)
+        try:
+            sink_cls = SINKS[fmt]
+        except KeyError:
+            raise ValueError(f"Unknown output format: {fmt!r} (expected one of {', '.join(SINKS)})")
+        sink = sink_cls(path, resume)
+        return MeteredSink(sink, fmt, self.metrics) if self.metrics is not None else sink
+
     def to_json(self, rows: List[Dict[str, Any]], path: str) -> None:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(rows, f, ensure_ascii=False, indent=2)
 
-    def to_csv(self, rows: List[Dict[str, Any]], path: str) -> None:
+    def to_csv(self, rows: List[Dict[str, Any]], path: str, columns: Optional[Sequence[str]] = None) -> None:
         if not rows:
             # create an empty CSV with no rows but still valid
             with open(path, "w", newline="", encoding="utf-8") as f:
@@ -18,26 +251,7 @@ class DataExporter:
         fieldnames = set()
         for r in rows:
             fieldnames.update(r.keys())
-        ordered = [
-            "Date Scraped",
-            "Job ID",
-            "Time Posted",
-            "Project Payment Type",
-            "Budget",
-            "Skill Level",
-            "Title",
-            "URL",
-            "Description",
-            "Location",
-            "Total Spent",
-            "Feedback",
-            "Proposals",
-            "Project Length",
-            "Weekly Hours",
-            "Skills",
-            "Query",
-            "Source",
-        ]
+        ordered = list(columns or COLUMNS)
         # Preserve preferred order then add the rest
         for k in sorted(fieldnames):
             if k not in ordered:
@@ -47,8 +261,4 @@ class DataExporter:
             writer = csv.DictWriter(f, fieldnames=ordered)
             writer.writeheader()
             for r in rows:
-                r_copy = dict(r)
-                # Serialize lists as comma-joined strings for CSV
-                if isinstance(r_copy.get("Skills"), list):
-                    r_copy["Skills"] = ", ".join(r_copy["Skills"])
-                writer.writerow(r_copy)
\ No newline at end of file
+                writer.writerow(_csv_row(r))
@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from utils.job_identity import job_key
+from utils.normalize import budget_range, experience_level, payment_kind
+
+logger = logging.getLogger("job_store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY,
+    job_key      TEXT NOT NULL UNIQUE,
+    job_id       TEXT,
+    posted_at    REAL,
+    payment_type TEXT,
+    budget_min   REAL,
+    budget_max   REAL,
+    experience   TEXT,
+    country      TEXT,
+    first_seen   TEXT NOT NULL,
+    last_seen    TEXT NOT NULL,
+    record       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON jobs (job_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_posted ON jobs (posted_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_budget ON jobs (payment_type, budget_max, budget_min, experience, posted_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_country ON jobs (country, posted_at);
+CREATE TABLE IF NOT EXISTS job_terms (
+    term      TEXT NOT NULL,
+    posted_at REAL NOT NULL,
+    job       INTEGER NOT NULL,
+    PRIMARY KEY (term, posted_at, job)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_terms_job ON job_terms (job);
+"""
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+def word_terms(text: str) -> Set[str]:
+    """Inverted-index terms for free text: lower-cased word tokens of two characters or more."""
+    return {f"w:{tok}" for tok in TOKEN_RE.findall(text.lower()) if len(tok) > 1}
+
+def skill_term(skill: str) -> str:
+    return f"s:{' '.join(skill.lower().split())}"
+
+def _epoch(iso: Any) -> Optional[float]:
+    if not isinstance(iso, str) or not iso:
+        return None
+    try:
+        return datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def _merged(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    # A later sighting wins, but never erases a field only an earlier one had (e.g. enriched details)
+    out = dict(old)
+    for key, value in new.items():
+        if value not in (None, "", []):
+            out[key] = value
+    if "Queries" in old or "Queries" in new:
+        queries = list(old.get("Queries") or [])
+        out["Queries"] = queries + [q for q in new.get("Queries") or [] if q not in queries]
+    return out
+
+class JobStore:
+    """
+    SQLite store of every job ever scraped, one row per job (keyed like the
+    deduper: Job ID, else canonical URL). A job seen again is updated in place
+    and keeps its first_seen. Each page is upserted in one transaction.
+
+    Usable as an output sink (the "sqlite" format) and queryable with search():
+    indexed columns cover posting time, budget, payment type and country, and
+    job_terms is an inverted index of title/skill words and whole skills whose
+    postings are ordered by posting time, so newest-first lookups stop early.
+
+    With read_only=True an existing store is opened for search()/get() only:
+    nothing is created or written, and a missing file raises FileNotFoundError.
+    """
+
+    def __init__(self, path: str, resume: Optional[Tuple[int, int]] = None, read_only: bool = False):
+        self.path = path
+        if read_only:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"No job store at {path}")
+            self._conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            parent = os.path.dirname(os.path.abspath(path))
+            os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        # Upserts are idempotent, so a resumed run just rewrites its last pages
+        self.count = resume[1] if resume is not None else 0
+        self.inserted = 0
+        self.updated = 0
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Upsert a batch of records in one transaction."""
+        batch: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            key = job_key(row)
+            if key:
+                batch[key] = _merged(batch[key], row) if key in batch else row
+            self.count += 1
+        if not batch:
+            return
+        with self._conn:
+            existing: Dict[str, Tuple[int, Dict[str, Any], str]] = {}
+            for chunk in _chunks(list(batch), 500):
+                placeholders = ",".join("?" * len(chunk))
+                for job, key, record, first_seen in self._conn.execute(
+                    f"SELECT id, job_key, record, first_seen FROM jobs WHERE job_key IN ({placeholders})", chunk
+                ):
+                    existing[key] = (job, json.loads(record), first_seen)
+            ids = [existing[key][0] for key in batch if key in existing]
+            for chunk in _chunks(ids, 500):
+                self._conn.execute(f"DELETE FROM job_terms WHERE job IN ({','.join('?' * len(chunk))})", chunk)
+            self.updated += len(existing)
+            self.inserted += len(batch) - len(existing)
+
+            terms = []
+            for key, row in batch.items():
+                seen = row.get("Date Scraped") or ""
+                first_seen = seen
+                if key in existing:
+                    job, old, first_seen = existing[key]
+                    row = _merged(old, row)
+                    values = self._row(row, first_seen, seen)
+                    self._conn.execute(
+                        "UPDATE jobs SET job_id = ?, posted_at = ?, payment_type = ?, budget_min = ?, "
+                        "budget_max = ?, experience = ?, country = ?, first_seen = ?, last_seen = ?, record = ? "
+                        "WHERE id = ?",
+                        values + (job,),
+                    )
+                else:
+                    values = self._row(row, first_seen, seen)
+                    job = self._conn.execute(
+                        "INSERT INTO jobs (job_key, job_id, posted_at, payment_type, budget_min, budget_max, "
+                        "experience, country, first_seen, last_seen, record) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key,) + values,
+                    ).lastrowid
+                posted = values[1] if values[1] is not None else 0.0
+                terms.extend((term, posted, job) for term in self._terms(row))
+            self._conn.executemany("INSERT OR IGNORE INTO job_terms (term, posted_at, job) VALUES (?, ?, ?)", terms)
+
+    @staticmethod
+    def _row(job: Dict[str, Any], first_seen: str, last_seen: str) -> Tuple:
+        # Typed columns come from the normalization stage when present, else from the raw labels
+        span = budget_range(job.get("Budget") or "")
+        budget_min = job.get("Budget Min", span[0] if span else None)
+        budget_max = job.get("Budget Max", span[1] if span else None)
+        return (
+            str(job.get("Job ID") or ""),
+            _epoch(job.get("Time Posted")),
+            job.get("Payment Type") or payment_kind(job.get("Project Payment Type") or "") or "",
+            budget_min,
+            budget_max,
+            job.get("Experience Level") or experience_level(job.get("Skill Level") or "") or "",
+            (job.get("Location") or "").strip().lower(),
+            first_seen,
+            last_seen,
+            json.dumps(job, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _terms(job: Dict[str, Any]) -> Set[str]:
+        skills = job.get("Skills") or []
+        if isinstance(skills, str):
+            skills = [s for s in skills.split(",") if s.strip()]
+        terms = word_terms(" ".join([job.get("Title") or ""] + skills))
+        terms.update(skill_term(s) for s in skills)
+        return terms
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        skills: Sequence[str] = (),
+        country: Optional[str] = None,
+        payment_type: Optional[str] = None,
+        experience: Optional[str] = None,
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None,
+        posted_after: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Jobs matching every given condition, newest first. Every word of `text`
+        must appear in the title or skills; `skills` must all be present as
+        tags. Budgets are ranges: a job matches when its range overlaps
+        [budget_min, budget_max]. `posted_after` is epoch seconds.
+        """
+        terms = sorted(word_terms(text or "")) + [skill_term(s) for s in skills]
+        where: List[str] = []
+        params: List[Any] = []
+        if terms:
+            # Walk the first term's postings newest first; the others are probed by their full key
+            source = "job_terms t JOIN jobs j ON j.id = t.job"
+            order = "t.posted_at"
+            where.append("t.term = ?")
+            params.append(terms[0])
+            for term in terms[1:]:
+                where.append(
+                    "EXISTS (SELECT 1 FROM job_terms x WHERE x.term = ? AND x.posted_at = t.posted_at AND x.job = t.job)"
+                )
+                params.append(term)
+        else:
+            source = "jobs j"
+            order = "j.posted_at"
+        if country:
+            where.append("j.country = ?")
+            params.append(country.strip().lower())
+        if payment_type:
+            where.append("j.payment_type = ?")
+            params.append(payment_kind(payment_type) or payment_type.lower())
+        if experience:
+            where.append("j.experience = ?")
+            params.append(experience_level(experience) or experience.lower())
+        if budget_min is not None:
+            where.append("j.budget_max >= ?")
+            params.append(float(budget_min))
+        if budget_max is not None:
+            where.append("j.budget_min <= ?")
+            params.append(float(budget_max))
+        if posted_after is not None:
+            where.append(f"{order} >= ?")
+            params.append(float(posted_after))
+        # Pick the page of ids from the indexes first, so only those rows' records are read
+        inner = f"SELECT j.id FROM {source}"
+        if where:
+            inner += " WHERE " + " AND ".join(where)
+        inner += f" ORDER BY {order} DESC LIMIT ?"
+        params.append(int(limit))
+        sql = f"SELECT record FROM jobs WHERE id IN ({inner}) ORDER BY posted_at DESC"
+        return [json.loads(r[0]) for r in self._conn.execute(sql, params)]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT record FROM jobs WHERE job_key = ? OR job_id = ? LIMIT 1", (job_id, job_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def position(self) -> Tuple[int, int]:
+        # Nothing to truncate on resume: the checkpoint only needs the record count
+        return 0, self.count
+
+    def sync(self) -> None:
+        """Each batch is already committed; make it survive power loss too."""
+        self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "JobStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,226 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("page_archive")
+
+# Segment file: a sequence of self-delimiting records, each
+#   header | metadata JSON (url, query, page, run, seq) | zlib-compressed body
+# Sidecar index (<segment>.idx): one (offset, length) entry per record, so readers
+# can mmap the segment and jump straight to any page.
+MAGIC = b"UPWA"
+RECORD_HEADER = struct.Struct("<4sIIdI")  # magic, meta_len, body_len, fetched_at, crc32(meta + body)
+INDEX_ENTRY = struct.Struct("<QI")  # offset, record length
+
+@dataclass
+class ArchivedPage:
+    url: str
+    query: str
+    page: int
+    fetched_at: float
+    html: str
+    run: str = ""  # id of the scrape run that fetched the page
+    seq: int = 0  # position of the page in that run's output order
+
+def _decode(buf, offset: int, body: bool = True) -> Optional[Tuple[ArchivedPage, int]]:
+    """Decode the record at `offset`; None if it is truncated or corrupt. body=False skips decompression."""
+    end = offset + RECORD_HEADER.size
+    if end > len(buf):
+        return None
+    magic, meta_len, body_len, fetched_at, crc = RECORD_HEADER.unpack_from(buf, offset)
+    if magic != MAGIC or end + meta_len + body_len > len(buf):
+        return None
+    payload = buf[end:end + meta_len + body_len]
+    if zlib.crc32(payload) != crc:
+        return None
+    meta = json.loads(bytes(payload[:meta_len]).decode("utf-8"))
+    html = zlib.decompress(payload[meta_len:]).decode("utf-8") if body else ""
+    page = ArchivedPage(
+        meta["url"],
+        meta.get("query", ""),
+        int(meta.get("page", 0)),
+        fetched_at,
+        html,
+        meta.get("run", ""),
+        int(meta.get("seq", 0)),
+    )
+    return page, RECORD_HEADER.size + meta_len + body_len
+
+def _index_path(path: str) -> str:
+    return path + ".idx"
+
+class PageArchive:
+    """
+    Append-only archive of raw fetched pages, for re-parsing without the network.
+
+    Pages are appended in completion order; `run_id` and each page's `seq`
+    let readers restore the order the run emitted them in.
+
+    Records are written with a CRC, so a run killed mid-write leaves at most
+    one torn record at the tail; reopening the archive truncates it and
+    rebuilds any index entries that never made it to disk.
+    """
+
+    def __init__(self, path: str, run_id: Optional[str] = None, level: int = 6):
+        self.path = path
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        self.level = level
+        self.count = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._lock = threading.Lock()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self.count = len(self._recover())
+        self._segment = open(path, "ab")
+        self._index = open(_index_path(path), "ab")
+        if self.count:
+            logger.info("Appending to page archive %s (%d pages)", path, self.count)
+
+    def _recover(self) -> List[Tuple[int, int]]:
+        if not os.path.exists(self.path):
+            open(self.path, "wb").close()
+            open(_index_path(self.path), "wb").close()
+            return []
+        entries = _load_index(self.path)
+        size = os.path.getsize(self.path)
+        pos = entries[-1][0] + entries[-1][1] if entries else 0
+        recovered = 0
+        if size > pos:
+            with open(self.path, "rb") as f:
+                f.seek(pos)
+                tail = f.read()
+            off = 0
+            while True:
+                decoded = _decode(tail, off, body=False)
+                if decoded is None:
+                    break
+                entries.append((pos + off, decoded[1]))
+                off += decoded[1]
+                recovered += 1
+            pos += off
+        if size != pos or recovered:
+            logger.warning(
+                "Page archive %s: recovered %d unindexed pages, dropped %d trailing bytes",
+                self.path,
+                recovered,
+                size - pos,
+            )
+            with open(self.path, "r+b") as f:
+                f.truncate(pos)
+            with open(_index_path(self.path), "wb") as f:
+                f.write(b"".join(INDEX_ENTRY.pack(o, n) for o, n in entries))
+        return entries
+
+    def append(
+        self,
+        url: str,
+        query: str,
+        page: int,
+        html: str,
+        seq: int = 0,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        meta = {"url": url, "query": query, "page": page, "run": self.run_id, "seq": seq}
+        meta = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        raw = html.encode("utf-8")
+        body = zlib.compress(raw, self.level)
+        header = RECORD_HEADER.pack(
+            MAGIC, len(meta), len(body), fetched_at or time.time(), zlib.crc32(meta + body)
+        )
+        with self._lock:
+            offset = self._segment.tell()
+            self._segment.write(header + meta + body)
+            self._segment.flush()
+            self._index.write(INDEX_ENTRY.pack(offset, len(header) + len(meta) + len(body)))
+            self._index.flush()
+            self.count += 1
+            self.raw_bytes += len(raw)
+            self.stored_bytes += len(header) + len(meta) + len(body)
+
+    def close(self) -> None:
+        with self._lock:
+            self._segment.close()
+            self._index.close()
+
+def _load_index(path: str) -> List[Tuple[int, int]]:
+    try:
+        with open(_index_path(path), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    entries = [INDEX_ENTRY.unpack_from(data, i) for i in range(0, usable, INDEX_ENTRY.size)]
+    size = os.path.getsize(path)
+    # Keep only the contiguous prefix that lies inside the segment
+    valid: List[Tuple[int, int]] = []
+    pos = 0
+    for offset, length in entries:
+        if offset != pos or offset + length > size:
+            break
+        valid.append((offset, length))
+        pos += length
+    return valid
+
+class ArchiveReader:
+    """Read-only, memory-mapped view of a PageArchive segment."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.path.getsize(path)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.entries = _load_index(path)
+        pos = self.entries[-1][0] + self.entries[-1][1] if self.entries else 0
+        # Index missing or behind (e.g. the writer crashed): scan the rest of the segment
+        while pos < size:
+            decoded = _decode(self._map, pos, body=False)
+            if decoded is None:
+                break
+            self.entries.append((pos, decoded[1]))
+            pos += decoded[1]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def read(self, i: int, body: bool = True) -> ArchivedPage:
+        offset, _ = self.entries[i]
+        decoded = _decode(self._map, offset, body)
+        if decoded is None:
+            raise ValueError(f"Corrupt record #{i} at offset {offset} in {self.path}")
+        return decoded[0]
+
+    def __iter__(self) -> Iterator[ArchivedPage]:
+        for i in range(len(self.entries)):
+            yield self.read(i)
+
+    def ordered(self) -> List[int]:
+        """
+        Record indices in output order: runs as they appear in the file, then
+        by `seq`. A corrupt record stays right after the record before it, so
+        reading it fails at its place in the order.
+        """
+        runs: Dict[str, int] = {}
+        keys = []
+        prev = (0, 0)
+        for i in range(len(self.entries)):
+            try:
+                meta = self.read(i, body=False)
+            except ValueError:
+                keys.append(prev + (i,))
+                continue
+            prev = (runs.setdefault(meta.run, len(runs)), meta.seq)
+            keys.append(prev + (i,))
+        return [i for _, _, i in sorted(keys)]
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
@@ -0,0 +1,146 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from extractors.enrichment import DetailEnricher
+from extractors.fetch_engine import WorkItem
+from filters.dedup import StreamingDeduper
+from output.checkpoint import CheckpointJournal
+from output.data_exporter import RecordSink
+
+logger = logging.getLogger("page_writer")
+
+@dataclass
+class _PendingPage:
+    item: WorkItem
+    boundary: int  # the page is durable once this many records have been written
+    items: int
+    ok: bool
+    stopped: bool
+    payload: Any
+
+class PageWriter:
+    """
+    Writes parsed pages to the output sinks, in order, and journals each page.
+
+    With a StreamingDeduper, records are released after a delay. With a
+    DetailEnricher, released records then wait for their detail fields; at
+    most `max_waiting` do, after which writing blocks on the oldest one. So a
+    page may be journaled well after it was parsed: only once every record it
+    contributed is written, with the sink positions exactly at that point. A
+    resume therefore never re-emits or loses a record. `on_durable(item,
+    payload)` fires at that same moment.
+    """
+
+    def __init__(
+        self,
+        sinks: Dict[str, RecordSink],
+        journal: Optional[CheckpointJournal] = None,
+        deduper: Optional[StreamingDeduper] = None,
+        on_durable: Optional[Callable[[WorkItem, Any], None]] = None,
+        written: int = 0,
+        enricher: Optional[DetailEnricher] = None,
+        max_waiting: int = 256,
+    ):
+        self.sinks = sinks
+        self.journal = journal
+        self.deduper = deduper
+        self.on_durable = on_durable
+        self.enricher = enricher
+        self.max_waiting = max(1, int(max_waiting))
+        self.written = written  # records written, including those of a resumed run
+        self._accepted = written
+        self._dedup_base = written - (deduper.accepted if deduper else 0)
+        self._pending: Deque[_PendingPage] = deque()
+        self._waiting: Deque[Tuple[Dict[str, Any], Optional[Future]]] = deque()
+
+    def write_page(
+        self,
+        item: WorkItem,
+        records: List[Dict[str, Any]],
+        ok: bool = True,
+        stopped: bool = False,
+        payload: Any = None,
+    ) -> int:
+        """
+        Queue one page of records; `ok=False` pages are written but never
+        journaled. Returns how many of them will be written, i.e. were not
+        dropped or merged as duplicates.
+        """
+        before = self._accepted
+        if self.deduper is not None:
+            released = self.deduper.push(records, query=item.query)
+            self._accepted = self._dedup_base + self.deduper.accepted
+        else:
+            released = records
+            self._accepted += len(records)
+        self._pending.append(_PendingPage(item, self._accepted, len(records), ok, stopped, payload))
+        self._emit(released)
+        return self._accepted - before
+
+    def flush(self, deadline: Optional[float] = None) -> None:
+        """
+        Write everything still held back (end of run or polling cycle). Detail
+        pages not started by `deadline` (a time.monotonic() value) are given up
+        and their records written without them.
+        """
+        self._emit(self.deduper.flush() if self.deduper is not None else [], drain=True, deadline=deadline)
+
+    def _emit(self, records: List[Dict[str, Any]], drain: bool = False, deadline: Optional[float] = None) -> None:
+        for r in records:
+            self._waiting.append((r, self.enricher.submit(r) if self.enricher is not None else None))
+        while True:
+            while self._pending and self._pending[0].boundary <= self.written:
+                self._complete(self._pending.popleft())
+            if not self._waiting:
+                return
+            # Write the enriched prefix, up to the next page boundary so its journal entry sees exact positions
+            limit = self._pending[0].boundary - self.written if self._pending else len(self._waiting)
+            ready = 0
+            while ready < min(limit, len(self._waiting)) and _done(self._waiting[ready][1]):
+                ready += 1
+            if not ready:
+                if not drain and len(self._waiting) <= self.max_waiting:
+                    return
+                self._wait_head(deadline)
+                continue
+            chunk = [_merged(*self._waiting.popleft()) for _ in range(ready)]
+            for sink in self.sinks.values():
+                sink.write(chunk)
+            self.written += len(chunk)
+
+    def _wait_head(self, deadline: Optional[float]) -> None:
+        future = self._waiting[0][1]
+        self.enricher.prioritize(future)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not wait([future], timeout=timeout).done:
+            # Out of time: drop everything still queued; a job already being fetched is bounded by its own timeouts
+            self.enricher.expire()
+            wait([future])
+
+    def _complete(self, page: _PendingPage) -> None:
+        if self.journal is not None and page.ok:
+            positions = {fmt: sink.position() for fmt, sink in self.sinks.items()}
+            self.journal.record(
+                page.item.query,
+                page.item.page,
+                positions,
+                page.items,
+                self.written,
+                stopped=page.stopped,
+            )
+        if self.on_durable is not None:
+            self.on_durable(page.item, page.payload)
+
+def _done(future: Optional[Future]) -> bool:
+    return future is None or future.done()
+
+def _merged(record: Dict[str, Any], future: Optional[Future]) -> Dict[str, Any]:
+    if future is not None and not future.cancelled():
+        for key, value in future.result().items():
+            if not record.get(key):
+                record[key] = value
+    return record
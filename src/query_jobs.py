@@ -0,0 +1,93 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from output.job_store import JobStore
+from utils.logger import configure_logging
+
+AGE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([mhdw])$")
+AGE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+def parse_since(value: str) -> float:
+    """Epoch seconds for an age like '7d' / '12h' or an ISO date like '2025-01-15'."""
+    m = AGE_RE.match(value.strip().lower())
+    if m:
+        return time.time() - float(m.group(1)) * AGE_UNITS[m.group(2)]
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _cell(value: Optional[object], width: int) -> str:
+    text = "" if value is None else str(value)
+    return text if len(text) <= width else text[: width - 1] + "…"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Query the job store built by the 'sqlite' output format."
+    )
+    parser.add_argument(
+        "--db",
+        default=os.path.join(os.path.dirname(__file__), "..", "data", "upwork_jobs.sqlite3"),
+        help="Path to the job store.",
+    )
+    parser.add_argument("text", nargs="?", default=None, help="Words that must all appear in the title (or as skills).")
+    parser.add_argument("--skill", action="append", default=[], help="Required skill tag; repeat for several.")
+    parser.add_argument("--country", default=None, help="Client country, e.g. 'United States'.")
+    parser.add_argument("--payment", choices=["hourly", "fixed"], default=None, help="Payment type.")
+    parser.add_argument("--experience", choices=["entry", "intermediate", "expert"], default=None)
+    parser.add_argument("--budget-min", type=float, default=None, help="Budget (or hourly rate) reaching at least this.")
+    parser.add_argument("--budget-max", type=float, default=None, help="Budget (or hourly rate) starting at most this.")
+    parser.add_argument("--since", default=None, help="Posted within an age (7d, 12h) or since an ISO date.")
+    parser.add_argument("--id", default=None, help="Look up a single job by Job ID.")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--format", choices=["table", "jsonl"], default="table")
+    args = parser.parse_args()
+
+    configure_logging(level=logging.INFO)
+    logger = logging.getLogger("query_jobs")
+
+    started = time.perf_counter()
+    try:
+        store = JobStore(args.db, read_only=True)
+    except FileNotFoundError:
+        logger.error("No job store at %s; scrape with \"sqlite\" in output_formats first", args.db)
+        sys.exit(1)
+    with store:
+        if args.id:
+            job = store.get(args.id)
+            jobs = [job] if job else []
+        else:
+            jobs = store.search(
+                text=args.text,
+                skills=args.skill,
+                country=args.country,
+                payment_type=args.payment,
+                experience=args.experience,
+                budget_min=args.budget_min,
+                budget_max=args.budget_max,
+                posted_after=parse_since(args.since) if args.since else None,
+                limit=args.limit,
+            )
+    elapsed = time.perf_counter() - started
+
+    if args.format == "jsonl":
+        for job in jobs:
+            print(json.dumps(job, ensure_ascii=False))
+    else:
+        print(f"{'Time Posted':<20}  {'Type':<6}  {'Budget':>17}  {'Country':<16}  Title")
+        for job in jobs:
+            print(
+                f"{_cell(job.get('Time Posted', '')[:19], 20):<20}  {_cell(job.get('Payment Type'), 6):<6}  "
+                f"{_cell(job.get('Budget'), 17):>17}  {_cell(job.get('Location'), 16):<16}  {_cell(job.get('Title'), 60)}"
+            )
+    logger.info("%d jobs in %.1f ms", len(jobs), elapsed * 1000)
+
+if __name__ == "__main__":
+    main()
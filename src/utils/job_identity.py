@@ -0,0 +1,17 @@
+from typing import Any, Dict
+from urllib.parse import urlsplit, urlunsplit
+
+def canonical_job_url(url: str) -> str:
+    """Job URL without tracking parameters, fragment or trailing slash, host lower-cased."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+def job_key(job: Dict[str, Any]) -> str:
+    """
+    Identity of a job across queries and runs: its Job ID, or its canonical
+    URL when no ID was found. Dedup, the seen-jobs index and the job store
+    all key on this, so they agree on which sightings are the same job.
+    """
+    if job.get("Job ID"):
+        return str(job["Job ID"])
+    return canonical_job_url(job["URL"]) if job.get("URL") else ""
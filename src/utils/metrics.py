@@ -0,0 +1,305 @@
+import bisect
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("metrics")
+
+# Latency buckets: 1 ms doubling up to ~65 s
+DEFAULT_BUCKETS = tuple(0.001 * 2 ** i for i in range(17))
+
+# Chrome trace files grow with every span; past this many, later spans are dropped
+MAX_TRACE_SPANS = 200_000
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+class Histogram:
+    """Bucketed distribution with exact count, sum, min and max; percentiles are interpolated within a bucket."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                value = lo + (hi - lo) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": round(self.min, 6),
+            "mean": round(self.sum / self.count, 6),
+            "p50": round(self.percentile(0.5), 6),
+            "p90": round(self.percentile(0.9), 6),
+            "p99": round(self.percentile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+class Metrics:
+    """
+    Run metrics: counters and histograms keyed by name and labels, timers
+    that feed histograms, and opt-in per-stage hooks. Components take an
+    optional `metrics` and skip all of this when it is None, so a disabled
+    layer costs one attribute check per call site.
+
+    `profile` names stages (e.g. "fetch", "parse", "export") to run under
+    cProfile, one profiler per thread, merged in the report. Python 3.12+
+    allows only one active profiler per process; a stage entered while
+    another one is being profiled runs unprofiled. `trace` records
+    every timed span for a Chrome trace-event file (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, profile: Iterable[str] = (), trace: bool = False):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], Counter] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.profile_stages = set(profile)
+        self._profiles: Dict[str, List[cProfile.Profile]] = {}
+        self._profile_conflict_logged = False
+        self._local = threading.local()
+        self.trace = trace
+        self._spans: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = Counter()
+            counter.value += value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Time the block into histogram `name` (seconds); with tracing on, also record it as a span."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timed(name, started, time.perf_counter(), **labels)
+
+    def timed(self, name: str, started: float, ended: float, **labels: str) -> None:
+        """Record a span measured by the caller with time.perf_counter()."""
+        self.observe(name, ended - started, **labels)
+        if self.trace:
+            self._span(name, started, ended, labels)
+
+    def _span(self, name: str, started: float, ended: float, labels: Dict[str, str]) -> None:
+        with self._lock:
+            if len(self._spans) < MAX_TRACE_SPANS:
+                self._spans.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((started - self._t0) * 1e6),
+                    "dur": round((ended - started) * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": labels,
+                })
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Run the block under this thread's profiler for `stage` if that stage is profiled."""
+        if stage not in self.profile_stages or getattr(self._local, "active", False):
+            # Nested stages stay in the outer profile: one thread can only run one profiler
+            yield
+            return
+        profilers = getattr(self._local, "profilers", None)
+        if profilers is None:
+            profilers = self._local.profilers = {}
+        profiler = profilers.get(stage)
+        created = profiler is None
+        if created:
+            profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # "Another profiling tool is already active": on 3.12+ cProfile holds a process-wide
+            # sys.monitoring slot, so a stage on another thread already has it
+            self._profile_skipped(stage, e)
+            yield
+            return
+        if created:
+            profilers[stage] = profiler
+            with self._lock:
+                self._profiles.setdefault(stage, []).append(profiler)
+        self._local.active = True
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._local.active = False
+
+    def _profile_skipped(self, stage: str, error: ValueError) -> None:
+        self.inc("profile_skipped_total", stage=stage)
+        with self._lock:
+            if self._profile_conflict_logged:
+                return
+            self._profile_conflict_logged = True
+        logger.warning(
+            "Could not profile stage %s (%s); stages overlapping a profiled one run unprofiled", stage, error
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and histogram summaries as {name: [{"labels": ..., ...}]}."""
+        with self._lock:
+            counters: Dict[str, List[Dict[str, Any]]] = {}
+            for (name, labels), c in sorted(self._counters.items()):
+                counters.setdefault(name, []).append({"labels": dict(labels), "value": c.value})
+            histograms: Dict[str, List[Dict[str, Any]]] = {}
+            for (name, labels), h in sorted(self._histograms.items()):
+                histograms.setdefault(name, []).append({"labels": dict(labels), **h.summary()})
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus(self, prefix: str = "upwork_") -> str:
+        """The metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            typed = set()
+            for (name, labels), c in sorted(self._counters.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {prefix}{name} counter")
+                lines.append(f"{prefix}{name}{_labels(labels)} {c.value:g}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {prefix}{name} histogram")
+                cumulative = 0
+                for bound, n in zip(h.bounds + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{prefix}{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{prefix}{name}_sum{_labels(labels)} {h.sum:g}")
+                lines.append(f"{prefix}{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """Expose prometheus() at http://host:port/metrics from a background thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        logger.info("Serving Prometheus metrics at http://%s:%d/metrics", host, self._server.server_address[1])
+
+    def write_prometheus(self, path: str) -> None:
+        """Write prometheus() atomically, e.g. for node_exporter's textfile collector."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+    def write_report(self, path: str, extra: Optional[Dict[str, Any]] = None, top: int = 25) -> None:
+        """
+        Write the JSON run report. Profiled stages also get a <report>.<stage>.prof
+        file (pstats format) and their top functions by cumulative time in the
+        report; traced spans go to <report>.trace.json.
+        """
+        stem = os.path.splitext(path)[0]
+        report: Dict[str, Any] = {
+            "started": self.started,
+            "finished": time.time(),
+            "wall_seconds": round(time.time() - self.started, 3),
+        }
+        report.update(extra or {})
+        report.update(self.snapshot())
+        profiles = {}
+        for stage, profilers in sorted(self._profiles.items()):
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+            prof_path = f"{stem}.{stage}.prof"
+            stats.dump_stats(prof_path)
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(top)
+            profiles[stage] = {"file": prof_path, "top": out.getvalue().splitlines()}
+        if profiles:
+            report["profiles"] = profiles
+        if self.trace:
+            trace_path = f"{stem}.trace.json"
+            with self._lock:
+                spans = list(self._spans)
+            with open(trace_path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": spans, "displayTimeUnit": "ms"}, f)
+            report["trace"] = {"file": trace_path, "spans": len(spans)}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
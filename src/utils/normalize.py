@@ -0,0 +1,59 @@
+import re
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+AMOUNT_RE = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*([KkMm])?")
+_SCALE = {"k": 1_000, "m": 1_000_000}
+
+# Same priority as the needles CardText picks its text windows by
+PAYMENT_KINDS = (("hourly", "hourly"), ("fixed", "fixed"))
+LEVELS = ("entry", "intermediate", "expert")
+
+# Typed columns added next to the raw text fields they are parsed from
+NORMALIZED_FIELDS = ("Payment Type", "Budget Min", "Budget Max", "Experience Level")
+
+@lru_cache(maxsize=256)
+def payment_kind(text: str) -> Optional[str]:
+    """'hourly' or 'fixed' from a payment type label, None when it names neither."""
+    lower = text.lower()
+    for needle, kind in PAYMENT_KINDS:
+        if needle in lower:
+            return kind
+    return None
+
+@lru_cache(maxsize=256)
+def experience_level(text: str) -> Optional[str]:
+    """'entry', 'intermediate' or 'expert' from a skill level label."""
+    lower = text.lower()
+    for level in LEVELS:
+        if level in lower:
+            return level
+    return None
+
+@lru_cache(maxsize=4096)
+def budget_range(text: str) -> Optional[Tuple[float, float]]:
+    """Lowest and highest dollar amounts in a budget label ("$15.00 - $40.00", "$1.5K")."""
+    amounts = [
+        float(num.replace(",", "")) * _SCALE.get(suffix.lower(), 1) if suffix else float(num.replace(",", ""))
+        for num, suffix in AMOUNT_RE.findall(text)
+    ]
+    return (min(amounts), max(amounts)) if amounts else None
+
+def normalize_jobs(jobs: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Add typed columns to one page of job records, in place: "Payment Type"
+    and "Experience Level" as enums, "Budget Min"/"Budget Max" as floats
+    (None when unknown). "Date Scraped" is set to `fetched_at` (epoch
+    seconds), or to the current time without it, once for the whole page.
+    The label parsers are cached, and labels repeat a lot across a page.
+    """
+    scraped = datetime.fromtimestamp(fetched_at if fetched_at is not None else time.time(), timezone.utc).isoformat()
+    for job in jobs:
+        span = budget_range(job.get("Budget") or "")
+        job["Payment Type"] = payment_kind(job.get("Project Payment Type") or "") or ""
+        job["Budget Min"], job["Budget Max"] = span if span is not None else (None, None)
+        job["Experience Level"] = experience_level(job.get("Skill Level") or "") or ""
+        job["Date Scraped"] = scraped
+    return jobs
@@ -1,40 +1,45 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
 import re
 
+_INT_RE = re.compile(r"(\d+)")
+
+# The first unit named in the label wins, checked in this order
+_UNITS = (
+    ("minute", timedelta(minutes=1)),
+    ("hour", timedelta(hours=1)),
+    ("day", timedelta(days=1)),
+    ("week", timedelta(weeks=1)),
+    ("month", timedelta(days=30)),  # approximate months as 30 days
+    ("year", timedelta(days=365)),
+)
+
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
-def parse_relative_time_to_iso(text: str) -> str:
+def parse_relative_time_to_iso(text: str, now: Optional[datetime] = None) -> str:
     """
-    Convert strings like '3 hours ago', '2 days ago', '1 week ago' into ISO8601 UTC timestamps.
-    If parsing fails, return current time.
+    Convert strings like '3 hours ago', '2 days ago', '1 week ago' into ISO8601 UTC timestamps,
+    relative to `now` (e.g. when the page was fetched; defaults to the current time).
+    If parsing fails, return `now`.
     """
-    if not text:
-        return now_iso()
+    now = now or datetime.now(timezone.utc)
+    delta = relative_delta(text) if text else None
+    return (now - delta if delta is not None else now).isoformat()
 
+@lru_cache(maxsize=1024)
+def relative_delta(text: str) -> Optional[timedelta]:
+    """How long ago a label like 'Posted 3 hours ago' means; cached, since pages repeat a few labels."""
     text = text.lower()
     num = _extract_first_int(text)
     if num is None:
-        return now_iso()
-
-    if "minute" in text:
-        dt = datetime.now(timezone.utc) - timedelta(minutes=num)
-    elif "hour" in text:
-        dt = datetime.now(timezone.utc) - timedelta(hours=num)
-    elif "day" in text:
-        dt = datetime.now(timezone.utc) - timedelta(days=num)
-    elif "week" in text:
-        dt = datetime.now(timezone.utc) - timedelta(weeks=num)
-    elif "month" in text:
-        # approximate months as 30 days
-        dt = datetime.now(timezone.utc) - timedelta(days=30 * num)
-    elif "year" in text:
-        dt = datetime.now(timezone.utc) - timedelta(days=365 * num)
-    else:
-        dt = datetime.now(timezone.utc)
-
-    return dt.isoformat()
+        return None
+    for unit, step in _UNITS:
+        if unit in text:
+            return step * num
+    return timedelta(0)
 
 def _extract_first_int(s: str):
-    m = re.search(r"(\d+)", s)
-    return int(m.group(1)) if m else None
\ No newline at end of file
+    m = _INT_RE.search(s)
+    return int(m.group(1)) if m else None
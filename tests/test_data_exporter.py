@@ -0,0 +1,35 @@
+import pytest
+
+from output.data_exporter import SINKS, DataExporter, RecordSink, read_records
+
+ROWS = [
+    {"Job ID": "01", "Title": "Café scraper", "Skills": ["Python", "Scrapy"], "Budget Min": 15.0},
+    {"Job ID": "02", "Title": "Data entry", "Skills": [], "Budget Min": None},
+]
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "csv"])
+def test_streamed_pages_read_back(tmp_path, fmt):
+    path = str(tmp_path / f"jobs.{fmt}")
+    with DataExporter().open_sink(fmt, path) as sink:
+        sink.write(ROWS[:1])
+        sink.write(ROWS[1:])
+
+    records = list(read_records(fmt, path))
+
+    assert [r["Job ID"] for r in records] == ["01", "02"]
+    assert records[0]["Title"] == "Café scraper"
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DataExporter().open_sink("xml", str(tmp_path / "jobs.xml"))
+    assert "xml" not in SINKS
+
+def test_sink_without_write_one_fails_when_created(tmp_path):
+    class Incomplete(RecordSink):
+        pass
+
+    path = tmp_path / "jobs.txt"
+    with pytest.raises(TypeError):
+        Incomplete(str(path))
+    # Nothing was opened or created
+    assert not path.exists()
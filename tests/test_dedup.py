@@ -0,0 +1,92 @@
+from extractors.fetch_engine import WorkItem
+from filters.dedup import BloomFilter, StreamingDeduper
+from output.data_exporter import DataExporter, read_records
+from output.page_writer import PageWriter
+
+def job(n, **extra):
+    return dict({"Job ID": f"0{n:018d}", "Title": f"Job {n}"}, **extra)
+
+def ids(jobs):
+    return [int(j["Job ID"]) for j in jobs]
+
+def test_duplicate_in_window_merges_its_query():
+    deduper = StreamingDeduper(window=10)
+
+    assert deduper.push([job(1), job(2)], query="python") == []
+    assert deduper.push([job(2), job(3)], query="scraping") == []
+    released = deduper.flush()
+
+    assert ids(released) == [1, 2, 3]
+    assert [j["Queries"] for j in released] == [["python"], ["python", "scraping"], ["scraping"]]
+    assert (deduper.stats.unique, deduper.stats.merged, deduper.stats.late) == (3, 1, 0)
+
+def test_window_releases_oldest_first_and_late_repeats_are_dropped():
+    deduper = StreamingDeduper(window=2)
+
+    assert ids(deduper.push([job(1), job(2), job(3)], query="a")) == [1]
+    assert deduper.push([job(1)], query="b") == []
+
+    assert deduper.stats.late == 1
+    assert ids(deduper.flush()) == [2, 3]
+
+def test_same_job_by_url_is_one_job():
+    deduper = StreamingDeduper(window=10)
+    by_id = {"Job ID": "", "URL": "https://www.upwork.com/jobs/Scraper_~0123456789/?referrer_url_path=/nx/search"}
+    by_url = {"Job ID": "", "URL": "https://www.upwork.com/jobs/Scraper_~0123456789/"}
+
+    deduper.push([by_id], query="a")
+    deduper.push([by_url], query="b")
+
+    assert len(deduper.flush()) == 1
+    assert deduper.stats.merged == 1
+
+def test_keyless_records_pass_through():
+    deduper = StreamingDeduper(window=0)
+
+    released = deduper.push([{"Title": "no id"}, {"Title": "no id"}], query="a")
+
+    assert len(released) == 2
+    assert deduper.stats.keyless == 2
+
+def test_keys_evicted_from_the_lru_are_still_seen():
+    deduper = StreamingDeduper(window=0, lru_size=3, capacity=100)
+    deduper.push([job(n) for n in range(10)], query="a")
+
+    assert len(deduper._recent) == 3
+    assert deduper._bloom.count == 7
+    assert deduper.push([job(n) for n in range(10)], query="b") == []
+    assert deduper.stats.late == 10
+
+def test_prime_marks_earlier_output_as_released():
+    deduper = StreamingDeduper(window=5)
+
+    assert deduper.prime([job(1), job(2), job(2), {"Title": "no id"}]) == 2
+    assert ids(deduper.push([job(1), job(3)], query="a") + deduper.flush()) == [3]
+
+def test_bloom_filter_grows_past_its_capacity():
+    bloom = BloomFilter(capacity=50, error_rate=1e-4)
+    keys = [f"job-{i}" for i in range(500)]
+    for key in keys:
+        bloom.add(key)
+
+    assert len(bloom._slices) == 4
+    assert all(key in bloom for key in keys)
+    # Small slices are where plain double hashing falls well short of the error rate
+    assert sum(f"other-{i}" in bloom for i in range(20_000)) <= 15
+
+def test_page_writer_counts_jobs_after_dedup(tmp_path):
+    path = str(tmp_path / "jobs.jsonl")
+    sink = DataExporter().open_sink("jsonl", path)
+    writer = PageWriter({"jsonl": sink}, deduper=StreamingDeduper(window=3))
+
+    def item(query, page):
+        return WorkItem(seq=0, query=query, page=page, url=f"https://www.upwork.com/nx/search/jobs/?q={query}")
+
+    assert writer.write_page(item("a", 1), [job(1), job(2), job(3)]) == 3
+    assert writer.write_page(item("b", 1), [job(2), job(3), job(4)]) == 1
+    assert writer.write_page(item("b", 2), [job(1), job(5)]) == 1
+    writer.flush()
+    sink.close()
+
+    assert writer.written == 5
+    assert ids(read_records("jsonl", path)) == [1, 2, 3, 4, 5]
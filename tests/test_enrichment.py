@@ -0,0 +1,128 @@
+import threading
+import time
+
+from extractors.enrichment import DetailEnricher, EnrichmentStore
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
+from output.page_writer import PageWriter
+
+def job(n, **extra):
+    return dict({"Job ID": f"0{n:018d}", "URL": f"https://www.upwork.com/jobs/~0{n:018d}", "Title": f"Job {n}"}, **extra)
+
+class Details:
+    """A fetch_fn serving detail fields; requests wait while `gate` is clear."""
+
+    def __init__(self, fail=()):
+        self.fetched = []
+        self.fail = set(fail)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, item, proxies):
+        self.gate.wait(10)
+        n = int(item.url.rsplit("~", 1)[1])
+        self.fetched.append(n)
+        if n in self.fail:
+            raise ValueError(f"no detail page for {n}")
+        return {"Total Spent": f"${n}K", "Project Length": "1 to 3 months", "Weekly Hours": ""}
+
+def enricher(details, workers=1, store=None):
+    return DetailEnricher(ConcurrentFetcher(details), workers=workers, store=store)
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+def test_detail_fields_resolve_the_future():
+    details = Details(fail=[2])
+    e = enricher(details, workers=2)
+    try:
+        ok, failed = e.submit(job(1)), e.submit(job(2))
+
+        assert ok.result(5) == {"Total Spent": "$1K", "Project Length": "1 to 3 months"}
+        assert failed.result(5) == {}
+        assert (e.stats.fetched, e.stats.failed) == (1, 1)
+    finally:
+        e.close()
+
+def test_complete_queued_and_stored_jobs_are_not_fetched_again(tmp_path):
+    store = EnrichmentStore(str(tmp_path / "details.sqlite3"))
+    details = Details()
+    e = enricher(details, store=store)
+    try:
+        complete = job(1, **{"Total Spent": "$5K", "Project Length": "1 month", "Weekly Hours": "10"})
+        assert e.submit(complete) is None
+        assert e.submit(job(2, URL="")) is None
+        first = e.submit(job(3))
+        assert e.submit(job(3)) is first
+        first.result(5)
+    finally:
+        e.close()
+
+    again = enricher(details, store=store)
+    try:
+        assert again.submit(job(3)).result(5)["Total Spent"] == "$3K"
+        assert again.stats.cached == 1
+    finally:
+        again.close()
+        store.close()
+    assert details.fetched == [3]
+
+def test_prioritized_job_is_fetched_next():
+    details = Details()
+    details.gate.clear()
+    e = enricher(details)
+    try:
+        futures = [e.submit(job(n)) for n in range(5)]
+        wait_until(lambda: futures[0].running())
+        e.prioritize(futures[3])
+        details.gate.set()
+        for f in futures:
+            f.result(5)
+
+        assert details.fetched == [0, 3, 1, 2, 4]
+    finally:
+        e.close()
+
+def test_expire_gives_up_on_queued_jobs_only():
+    details = Details()
+    details.gate.clear()
+    e = enricher(details)
+    try:
+        futures = [e.submit(job(n)) for n in range(4)]
+        wait_until(lambda: futures[0].running())
+
+        assert e.expire() == 3
+        details.gate.set()
+        assert futures[0].result(5)
+        assert all(f.cancelled() for f in futures[1:])
+        assert e.stats.expired == 3
+    finally:
+        e.close()
+
+def test_writer_deadline_writes_jobs_without_details():
+    details = Details()
+    details.gate.clear()
+    e = enricher(details)
+    written = []
+
+    class Sink:
+        def write(self, rows):
+            written.extend(rows)
+
+    writer = PageWriter({"memory": Sink()}, enricher=e)
+    try:
+        item = WorkItem(seq=0, query="python", page=1, url="https://www.upwork.com/nx/search/jobs/?q=python")
+        writer.write_page(item, [job(n) for n in range(4)])
+        # The head job is already being fetched; it is still waited for, the rest are given up
+        threading.Timer(0.2, details.gate.set).start()
+        started = time.monotonic()
+        writer.flush(deadline=time.monotonic() + 0.05)
+
+        assert time.monotonic() - started < 5
+        assert [r.get("Total Spent", "") for r in written] == ["$0K", "", "", ""]
+        assert e.stats.expired == 3
+        assert details.fetched == [0]
+    finally:
+        e.close()
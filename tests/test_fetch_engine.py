@@ -0,0 +1,32 @@
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
+from extractors.proxy_manager import ProxyManager
+from extractors.rate_control import RateController
+
+PROXY = "http://rotation.example:8080"
+
+def test_cache_hit_spends_no_rate_or_proxy_budget(tmp_path):
+    proxy_file = tmp_path / "proxies.txt"
+    proxy_file.write_text(PROXY + "\n")
+    proxy_manager = ProxyManager(str(proxy_file))
+    rate_controller = RateController(host_rps=0.5)
+    sent = []
+
+    def fetch(item, proxies):
+        sent.append(item.url)
+        return ["fetched"]
+
+    fetcher = ConcurrentFetcher(
+        fetch,
+        proxy_manager=proxy_manager,
+        rate_controller=rate_controller,
+        cached_fn=lambda item: ["cached"] if item.page == 1 else None,
+    )
+    items = [WorkItem(seq=p, query="q", page=p, url=f"https://www.upwork.com/nx/search/jobs/?q=q&page={p}") for p in (1, 2)]
+    results = [fetcher.fetch_one(i) for i in items]
+
+    assert [(batch, error) for _, batch, error in results] == [(["cached"], None), (["fetched"], None)]
+    assert sent == [items[1].url]
+    # Only the miss was paced and counted against the proxy
+    assert rate_controller.stats.requests == 1
+    (health,) = proxy_manager.snapshot()
+    assert health.successes == 1
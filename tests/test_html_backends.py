@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from corpus import search_page
+from extractors.html_backend import HtmlBackend, available_backends
+from extractors.job_parser import UpworkJobParser
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+VOLATILE = ("Date Scraped", "Time Posted")
+BACKENDS = available_backends()
+
+def edge_cases(markup: str = "list") -> str:
+    with open(os.path.join(FIXTURES, "search_edge_cases.html"), encoding="utf-8") as f:
+        html = f.read()
+    if markup == "cards":
+        # Strip the list hooks so the parser falls back to generic, nested cards
+        html = html.replace('data-test="job-tile-list-item"', 'class="tile"')
+        html = html.replace('data-test="job-tile-list"', 'class="results"')
+        html = html.replace("<article>", "<section><article>").replace("</article>", "</article></section>")
+    return html
+
+def documents():
+    yield "edge-cases", edge_cases()
+    yield "edge-cases-cards", edge_cases("cards")
+    for page in (1, 2):
+        yield f"corpus-list-{page}", search_page(page=page, cards=20)
+        yield f"corpus-cards-{page}", search_page(page=page, cards=20, markup="cards", nesting=2)
+
+def parse(backend: str, html: str):
+    jobs = UpworkJobParser(html_backend=backend)._parse_html(html)
+    return [{k: v for k, v in j.items() if k not in VOLATILE} for j in jobs]
+
+@pytest.mark.parametrize("markup", ["list", "cards"])
+def test_edge_cases_reference(markup):
+    jobs = {j["Job ID"]: j for j in parse("html.parser", edge_cases(markup))}
+
+    # The card without a title is skipped; the others are kept
+    assert list(jobs) == ["0111111111111111111", "0122222222222222222", "0133333333333333333", "0144444444444444444"]
+    no_budget = jobs["0111111111111111111"]
+    assert (no_budget["Budget"], no_budget["Budget Min"], no_budget["Budget Max"]) == ("", None, None)
+    assert (no_budget["Location"], no_budget["Proposals"], no_budget["Feedback"]) == ("Canada", 5, 4.9)
+    title_only = jobs["0122222222222222222"]
+    assert title_only["Title"] == "Title only, nothing else"
+    assert all(title_only[k] in ("", [], None) for k in ("Budget", "Skills", "Description", "Location", "Proposals"))
+    unicode = jobs["0133333333333333333"]
+    assert unicode["Title"] == "Übersetzung & Datenbereinigung – 日本語 ✓"
+    assert unicode["Description"] == "Café‑Liste säubern, naïve Dubletten entfernen; 価格表を整理する 🚀"
+    assert unicode["Skills"] == ["Données", "日本語"]
+    assert (unicode["Payment Type"], unicode["Budget Min"]) == ("fixed", 1250.0)
+    assert jobs["0144444444444444444"]["Budget"] == "$15.00 - $25.00"
+
+@pytest.mark.parametrize("backend", [b for b in BACKENDS if b != "html.parser"])
+def test_backend_matches_html_parser(backend):
+    for name, html in documents():
+        assert parse(backend, html) == parse("html.parser", html), name
+
+def test_backend_without_parse_fails_when_created():
+    class Incomplete(HtmlBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,39 @@
+import json
+import sys
+
+import pytest
+
+import filters.query_builder as query_builder
+import main
+from stub_server import StubServer, default_page
+
+QUERIES = ["python scraping", "react developer"]
+PAGES = 4
+
+def page(query, p):
+    # Job IDs distinct per query, so one query's jobs never count as seen for another
+    return default_page(query, p).replace("/jobs/~0", f"/jobs/~0{QUERIES.index(query) + 1}")
+
+def run(monkeypatch, tmp_path, srv, concurrency, parse_workers=0):
+    config = tmp_path / "input.json"
+    config.write_text(json.dumps({
+        "queries": QUERIES,
+        "pages": PAGES,
+        "per_page": 10,
+        "concurrency": concurrency,
+        "parse_workers": parse_workers,
+        "incremental": True,
+        "output_formats": ["jsonl"],
+    }))
+    monkeypatch.setattr(sys, "argv", ["main", "--input", str(config), "--outdir", str(tmp_path / "out")])
+    monkeypatch.setattr(query_builder, "UPWORK_SEARCH_BASE", srv.base_url + "/nx/search/jobs/")
+    main.main()
+
+@pytest.mark.parametrize("concurrency,parse_workers", [(1, 0), (3, 0), (8, 0), (3, 2)])
+def test_fully_seen_queries_stop_after_their_first_page(monkeypatch, tmp_path, concurrency, parse_workers):
+    # The stub serves the same jobs on every poll, so the second run has seen them all
+    with StubServer(page_fn=page) as srv:
+        run(monkeypatch, tmp_path, srv, concurrency, parse_workers)
+        assert srv.requests == len(QUERIES) * PAGES
+        run(monkeypatch, tmp_path, srv, concurrency, parse_workers)
+        assert srv.requests - len(QUERIES) * PAGES == len(QUERIES)
@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pytest
+
+from corpus import search_page
+from extractors.field_engine import CardText
+from extractors.job_parser import UpworkJobParser
+from filters.job_filters import JobFilter
+
+def job(payment="", budget="", location="", level=""):
+    return {"Project Payment Type": payment, "Budget": budget, "Location": location, "Skill Level": level}
+
+def test_client_side_false_disables_the_filter():
+    assert JobFilter.from_config({"budget_max": 100, "client_side": False}) is None
+    assert JobFilter.from_config({"budget_max": 100}) is not None
+
+def test_budget_bounds_apply_to_fixed_price_only():
+    f = JobFilter(budget_max=100)
+
+    assert f.reject_job(job("Fixed Price", "$1,500")) == "budget"
+    assert f.reject_job(job("Fixed Price", "$80")) is None
+    assert f.reject_job(job("Hourly", "$120.00 - $150.00")) is None
+
+def test_hourly_bounds_apply_to_hourly_only():
+    f = JobFilter(hourly_min=30, hourly_max=60)
+
+    assert f.reject_job(job("Hourly", "$10.00 - $20.00")) == "hourly_rate"
+    assert f.reject_job(job("Hourly", "$70.00 - $90.00")) == "hourly_rate"
+    assert f.reject_job(job("Hourly", "$25.00 - $35.00")) is None
+    assert f.reject_job(job("Fixed Price", "$5")) is None
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        job(),
+        job(budget="$5,000"),  # payment type unknown, so no bound applies
+        job("Fixed Price", ""),
+        job("Fixed Price", "", "", ""),
+        job("Barter", "$5,000", "", "Wizard"),  # labels that name no payment type or level
+    ],
+)
+def test_unknown_field_never_rejects(record):
+    f = JobFilter(
+        payment_types=["hourly"] if record["Project Payment Type"] != "Fixed Price" else ["fixed"],
+        budget_min=1000,
+        budget_max=2000,
+        hourly_min=30,
+        hourly_max=60,
+        countries=["Canada"],
+        experience=["expert"],
+    )
+
+    assert f.reject_job(record) is None
+
+def test_card_budget_ignores_other_dollar_figures():
+    assert CardText("Hourly: $20.00 - $40.00 Intermediate $20K+ spent").budget == "$20.00 - $40.00"
+    assert CardText("Fixed-price - Expert - Est. budget: $500 $20K+ spent").budget == "$500"
+    assert CardText("Fixed Price Intermediate Payment verified $20K+ spent").budget is None
+    assert CardText("Hourly data entry Hourly: $15.00 - $25.00").budget == "$15.00 - $25.00"
+
+    f = JobFilter(budget_max=100)
+    assert f.reject_card(CardText("Fixed Price Intermediate Payment verified $20K+ spent United States")) is None
+
+def test_card_rejections_match_record_rejections():
+    everything = [j for p in (1, 2, 3) for j in UpworkJobParser().parse_html(search_page(page=p, cards=20))]
+    f = JobFilter(payment_types=["hourly", "fixed"], budget_max=1000, hourly_min=40, experience=["entry", "intermediate"])
+    expected = Counter(r for r in map(f.reject_job, everything) if r)
+
+    parser = UpworkJobParser(job_filter=f)
+    kept = [j for p in (1, 2, 3) for j in parser.parse_html(search_page(page=p, cards=20))]
+
+    assert expected["budget"] and expected["hourly_rate"] and expected["experience"]
+    assert parser.stats.rejected == dict(expected)
+    assert len(kept) + sum(expected.values()) == len(everything)
+    assert all(f.reject_job(j) is None for j in kept)
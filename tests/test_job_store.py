@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from output.job_store import JobStore
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def job(n, title, skills=(), country="United States", payment="Hourly", budget="$20.00 - $40.00", level="Expert"):
+    return {
+        "Date Scraped": "2024-05-01T12:00:00+00:00",
+        "Job ID": f"0{n:018d}",
+        "Time Posted": f"2024-04-{n:02d}T09:00:00+00:00",
+        "Project Payment Type": payment,
+        "Budget": budget,
+        "Skill Level": level,
+        "Skills": list(skills),
+        "Title": title,
+        "URL": f"https://www.upwork.com/jobs/~0{n:018d}",
+        "Location": country,
+    }
+
+JOBS = [
+    job(1, "Python web scraping", ["Python", "Scrapy"]),
+    job(2, "Scraping product pages", ["Python", "Selenium"], country="Canada", level="Intermediate"),
+    job(3, "React developer", ["React"], payment="Fixed Price", budget="$500"),
+    job(4, "Python data pipeline", ["Python", "Airflow"], budget="$60.00 - $90.00"),
+    job(5, "Web scraping with Node", ["Node.js", "Puppeteer"], payment="Fixed Price", budget="$1,200"),
+]
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    with JobStore(path) as store:
+        store.write(JOBS)
+    return path
+
+def ids(jobs):
+    return [int(j["Job ID"]) for j in jobs]
+
+def epoch(day):
+    return datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+
+def test_search_conditions_and_order(store_path):
+    with JobStore(store_path) as store:
+        assert ids(store.search("scraping")) == [5, 2, 1]
+        assert ids(store.search("web scraping")) == [5, 1]
+        assert ids(store.search(skills=["python"])) == [4, 2, 1]
+        assert ids(store.search("python", skills=["Scrapy"])) == [1]
+        assert ids(store.search(country="canada")) == [2]
+        assert ids(store.search(payment_type="fixed")) == [5, 3]
+        assert ids(store.search(experience="intermediate")) == [2]
+        assert ids(store.search(posted_after=epoch("2024-04-03"))) == [5, 4, 3]
+        assert ids(store.search(limit=2)) == [5, 4]
+
+def test_budget_search_matches_overlapping_ranges(store_path):
+    with JobStore(store_path) as store:
+        # $20-$40 and $60-$90 hourly, $500 and $1,200 fixed
+        assert ids(store.search(budget_min=50)) == [5, 4, 3]
+        assert ids(store.search(budget_min=30, budget_max=70)) == [4, 2, 1]
+        assert ids(store.search(payment_type="hourly", budget_max=10)) == []
+
+def test_job_seen_again_is_updated_in_place(store_path):
+    with JobStore(store_path) as store:
+        again = dict(JOBS[0], Title="Python web scraping (urgent)", Skills=[], **{"Date Scraped": "2024-05-02T08:00:00+00:00"})
+        store.write([again])
+
+        assert len(store) == len(JOBS)
+        assert store.get(JOBS[0]["Job ID"])["Title"] == "Python web scraping (urgent)"
+        assert store.get(JOBS[0]["Job ID"])["Skills"] == ["Python", "Scrapy"]
+        assert ids(store.search("urgent")) == [1]
+        first_seen, last_seen = store._conn.execute(
+            "SELECT first_seen, last_seen FROM jobs WHERE job_id = ?", (JOBS[0]["Job ID"],)
+        ).fetchone()
+        assert (first_seen, last_seen) == ("2024-05-01T12:00:00+00:00", "2024-05-02T08:00:00+00:00")
+
+def test_read_only_store_searches_without_writing(store_path):
+    with JobStore(store_path, read_only=True) as store:
+        assert ids(store.search("python")) == [4, 2, 1]
+        with pytest.raises(sqlite3.OperationalError):
+            store.write([job(6, "Another job")])
+
+def test_read_only_store_creates_nothing(tmp_path):
+    missing = str(tmp_path / "missing" / "jobs.sqlite3")
+    with pytest.raises(FileNotFoundError):
+        JobStore(missing, read_only=True)
+    assert not os.path.exists(os.path.dirname(missing))
+
+    empty = str(tmp_path / "empty.sqlite3")
+    sqlite3.connect(empty).close()
+    with JobStore(empty, read_only=True):
+        pass
+    tables = sqlite3.connect(empty).execute("SELECT name FROM sqlite_master").fetchall()
+    assert tables == []
+
+def test_query_cli_fails_on_a_missing_store(tmp_path):
+    missing = str(tmp_path / "jobs.sqlite3")
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "src", "query_jobs.py"), "--db", missing, "python"],
+        capture_output=True,
+        text=True,
+    )
+
+    assert proc.returncode == 1
+    assert not os.path.exists(missing)
@@ -0,0 +1,42 @@
+import cProfile
+import threading
+
+from utils.metrics import Metrics
+
+def test_stage_runs_unprofiled_when_another_profiler_is_active(monkeypatch, tmp_path):
+    metrics = Metrics(profile=["fetch"])
+    holder = {}
+    enable = cProfile.Profile.enable
+
+    def one_per_process(self, *args, **kwargs):
+        # What Python 3.12+ does when a second profiler is enabled while one is running
+        if holder.setdefault("profiler", self) is not self:
+            raise ValueError("Another profiling tool is already active")
+        enable(self, *args, **kwargs)
+
+    monkeypatch.setattr(cProfile.Profile, "enable", one_per_process)
+    inside = threading.Event()
+    leave = threading.Event()
+
+    def first():
+        with metrics.stage("fetch"):
+            inside.set()
+            leave.wait(5)
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    inside.wait(5)
+    ran = []
+    for _ in range(3):
+        with metrics.stage("fetch"):
+            ran.append(sum(range(100)))
+    leave.set()
+    thread.join()
+
+    assert ran == [4950] * 3
+    counters = metrics.snapshot()["counters"]
+    assert counters["profile_skipped_total"] == [{"labels": {"stage": "fetch"}, "value": 3}]
+    # Only the profiler that ran is merged into the report
+    assert len(metrics._profiles["fetch"]) == 1
+    metrics.write_report(str(tmp_path / "report.json"))
+    assert (tmp_path / "report.fetch.prof").exists()
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from corpus import search_page
+from extractors.job_parser import UpworkJobParser
+from utils.normalize import budget_range, experience_level, normalize_jobs, payment_kind
+
+@pytest.mark.parametrize(
+    "label, span",
+    [
+        ("$15.00 - $40.00", (15.0, 40.0)),
+        ("$1,250", (1250.0, 1250.0)),
+        ("$1.5K", (1500.0, 1500.0)),
+        ("$2M+", (2_000_000.0, 2_000_000.0)),
+        ("Budget to be discussed", None),
+        ("", None),
+    ],
+)
+def test_budget_range(label, span):
+    assert budget_range(label) == span
+
+def test_labels_map_to_enums():
+    assert payment_kind("Hourly: $15.00 - $40.00") == "hourly"
+    assert payment_kind("Fixed Price") == "fixed"
+    assert payment_kind("Barter") is None
+    assert experience_level("Expert level") == "expert"
+    assert experience_level("") is None
+
+def test_normalize_jobs_adds_typed_columns():
+    jobs = [
+        {"Project Payment Type": "Hourly", "Budget": "$20.00 - $35.00", "Skill Level": "Intermediate"},
+        {"Project Payment Type": "", "Budget": "", "Skill Level": ""},
+    ]
+
+    normalize_jobs(jobs, fetched_at=0)
+
+    assert jobs[0]["Payment Type"] == "hourly"
+    assert (jobs[0]["Budget Min"], jobs[0]["Budget Max"]) == (20.0, 35.0)
+    assert jobs[0]["Experience Level"] == "intermediate"
+    assert (jobs[1]["Payment Type"], jobs[1]["Budget Min"], jobs[1]["Experience Level"]) == ("", None, "")
+
+def test_date_scraped_is_the_fetch_time_for_the_whole_page():
+    fetched_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc).timestamp()
+
+    jobs = UpworkJobParser().parse_html(search_page(cards=8), fetched_at)
+    ssr_jobs = UpworkJobParser().parse_html(search_page(cards=8, ssr=True), fetched_at)
+
+    assert {j["Date Scraped"] for j in jobs + ssr_jobs} == {"2024-05-01T12:30:00+00:00"}
+    assert list(jobs[0])[0] == "Date Scraped"
+
+def test_date_scraped_without_fetch_time_is_one_timestamp_per_page():
+    jobs = normalize_jobs([{"Date Scraped": ""} for _ in range(50)])
+
+    assert len({j["Date Scraped"] for j in jobs}) == 1
+    assert jobs[0]["Date Scraped"]
@@ -0,0 +1,103 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from corpus import search_page
+from extractors.job_parser import UpworkJobParser
+from extractors.parse_pool import ArchiveReplay
+from output.page_archive import ArchiveReader, PageArchive
+
+FETCHED_AT = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+
+def url(page):
+    return f"https://www.upwork.com/nx/search/jobs/?q=python&page={page}"
+
+def archive_pages(path, pages, run_id="run-1"):
+    archive = PageArchive(path, run_id=run_id)
+    for seq, page in pages:
+        archive.append(url(page), "python", page, search_page(page=page, cards=4), seq=seq, fetched_at=FETCHED_AT + seq)
+    archive.close()
+    return archive
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "pages.upwa")
+
+def test_pages_read_back_in_output_order(path):
+    # Completion order differs from output (seq) order
+    archive = archive_pages(path, [(1, 2), (0, 1), (3, 4), (2, 3)])
+    assert archive.count == 4
+    assert archive.stored_bytes < archive.raw_bytes
+
+    reader = ArchiveReader(path)
+    pages = [reader.read(i) for i in reader.ordered()]
+
+    assert [p.page for p in pages] == [1, 2, 3, 4]
+    assert pages[0].html == search_page(page=1, cards=4)
+    assert (pages[0].url, pages[0].query, pages[0].run, pages[0].fetched_at) == (url(1), "python", "run-1", FETCHED_AT)
+    assert reader.read(0, body=False).html == ""
+
+def test_reopened_archive_appends_a_new_run(path):
+    archive_pages(path, [(1, 2), (0, 1)], run_id="run-1")
+    archive = archive_pages(path, [(0, 5)], run_id="run-2")
+
+    assert archive.count == 3
+    reader = ArchiveReader(path)
+    assert [reader.read(i).page for i in reader.ordered()] == [1, 2, 5]
+
+def test_torn_tail_is_dropped_on_reopen(path):
+    archive_pages(path, [(0, 1), (1, 2), (2, 3)])
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 10)
+
+    assert len(ArchiveReader(path)) == 2
+    archive = PageArchive(path)
+    archive.append(url(9), "python", 9, "<html></html>", seq=3)
+    archive.close()
+
+    reader = ArchiveReader(path)
+    assert [reader.read(i).page for i in range(len(reader))] == [1, 2, 9]
+
+def test_missing_index_is_rebuilt_from_the_segment(path):
+    archive_pages(path, [(0, 1), (1, 2)])
+    os.remove(path + ".idx")
+
+    assert len(ArchiveReader(path)) == 2
+    assert PageArchive(path).count == 2
+    assert os.path.getsize(path + ".idx") > 0
+
+def test_corrupt_record_fails_only_its_page(path):
+    archive_pages(path, [(0, 1), (1, 2), (2, 3)])
+    reader = ArchiveReader(path)
+    offset, length = reader.entries[1]
+    reader.close()
+    with open(path, "r+b") as f:
+        f.seek(offset + length - 5)
+        byte = f.read(1)
+        f.seek(offset + length - 5)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    with pytest.raises(ValueError):
+        ArchiveReader(path).read(1)
+
+    # The replay reports the record as a failed page, in its place, and carries on
+    results = list(ArchiveReplay(path, UpworkJobParser(), workers=2).run())
+    assert [(item.seq, item.page, len(jobs), error is None) for item, jobs, error in results] == [
+        (0, 1, 4, True),
+        (1, 0, 0, False),
+        (2, 3, 4, True),
+    ]
+    assert results[1][0].url == f"{path}#1"
+
+def test_replay_matches_parsing_the_pages_directly(path):
+    archive_pages(path, [(1, 2), (0, 1), (2, 3)])
+    direct = [UpworkJobParser().parse_html(search_page(page=p, cards=4), FETCHED_AT + p - 1) for p in (1, 2, 3)]
+
+    replay = ArchiveReplay(path, UpworkJobParser(), workers=2)
+    results = list(replay.run())
+
+    assert [(item.seq, item.page, item.url) for item, _, _ in results] == [(0, 1, url(1)), (1, 2, url(2)), (2, 3, url(3))]
+    assert [jobs for _, jobs, _ in results] == direct
+    assert replay.stats.parse.items == 3
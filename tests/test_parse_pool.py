@@ -0,0 +1,71 @@
+import multiprocessing
+import threading
+import time
+
+from corpus import search_page
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
+from extractors.job_parser import UpworkJobParser
+from extractors.parse_pool import ArchiveReplay, ParsePipeline
+from output.page_archive import PageArchive
+
+PAGES = 12
+
+def items(pages=PAGES):
+    return [
+        WorkItem(seq=i, query="q", page=i + 1, url=f"https://www.upwork.com/nx/search/jobs/?q=q&page={i + 1}")
+        for i in range(pages)
+    ]
+
+def kill_workers():
+    for child in multiprocessing.active_children():
+        child.kill()
+
+def test_pipeline_yields_pages_in_order():
+    fetcher = ConcurrentFetcher(lambda item, proxies: (search_page(page=item.page, cards=5), time.time()), concurrency=3)
+    pipeline = ParsePipeline(fetcher, UpworkJobParser(), workers=2)
+
+    results = list(pipeline.run(items()))
+
+    assert [item.seq for item, _, _ in results] == list(range(PAGES))
+    assert all(error is None and len(jobs) == 5 for _, jobs, error in results)
+    assert pipeline.stats.parse.items == PAGES
+
+def test_pipeline_parses_in_process_after_a_worker_dies(caplog):
+    killed = threading.Event()
+
+    def fetch(item, proxies):
+        if item.seq > 0:
+            killed.wait(timeout=30)
+        return search_page(page=item.page, cards=5), time.time()
+
+    fetcher = ConcurrentFetcher(fetch, concurrency=2)
+    pipeline = ParsePipeline(fetcher, UpworkJobParser(), workers=2)
+
+    results = []
+    for result in pipeline.run(items()):
+        if not results:
+            # The first page came back from a worker, so the pool is up; the rest are fetched after this
+            kill_workers()
+            killed.set()
+        results.append(result)
+
+    assert [item.seq for item, _, _ in results] == list(range(PAGES))
+    assert all(error is None and len(jobs) == 5 for _, jobs, error in results)
+    assert sum("parse worker died" in r.message for r in caplog.records) == 1
+
+def test_replay_parses_in_process_after_a_worker_dies(tmp_path, caplog):
+    path = str(tmp_path / "pages.upwa")
+    archive = PageArchive(path)
+    for item in items():
+        archive.append(item.url, item.query, item.page, search_page(page=item.page, cards=5), seq=item.seq)
+    archive.close()
+
+    results = []
+    for result in ArchiveReplay(path, UpworkJobParser(), workers=2).run():
+        if not results:
+            kill_workers()
+        results.append(result)
+
+    assert [item.page for item, _, _ in results] == list(range(1, PAGES + 1))
+    assert all(error is None and len(jobs) == 5 for _, jobs, error in results)
+    assert sum("parse worker died" in r.message for r in caplog.records) == 1
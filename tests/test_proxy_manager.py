@@ -0,0 +1,38 @@
+import time
+
+import requests
+
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
+from extractors.proxy_manager import ProxyManager
+
+FLAKY = "http://flaky.example:8080"
+STEADY = "http://steady.example:8080"
+
+def not_found():
+    resp = requests.Response()
+    resp.status_code = 404
+    return requests.HTTPError("404 Not Found", response=resp)
+
+def test_probe_ending_in_404_is_handed_back(tmp_path):
+    proxy_file = tmp_path / "proxies.txt"
+    proxy_file.write_text(f"{FLAKY}\n{STEADY}\n")
+    proxy_manager = ProxyManager(str(proxy_file), failure_threshold=1, quarantine_base=0.01, seed=1)
+    proxy_manager.report_failure(FLAKY)
+    time.sleep(0.02)  # quarantine over: the next pick of FLAKY is its probe
+    used = []
+
+    def fetch(item, proxies):
+        used.append(proxies["https"])
+        raise not_found()
+
+    fetcher = ConcurrentFetcher(fetch, proxy_manager=proxy_manager)
+    for seq in range(200):
+        fetcher.fetch_one(WorkItem(seq=seq, query="q", page=1, url=f"https://www.upwork.com/jobs/~0{seq}"))
+        if used.count(FLAKY) >= 2:
+            break
+
+    # A 404 says nothing about the proxy: the probe is released and FLAKY stays in rotation
+    assert used.count(FLAKY) >= 2
+    flaky = next(h for h in proxy_manager.snapshot() if h.url == FLAKY)
+    assert not flaky.probing
+    assert flaky.failures == 1
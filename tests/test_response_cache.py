@@ -0,0 +1,62 @@
+import os
+
+from requests.cookies import RequestsCookieJar
+
+from extractors.job_parser import UpworkJobParser
+from extractors.response_cache import ResponseCache, normalize_url
+from stub_server import StubServer
+
+def jar(value):
+    cookies = RequestsCookieJar()
+    cookies.set("session", value)
+    return cookies
+
+def test_fresh_entry_is_served_without_a_request(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=600)
+    parser_engine = UpworkJobParser(cache=cache)
+    with StubServer() as srv:
+        url = srv.base_url + "/nx/search/jobs/?q=python&page=1"
+        body, fetched_at = parser_engine.fetch_page(url)
+        # Same page with its query parameters in another order
+        again = parser_engine.fetch_page(srv.base_url + "/nx/search/jobs/?page=1&q=python")
+        assert srv.requests == 1
+    assert again == (body, fetched_at)
+    assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+    cache.close()
+
+def test_stale_entry_is_revalidated_with_its_etag(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=0)
+    parser_engine = UpworkJobParser(cache=cache)
+    with StubServer(etag=True) as srv:
+        url = srv.base_url + "/nx/search/jobs/?q=python&page=1"
+        body, fetched_at = parser_engine.fetch_page(url)
+        again, refetched_at = parser_engine.fetch_page(url)
+        assert (srv.requests, srv.not_modified) == (2, 1)
+    # A 304 serves the stored body, still dated from its download
+    assert (again, refetched_at) == (body, fetched_at)
+    assert (cache.stats.revalidated, cache.stats.misses) == (1, 1)
+    cache.close()
+
+def test_stale_entry_without_validators_is_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=0)
+    key = cache.key_for("https://www.upwork.com/nx/search/jobs/?q=a")
+    cache.put(key, "https://www.upwork.com/nx/search/jobs/?q=a", "<html></html>")
+    assert cache.get(key) is None
+    cache.close()
+
+def test_entries_are_keyed_on_the_cookies():
+    url = "https://WWW.upwork.com/nx/search/jobs/?q=a&page=2#top"
+    assert normalize_url(url) == "https://www.upwork.com/nx/search/jobs/?page=2&q=a"
+    keys = {ResponseCache.key_for(url), ResponseCache.key_for(url, jar("a")), ResponseCache.key_for(url, jar("b"))}
+    assert len(keys) == 3
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=2048)
+    for i in range(6):
+        url = f"https://www.upwork.com/p{i}"
+        # Random bodies, so compression cannot shrink them under the cap
+        cache.put(cache.key_for(url), url, os.urandom(512).hex())
+    assert cache.stats.evictions > 0
+    assert cache.get(cache.key_for("https://www.upwork.com/p5")) is not None
+    assert cache.get(cache.key_for("https://www.upwork.com/p0")) is None
+    cache.close()
@@ -0,0 +1,67 @@
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+import filters.query_builder as query_builder
+import main
+import output.page_writer as page_writer
+from corpus import search_page
+from output.data_exporter import read_records
+from stub_server import StubServer
+
+QUERIES = ["python scraping", "react developer", "data entry"]
+PAGES = 3
+PER_PAGE = 10
+
+class Crash(Exception):
+    pass
+
+def run(monkeypatch, tmp_path, formats, resume=False, crash_after=None):
+    config = tmp_path / "input.json"
+    config.write_text(json.dumps({
+        "queries": QUERIES,
+        "pages": PAGES,
+        "per_page": PER_PAGE,
+        "concurrency": 1,
+        "output_formats": formats,
+    }))
+    if crash_after is not None:
+        completed = []
+        complete = page_writer.PageWriter._complete
+
+        def crashing(self, page):
+            complete(self, page)
+            completed.append(page)
+            if len(completed) == crash_after:
+                raise Crash()
+
+        monkeypatch.setattr(page_writer.PageWriter, "_complete", crashing)
+    argv = ["main", "--input", str(config), "--outdir", str(tmp_path / "out")] + (["--resume"] if resume else [])
+    monkeypatch.setattr(sys, "argv", argv)
+    with StubServer(page_fn=lambda q, p: search_page(q, p, cards=PER_PAGE)) as srv:
+        monkeypatch.setattr(query_builder, "UPWORK_SEARCH_BASE", srv.base_url + "/nx/search/jobs/")
+        main.main()
+
+def rows(fmt, tmp_path):
+    """(query, job ID) per record; the stub reuses job IDs across queries."""
+    (path,) = glob.glob(os.path.join(tmp_path, "out", f"upwork_jobs_*.{fmt}"))
+    return [(r["Query"], r["Job ID"]) for r in read_records(fmt, path)]
+
+@pytest.mark.parametrize("formats", [["jsonl", "csv", "columnar"], ["jsonl", "parquet"]])
+def test_crash_and_resume_keeps_every_row_once(monkeypatch, tmp_path, formats):
+    if "parquet" in formats:
+        pytest.importorskip("pyarrow")
+    with pytest.raises(Crash):
+        run(monkeypatch, tmp_path, formats, crash_after=4)
+    monkeypatch.undo()
+    run(monkeypatch, tmp_path, formats, resume=True)
+
+    expected = len(QUERIES) * PAGES * PER_PAGE
+    for fmt in formats:
+        keys = rows(fmt, tmp_path)
+        assert len(keys) == expected, fmt
+        assert len(set(keys)) == expected, fmt
+    assert not glob.glob(os.path.join(tmp_path, "out", "*.resume"))
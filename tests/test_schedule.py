@@ -0,0 +1,75 @@
+from filters.schedule import PollScheduler
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def scheduler(clock, **kwargs):
+    kwargs.setdefault("min_interval", 60)
+    kwargs.setdefault("max_interval", 3600)
+    kwargs.setdefault("initial_interval", 300)
+    return PollScheduler(["quiet", "busy"], clock=clock, **kwargs)
+
+def test_one_empty_poll_does_not_jump_to_max_interval():
+    clock = Clock()
+    sched = scheduler(clock)
+
+    assert sched.record("quiet", 0) == 600
+
+def test_quiet_query_backs_off_by_at_most_doubling():
+    clock = Clock()
+    sched = scheduler(clock)
+    intervals = []
+    for _ in range(6):
+        interval = sched.record("quiet", 0)
+        intervals.append(interval)
+        clock.now += interval
+
+    assert intervals == [600, 1200, 2400, 3600, 3600, 3600]
+
+def test_first_poll_seeds_the_rate_over_initial_interval():
+    clock = Clock()
+    sched = scheduler(clock, target_new=2)
+
+    # 4 new jobs in the first 300s: two more are due in about 150s
+    assert sched.record("busy", 4) == 150
+    assert sched.queries["busy"].rate == 4 / 300
+
+def test_busier_query_is_polled_sooner():
+    clock = Clock()
+    sched = scheduler(clock)
+    sched.record("busy", 1)
+    clock.now += 300
+    before = sched.queries["busy"].interval
+
+    assert sched.record("busy", 20) < before
+
+def test_saturated_poll_halves_the_interval():
+    clock = Clock()
+    sched = scheduler(clock, target_new=2)
+
+    assert sched.record("busy", 4, saturated=True) == 75
+
+def test_failed_poll_keeps_interval_and_rate():
+    clock = Clock()
+    sched = scheduler(clock)
+    sched.record("busy", 1)
+    rate = sched.queries["busy"].rate
+    clock.now += 300
+
+    assert sched.record("busy", 0, failed=True) == 300
+    assert sched.queries["busy"].rate == rate
+    assert sched.queries["busy"].polls == 1
+
+def test_pop_due_returns_queries_in_due_order():
+    clock = Clock()
+    sched = scheduler(clock)
+    assert sched.pop_due() == ["quiet", "busy"]
+    sched.record("quiet", 0)
+    sched.record("busy", 4)
+
+    assert sched.pop_due(clock.now + 30) == []
+    assert sched.pop_due(clock.now + 1000) == ["busy", "quiet"]
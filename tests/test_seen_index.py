@@ -0,0 +1,31 @@
+from filters.dedup import StreamingDeduper
+from filters.seen_index import SeenJobsIndex
+
+def job(url, job_id=""):
+    return {"Job ID": job_id, "URL": url, "Title": "t"}
+
+def test_partition_splits_new_from_seen(tmp_path):
+    index = SeenJobsIndex(str(tmp_path / "seen.sqlite3"))
+    index.mark([job("https://www.upwork.com/jobs/~01", "01")], query="q")
+
+    new, old = index.partition([job("https://www.upwork.com/jobs/~01", "01"), job("https://www.upwork.com/jobs/~02", "02")])
+
+    assert [j["Job ID"] for j in new] == ["02"]
+    assert [j["Job ID"] for j in old] == ["01"]
+    index.close()
+
+def test_index_and_dedup_agree_on_a_job_without_an_id(tmp_path):
+    first = job("https://www.upwork.com/jobs/Scraper_~01abc/?referrer_url_path=/nx/search")
+    again = job("https://www.upwork.com/jobs/Scraper_~01abc?source=rss#apply")
+    index = SeenJobsIndex(str(tmp_path / "seen.sqlite3"))
+    index.mark([first])
+    deduper = StreamingDeduper(window=10)
+    deduper.push([dict(first)], query="a")
+
+    new, old = index.partition([again])
+    deduper.push([dict(again)], query="b")
+
+    # Both treat the tracking-parameter variant as the job they already have
+    assert (new, old) == ([], [again])
+    assert deduper.stats.merged == 1
+    index.close()
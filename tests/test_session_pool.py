@@ -0,0 +1,98 @@
+import requests
+from requests.cookies import RequestsCookieJar
+
+from extractors.fetch_engine import ConcurrentFetcher, WorkItem
+from extractors.job_parser import UpworkJobParser
+from extractors.proxy_manager import ProxyManager
+from extractors.rate_control import RateController
+from extractors.response_cache import ResponseCache
+from extractors.session_pool import Identity, IdentitySignedOut, SessionPool
+from stub_server import StubServer
+
+ROTATION = "http://rotation.example:8080"
+STICKY = "http://sticky.example:3128"
+
+def identity(name, proxy=None):
+    jar = RequestsCookieJar()
+    jar.set("session", name)
+    return Identity(name=name, cookies=jar, proxy=proxy)
+
+def signed_out(name):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = "https://www.upwork.com/ab/account-security/login"
+    return IdentitySignedOut(name, "redirected to /ab/account-security/login", resp)
+
+def item():
+    return WorkItem(seq=0, query="q", page=1, url="https://www.upwork.com/nx/search/jobs/?q=q")
+
+def test_sticky_proxy_bypasses_the_rotation(tmp_path):
+    proxy_file = tmp_path / "proxies.txt"
+    proxy_file.write_text(ROTATION + "\n")
+    proxy_manager = ProxyManager(str(proxy_file))
+    rate_controller = RateController()
+    seen = []
+
+    def fetch(item, proxies, identity):
+        seen.append((identity.name, proxies))
+        return []
+
+    fetcher = ConcurrentFetcher(
+        fetch,
+        proxy_manager=proxy_manager,
+        per_proxy_limit=1,
+        rate_controller=rate_controller,
+        session_pool=SessionPool([identity("a", proxy=STICKY)]),
+    )
+    _, _, error = fetcher.fetch_one(item())
+
+    assert error is None
+    assert seen == [("a", {"http": STICKY, "https": STICKY})]
+    # The rotation proxy carried nothing, so it holds no slot, no score and no rate bucket
+    (health,) = proxy_manager.snapshot()
+    assert (health.successes, health.failures) == (0, 0)
+    assert fetcher._in_flight == {}
+    assert list(rate_controller._proxies) == [STICKY]
+
+def test_signed_out_identity_is_replaced_without_a_retry():
+    pool = SessionPool([identity("a"), identity("b")])
+    rate_controller = RateController(max_retries=0)
+    seen = []
+
+    def fetch(item, proxies, identity):
+        seen.append(identity.name)
+        if identity.name == "a":
+            raise signed_out("a")
+        return ["job"]
+
+    fetcher = ConcurrentFetcher(fetch, rate_controller=rate_controller, session_pool=pool)
+    _, batch, error = fetcher.fetch_one(item())
+
+    assert (batch, error) == (["job"], None)
+    assert seen == ["a", "b"]
+    assert pool.active() == 1
+    assert rate_controller.stats.retries == 0
+
+def test_cached_pages_are_kept_per_identity(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    parser_engine = UpworkJobParser(cache=cache)
+    a, b = identity("a"), identity("b")
+    with StubServer() as srv:
+        url = srv.base_url + "/nx/search/jobs/?q=python&page=1"
+        parser_engine.fetch_page(url, identity=a)
+
+        # What account a was shown is not served to account b, nor to the configured cookies
+        assert parser_engine.cached_page(url, a) is not None
+        assert parser_engine.cached_page(url, b) is None
+        assert parser_engine.cached_page(url) is None
+        parser_engine.fetch_page(url, identity=b)
+        assert srv.requests == 2
+    cache.close()
+
+def test_peek_names_the_identity_acquire_hands_out():
+    pool = SessionPool([identity("a"), identity("b")], rps=1.0)
+    first = pool.peek()
+    assert pool.acquire() is first
+    # a's token is spent, so b goes next; peeking reserves nothing
+    assert pool.peek() is pool.peek() is not first
+    pool.release(first)
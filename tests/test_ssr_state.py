@@ -0,0 +1,49 @@
+import logging
+import random
+
+from corpus import nuxt_state_script, raw_job, search_page
+from extractors.job_parser import UpworkJobParser
+from extractors.ssr_state import map_job
+
+def malformed_job(rng):
+    raw = raw_job(rng, 10_000_000_001, "web scraping")
+    raw.update({
+        "title": {"text": "Title as an object"},
+        "type": ["HOURLY"],  # unhashable where a code was expected
+        "tier": {"level": 3},
+        "attrs": [{"prettyName": "Python"}, {"prettyName": {"en": "Scrapy"}}, 42],
+        "durationLabel": {"weeks": 12},
+        "totalApplicants": {"min": 5},
+    })
+    raw["client"]["location"]["country"] = ["Canada"]
+    return raw
+
+def test_malformed_fields_are_dropped_one_at_a_time(caplog):
+    rng = random.Random(0)
+    raw = malformed_job(rng)
+    with caplog.at_level(logging.WARNING, logger="ssr_state"):
+        job = map_job(raw)
+
+    assert job["Job ID"] == "0110000000001"
+    assert job["URL"] == "https://www.upwork.com/jobs/~0110000000001"
+    assert job["Description"] == raw["description"]
+    assert job["Weekly Hours"] == raw["engagement"]
+    assert job["Feedback"] == raw["client"]["totalFeedback"]
+    # The numeric tag survives as text; the one named by an object is skipped
+    assert job["Skills"] == ["Python", "42"]
+    for field in ("Title", "Project Payment Type", "Skill Level", "Location", "Project Length", "Proposals"):
+        assert job[field] == "", field
+    dropped = {r.getMessage().split(" malformed ")[1].split(" from ")[0] for r in caplog.records}
+    assert dropped == {"Title", "Project Payment Type", "Skill Level", "Location", "Project Length", "Proposals"}
+
+def test_page_with_a_malformed_job_keeps_the_others():
+    rng = random.Random(1)
+    jobs = [raw_job(rng, 10_000_000_100 + i, "web scraping") for i in range(3)]
+    jobs.insert(1, malformed_job(rng))
+    html = search_page(cards=0).replace("</body>", nuxt_state_script(jobs) + "</body>")
+
+    parsed = UpworkJobParser(html_backend="html.parser")._parse_html(html)
+
+    assert [j["Job ID"] for j in parsed] == [map_job(r)["Job ID"] for r in jobs]
+    assert (parsed[1]["Title"], parsed[1]["Payment Type"], parsed[1]["Experience Level"]) == ("", "", "")
+    assert all(j["Title"] for j in parsed[:1] + parsed[2:])